@@ -0,0 +1,83 @@
+"""
+adaptivecontroller.py
+Ajuste en tiempo de ejecución de la calidad de MediaPipe según el tiempo por frame
+"""
+
+import numpy as np
+
+
+class AdaptiveController:
+    """
+    Sube o baja el nivel de calidad para mantener el tiempo por frame en presupuesto
+    
+    Cada nivel es un dict con 'model_complexity', 'max_num_hands' y 'escala'
+    (factor de reducción de la imagen de entrada), ordenados del más preciso al
+    más barato. Con histéresis: se degrada en cuanto una ventana supera el
+    presupuesto, pero solo se mejora tras varias ventanas holgadas seguidas.
+    """
+    
+    def __init__(self, niveles, presupuesto_ms, ventana=30, margen_mejora=0.6,
+                 ventanas_para_mejorar=3, nivel_inicial=0):
+        """
+        Args:
+            niveles: Lista de niveles del más preciso al más barato
+            presupuesto_ms: Tiempo objetivo de preproceso + inferencia por frame
+            ventana: Frames que se miden antes de cada decisión
+            margen_mejora: Se mejora si la mediana queda por debajo de esta
+                           fracción del presupuesto
+            ventanas_para_mejorar: Ventanas holgadas seguidas necesarias para mejorar
+            nivel_inicial: Índice del nivel de arranque
+        """
+        self.niveles = niveles
+        self.presupuesto = presupuesto_ms / 1000
+        self.margen_mejora = margen_mejora
+        self.ventanas_para_mejorar = ventanas_para_mejorar
+        self.nivel = nivel_inicial
+        
+        self.tiempos = np.zeros(ventana)
+        self.n = 0
+        self.holguras = 0
+        self.descartar = 1          # Mediciones a ignorar (el primer frame tras reconstruir es lento)
+        self.cambios = 0
+    
+    def nivel_actual(self):
+        """Retorna la configuración del nivel actual"""
+        return self.niveles[self.nivel]
+    
+    def registrar(self, segundos):
+        """
+        Agrega la medición de un frame
+        
+        Returns:
+            dict: El nuevo nivel si hay que cambiarlo, None si se mantiene
+        """
+        if self.descartar:
+            self.descartar -= 1
+            return None
+        
+        self.tiempos[self.n] = segundos
+        self.n += 1
+        if self.n < len(self.tiempos):
+            return None
+        
+        self.n = 0
+        mediana = float(np.median(self.tiempos))
+        
+        if mediana > self.presupuesto and self.nivel < len(self.niveles) - 1:
+            return self._cambiar(self.nivel + 1)
+        
+        if mediana < self.presupuesto * self.margen_mejora and self.nivel > 0:
+            self.holguras += 1
+            if self.holguras >= self.ventanas_para_mejorar:
+                return self._cambiar(self.nivel - 1)
+        else:
+            self.holguras = 0
+        return None
+    
+    def _cambiar(self, nivel):
+        """Pasa a otro nivel y reinicia la medición"""
+        self.nivel = nivel
+        self.holguras = 0
+        self.descartar = 1
+        self.cambios += 1
+        return self.niveles[nivel]
@@ -0,0 +1,258 @@
+"""
+audioengine.py
+Motor de audio de baja latencia: sonidos decodificados a PCM y mezcla en un hilo propio
+"""
+
+import collections
+import os
+import threading
+import time
+import wave
+import numpy as np
+from config import AUDIO_CONFIG
+from metrics import HistogramaLatencia
+
+
+def decodificar(archivo, frecuencia, canales):
+    """
+    Decodifica un archivo de audio (WAV, MP3, OGG...) a PCM en memoria
+    
+    Usa pygame solo como decodificador, con el driver de audio 'dummy' para
+    no abrir el dispositivo de sonido.
+    
+    Returns:
+        np.ndarray: Muestras float32 (n, canales) en [-1, 1]
+    """
+    import pygame
+    if not pygame.mixer.get_init():
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        pygame.mixer.init(frequency=frecuencia, size=-16, channels=canales)
+    
+    muestras = pygame.sndarray.array(pygame.mixer.Sound(archivo))
+    if muestras.ndim == 1:
+        muestras = muestras[:, None]
+    if muestras.shape[1] != canales:
+        muestras = np.repeat(muestras[:, :1], canales, axis=1)
+    return muestras.astype(np.float32) / 32768
+
+
+# ========== SALIDAS ==========
+
+class SalidaDispositivo:
+    """Salida a la tarjeta de sonido con sounddevice (callback de PortAudio)"""
+    
+    def __init__(self, frecuencia, canales, tamaño_bloque):
+        import sounddevice
+        self.stream = sounddevice.OutputStream(
+            samplerate=frecuencia, channels=canales, dtype='float32',
+            blocksize=tamaño_bloque, latency='low', callback=self._callback
+        )
+        self.mezclar = None
+    
+    def iniciar(self, mezclar):
+        self.mezclar = mezclar
+        self.stream.start()
+    
+    def latencia(self):
+        """Latencia de salida reportada por PortAudio, en segundos"""
+        return self.stream.latency
+    
+    def _callback(self, salida, frames, tiempo, estado):
+        self.mezclar(salida)
+    
+    def cerrar(self):
+        self.stream.stop()
+        self.stream.close()
+
+
+class SalidaNula:
+    """
+    Consume bloques al ritmo del reloj sin reproducirlos (máquinas sin audio)
+    
+    Si se indica una ruta, los bloques mezclados se guardan en un WAV de
+    16 bits para revisarlos después.
+    """
+    
+    def __init__(self, frecuencia, canales, tamaño_bloque, ruta=None):
+        self.frecuencia = frecuencia
+        self.canales = canales
+        self.tamaño_bloque = tamaño_bloque
+        self.archivo = None
+        if ruta:
+            self.archivo = wave.open(ruta, 'wb')
+            self.archivo.setnchannels(canales)
+            self.archivo.setsampwidth(2)
+            self.archivo.setframerate(frecuencia)
+        self.corriendo = False
+        self.hilo = None
+    
+    def iniciar(self, mezclar):
+        self.corriendo = True
+        self.hilo = threading.Thread(target=self._bucle, args=(mezclar,), daemon=True)
+        self.hilo.start()
+    
+    def latencia(self):
+        return 0.0
+    
+    def _bucle(self, mezclar):
+        bloque = np.zeros((self.tamaño_bloque, self.canales), dtype=np.float32)
+        periodo = self.tamaño_bloque / self.frecuencia
+        siguiente = time.perf_counter()
+        while self.corriendo:
+            mezclar(bloque)
+            if self.archivo:
+                self.archivo.writeframes((bloque * 32767).astype('<i2').tobytes())
+            siguiente += periodo
+            espera = siguiente - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+    
+    def cerrar(self):
+        self.corriendo = False
+        if self.hilo:
+            self.hilo.join(timeout=1.0)
+        if self.archivo:
+            self.archivo.close()
+
+
+# ========== MOTOR ==========
+
+class AudioEngine:
+    """
+    Reproduce los sonidos de las vocales mezclándolos en el hilo de salida
+    
+    reproducir() solo agrega un comando a una deque (append/popleft son
+    atómicos, sin locks); el hilo de salida los aplica al inicio de cada
+    bloque. Misma interfaz que AudioManager.
+    """
+    
+    def __init__(self, habilitado=True, salida=None, perfil=None):
+        """
+        Args:
+            habilitado: False para no inicializar el audio
+            salida: 'dispositivo', 'nula' o 'archivo' (None = AUDIO_CONFIG['salida'])
+            perfil: Profiler donde registrar la latencia de disparo a salida
+        """
+        self.disponible = False
+        self.sonidos = {}
+        self.comandos = collections.deque()
+        self.voces = {}                 # vocal -> posición de reproducción
+        self.latencias = HistogramaLatencia(256)
+        self.perfil = perfil
+        self.salida = None
+        
+        self.frecuencia = AUDIO_CONFIG['frecuencia']
+        self.canales = AUDIO_CONFIG['canales']
+        self.tamaño_bloque = AUDIO_CONFIG['tamaño_bloque']
+        self._mezcla = np.zeros((self.tamaño_bloque, self.canales), dtype=np.float32)
+        
+        if habilitado:
+            self._inicializar(salida or AUDIO_CONFIG['salida'])
+    
+    def _inicializar(self, tipo_salida):
+        """Decodifica los sonidos y abre la salida"""
+        for vocal, archivo in AUDIO_CONFIG['archivos'].items():
+            try:
+                self.sonidos[vocal] = decodificar(archivo, self.frecuencia, self.canales)
+                print(f"✓ Sonido '{vocal}' decodificado: {archivo} ({len(self.sonidos[vocal])} muestras)")
+            except Exception as e:
+                print(f"✗ Error cargando sonido '{vocal}' ({archivo}): {e}")
+        
+        if not self.sonidos:
+            print("✗ No se pudo cargar ningún sonido")
+            return
+        
+        try:
+            if tipo_salida == 'dispositivo':
+                self.salida = SalidaDispositivo(self.frecuencia, self.canales, self.tamaño_bloque)
+            else:
+                ruta = AUDIO_CONFIG['archivo_salida'] if tipo_salida == 'archivo' else None
+                self.salida = SalidaNula(self.frecuencia, self.canales, self.tamaño_bloque, ruta)
+            self.salida.iniciar(self._mezclar)
+            self.disponible = True
+            print(f"✓ Motor de audio iniciado (salida: {tipo_salida}, bloque: {self.tamaño_bloque})")
+        except Exception as e:
+            print(f"✗ No se pudo abrir la salida de audio: {e}")
+            print("  Para habilitar sonido: pip install sounddevice")
+    
+    def reproducir(self, vocal):
+        """
+        Reproduce el sonido de la vocal (desde el inicio si ya sonaba)
+        
+        Args:
+            vocal (str): Letra de la vocal ('A', 'E', 'I', 'O', 'U')
+        """
+        if not self.disponible:
+            return
+        if vocal in self.sonidos:
+            self.comandos.append((vocal, time.perf_counter()))
+        else:
+            print(f"⚠ Sonido para '{vocal}' no disponible")
+    
+    def detener_todos(self):
+        """Detiene todos los sonidos que se estén reproduciendo"""
+        if self.disponible:
+            self.comandos.append((None, time.perf_counter()))
+    
+    def _mezclar(self, salida):
+        """Llena un bloque de salida (se ejecuta en el hilo de audio)"""
+        while self.comandos:
+            vocal, disparo = self.comandos.popleft()
+            if vocal is None:
+                self.voces.clear()
+                continue
+            self.voces[vocal] = 0
+            # El sonido empieza con este bloque, más la latencia propia de la salida
+            latencia = time.perf_counter() - disparo + self.salida.latencia()
+            self.latencias.registrar(latencia)
+            if self.perfil is not None:
+                self.perfil.registrar('latencia_audio', latencia)
+        
+        mezcla = self._mezcla
+        mezcla.fill(0)
+        n = len(mezcla)
+        terminadas = []
+        for vocal, posicion in self.voces.items():
+            pcm = self.sonidos[vocal]
+            tramo = pcm[posicion:posicion + n]
+            mezcla[:len(tramo)] += tramo
+            if posicion + n >= len(pcm):
+                terminadas.append(vocal)
+            else:
+                self.voces[vocal] = posicion + n
+        for vocal in terminadas:
+            del self.voces[vocal]
+        
+        np.clip(mezcla, -1.0, 1.0, out=salida)
+    
+    def latencia(self):
+        """Percentiles (p50, p95, p99) en ms de la latencia de disparo a salida"""
+        return self.latencias.percentiles()
+    
+    def cerrar(self):
+        """Cierra la salida de audio"""
+        if self.salida is not None:
+            self.salida.cerrar()
+            self.salida = None
+        self.disponible = False
+    
+    def esta_disponible(self):
+        """Retorna si el sistema de audio está disponible"""
+        return self.disponible
+    
+    def obtener_vocales_disponibles(self):
+        """Retorna lista de vocales con sonido disponible"""
+        return list(self.sonidos.keys())
+
+
+def crear_audio(habilitado=True, perfil=None):
+    """
+    Crea el motor de audio indicado en AUDIO_CONFIG['motor']
+    
+    Deshabilitado siempre es un AudioEngine sin salida: no importa pygame
+    ni decodifica sonidos.
+    """
+    if AUDIO_CONFIG['motor'] == 'pcm' or not habilitado:
+        return AudioEngine(habilitado=habilitado, perfil=perfil)
+    from audiomanager import AudioManager
+    return AudioManager(habilitado=habilitado)
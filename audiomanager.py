@@ -10,11 +10,16 @@ from config import AUDIO_CONFIG
 class AudioManager:
     """Clase para manejar la carga y reproducción de sonidos"""
     
-    def __init__(self):
+    def __init__(self, habilitado=True):
+        """
+        Args:
+            habilitado: False para no inicializar el audio (pruebas y benchmarks)
+        """
         self.disponible = False
         self.sonidos = {}
-        self._inicializar()
-
+        if habilitado:
+            self._inicializar()
+    
     def _inicializar(self):
         """Inicializa pygame mixer y carga los sonidos"""
         try:
@@ -69,6 +74,12 @@ class AudioManager:
         
         pygame.mixer.stop()
     
+    def cerrar(self):
+        """Libera el mixer de pygame"""
+        if self.disponible:
+            pygame.mixer.quit()
+            self.disponible = False
+    
     def esta_disponible(self):
         """Retorna si el sistema de audio está disponible"""
         return self.disponible
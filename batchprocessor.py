@@ -0,0 +1,214 @@
+"""
+batchprocessor.py
+Procesamiento por lotes (sin ventana ni audio) de videos y carpetas de imágenes
+"""
+
+import argparse
+import os
+import time
+import cv2
+import numpy as np
+from config import MEDIAPIPE_CONFIG, BATCH_CONFIG, TRACKING_CONFIG, FILTER_CONFIG
+from framebuffers import FramePool, BufferSet
+from gesturedetector import GestureDetector
+from geometryutils import calcular_bounding_box, landmarks_a_array
+from handtracker import HandTracker, obtener_lados
+from landmarkfilter import crear_filtro
+from resultswriter import escribir_resultados
+
+
+class BatchProcessor:
+    """Procesa grabaciones sin interfaz gráfica lo más rápido que permita el decodificador"""
+    
+    def __init__(self, espejo=None):
+        """
+        Args:
+            espejo: Voltear los frames como en la app en vivo
+                    (None = usar BATCH_CONFIG['espejo'])
+        """
+        self.espejo = BATCH_CONFIG['espejo'] if espejo is None else espejo
+        self.extensiones = tuple(ext.lower() for ext in BATCH_CONFIG['extensiones_imagen'])
+        self.frames_procesados = 0
+    
+    def procesar_fuente(self, ruta, inicio=0, fin=None):
+        """
+        Procesa un video o una carpeta de imágenes
+        
+        Args:
+            ruta: Ruta al archivo de video o a la carpeta de imágenes
+            inicio: Primer frame a procesar
+            fin: Frame final (excluido), None = hasta el final
+        
+        Yields:
+            tuple: Fila de resultados en el orden de resultswriter.COLUMNAS
+        """
+        if os.path.isdir(ruta):
+            frames = self._leer_imagenes(ruta, inicio, fin)
+            imagenes_sueltas = True
+        else:
+            frames = self._leer_video(ruta, inicio, fin)
+            imagenes_sueltas = False
+        
+        yield from self.procesar_frames(ruta, frames, imagenes_sueltas)
+    
+    def procesar_frames(self, nombre, frames, imagenes_sueltas=False):
+        """
+        Procesa una secuencia de frames con su propio detector y estado
+        
+        Args:
+            nombre: Nombre de la fuente para la columna 'fuente'
+            frames: Iterable de (indice, tiempo_ms, frame BGR)
+            imagenes_sueltas: True si los frames no son consecutivos
+                              (activa static_image_mode de MediaPipe)
+        
+        Yields:
+            tuple: Fila de resultados en el orden de resultswriter.COLUMNAS
+        """
+        # Importación diferida: el proceso que solo planifica tramos no carga MediaPipe
+        import mediapipe as mp
+        
+        config = dict(MEDIAPIPE_CONFIG, static_image_mode=imagenes_sueltas)
+        detector = GestureDetector()
+        tracker = HandTracker(**TRACKING_CONFIG)
+        # Imágenes sueltas no forman una secuencia: no se suavizan
+        filtro = None if imagenes_sueltas else crear_filtro(FILTER_CONFIG)
+        buffers = BufferSet()
+        
+        with mp.solutions.hands.Hands(**config) as manos:
+            for indice, tiempo_ms, frame in frames:
+                # El frame es de este generador: se voltea en el lugar
+                if self.espejo:
+                    cv2.flip(frame, 1, dst=frame)
+                h, w, _ = frame.shape
+                
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buffers.obtener('rgb', frame.shape))
+                resultados = manos.process(rgb)
+                self.frames_procesados += 1
+                
+                lista_manos = resultados.multi_hand_landmarks or []
+                lados = obtener_lados(resultados)
+                puntos = np.array([landmarks_a_array(lm_mano.landmark)
+                                   for lm_mano in lista_manos]).reshape(-1, 21, 3)
+                ids = tracker.actualizar(puntos, lados)
+                detector.olvidar_ausentes(ids)
+                if filtro is not None:
+                    puntos = filtro.filtrar(ids, puntos, tiempo_ms / 1000)
+                
+                if not lista_manos:
+                    continue
+                
+                gestos, _ = detector.detectar_vocales_lote(puntos, ids, aspecto=w / h)
+                
+                for i_mano, lm_mano in enumerate(lista_manos):
+                    x_min, y_min, x_max, y_max, _, _ = calcular_bounding_box(lm_mano.landmark, w, h)
+                    
+                    detectada = gestos[i_mano]
+                    confirmada = detector.confirmar_con_liberacion(ids[i_mano], detectada)
+                    
+                    yield (nombre, indice, round(tiempo_ms, 1), ids[i_mano], lados[i_mano] or '',
+                           x_min, y_min, x_max, y_max, detectada or '', confirmada or '')
+    
+    def _leer_video(self, ruta, inicio=0, fin=None):
+        """
+        Genera (indice, tiempo_ms, frame) de un archivo de video
+        
+        El frame se reutiliza: solo es válido hasta pedir el siguiente.
+        """
+        cap = cv2.VideoCapture(ruta)
+        if not cap.isOpened():
+            print(f"✗ No se pudo abrir el video: {ruta}")
+            return
+        
+        frames = FramePool()
+        try:
+            if inicio > 0:
+                # El decodificador salta al keyframe previo y avanza hasta el frame pedido
+                cap.set(cv2.CAP_PROP_POS_FRAMES, inicio)
+            indice = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+            while fin is None or indice < fin:
+                ret, frame = frames.leer(cap)
+                if not ret:
+                    break
+                yield indice, cap.get(cv2.CAP_PROP_POS_MSEC), frame
+                frames.liberar(frame)
+                indice += 1
+        finally:
+            cap.release()
+    
+    def _leer_imagenes(self, ruta, inicio=0, fin=None):
+        """Genera (indice, 0, frame) de las imágenes de una carpeta en orden alfabético"""
+        archivos = self.listar_imagenes(ruta)
+        for indice in range(inicio, len(archivos) if fin is None else min(fin, len(archivos))):
+            archivo = archivos[indice]
+            frame = cv2.imread(os.path.join(ruta, archivo))
+            if frame is None:
+                print(f"✗ No se pudo leer la imagen: {archivo}")
+                continue
+            yield indice, 0.0, frame
+    
+    def listar_imagenes(self, ruta):
+        """Retorna las imágenes de una carpeta en orden alfabético"""
+        return sorted(f for f in os.listdir(ruta) if f.lower().endswith(self.extensiones))
+    
+    def contar_frames(self, ruta):
+        """Retorna el número de frames de un video o de imágenes de una carpeta"""
+        if os.path.isdir(ruta):
+            return len(self.listar_imagenes(ruta))
+        
+        cap = cv2.VideoCapture(ruta)
+        try:
+            return int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+        finally:
+            cap.release()
+
+
+def main():
+    """Punto de entrada del modo por lotes"""
+    parser = argparse.ArgumentParser(
+        description='Procesa videos o carpetas de imágenes sin ventana ni audio')
+    parser.add_argument('entradas', nargs='+', help='Videos o carpetas de imágenes')
+    parser.add_argument('-o', '--salida', default=BATCH_CONFIG['salida'],
+                        help='Archivo CSV de resultados (.csv o .csv.gz)')
+    parser.add_argument('--sin-espejo', action='store_true',
+                        help='No voltear los frames (grabaciones ya espejadas)')
+    parser.add_argument('-p', '--procesos', type=int, default=BATCH_CONFIG['procesos'],
+                        help='Procesos en paralelo (0 = todos los núcleos, 1 = sin paralelismo)')
+    parser.add_argument('--verificar', action='store_true',
+                        help='Comparar el resultado en paralelo con el secuencial y salir')
+    args = parser.parse_args()
+    
+    espejo = False if args.sin_espejo else None
+    inicio = time.perf_counter()
+    
+    if args.verificar:
+        from parallelbatch import verificar
+        diferencias = verificar(args.entradas, args.procesos or None, espejo)
+        for secuencial, paralelo in diferencias[:20]:
+            print(f"✗ secuencial {secuencial}\n  paralelo   {paralelo}")
+        print(f"{'✗' if diferencias else '✓'} {len(diferencias)} diferencias entre secuencial y paralelo")
+        return
+    
+    if args.procesos == 1:
+        procesador = BatchProcessor(espejo=espejo)
+        
+        def filas():
+            for ruta in args.entradas:
+                print(f"Procesando {ruta}...")
+                yield from procesador.procesar_fuente(ruta)
+        
+        total = escribir_resultados(filas(), args.salida)
+        frames = procesador.frames_procesados
+    else:
+        from parallelbatch import ParallelBatchRunner
+        runner = ParallelBatchRunner(procesos=args.procesos or None, espejo=espejo)
+        total = escribir_resultados(runner.procesar(args.entradas), args.salida)
+        frames = runner.frames_procesados
+    
+    duracion = time.perf_counter() - inicio
+    fps = frames / duracion if duracion > 0 else 0
+    print(f"✓ {frames} frames, {total} filas en {duracion:.1f}s "
+          f"({fps:.1f} fps) -> {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+benchmark.py
+Benchmarks de las rutas críticas de geometría, detección y del bucle de la app
+"""
+
+import argparse
+import contextlib
+import json
+import platform
+import sys
+import time
+from types import SimpleNamespace
+import numpy as np
+from config import BENCHMARK_CONFIG, NORMALIZATION_CONFIG
+from gesturedetector import GestureDetector
+from geometryutils import (
+    distancia3, angulo_entre_puntos, esta_doblado_mejorado, calcular_bounding_box,
+    caracteristicas_dedos, DEDOS_MCP, DEDOS_PIP, DEDOS_TIP
+)
+
+
+# ========== MANOS SINTÉTICAS ==========
+
+def generar_manos(n, semilla=0):
+    """
+    Genera n manos sintéticas con poses variadas (puño, dedos extendidos, círculo)
+    
+    Args:
+        n: Número de manos
+        semilla: Semilla del generador aleatorio
+    
+    Returns:
+        np.ndarray: Array (n, 21, 3) en coordenadas normalizadas
+    """
+    rng = np.random.default_rng(semilla)
+    manos = np.zeros((n, 21, 3))
+    
+    # Pulgar: base fija, punta lejos o cerca del índice
+    manos[:, 1] = (-0.05, -0.03, 0)
+    manos[:, 2] = (-0.08, -0.06, 0)
+    manos[:, 3] = (-0.10, -0.08, 0)
+    manos[:, 4] = (-0.11, -0.10, 0)
+    
+    separacion = np.array([-0.04, -0.01, 0.02, 0.05])
+    extendidos = rng.random((n, 4)) < 0.5
+    for d in range(4):
+        x = separacion[d]
+        manos[:, DEDOS_MCP[d]] = (x, -0.15, 0)
+        manos[:, DEDOS_PIP[d]] = (x, -0.20, 0)
+        manos[:, DEDOS_PIP[d] + 1] = np.where(extendidos[:, d:d + 1], (x, -0.23, 0), (x, -0.16, 0.02))
+        manos[:, DEDOS_TIP[d]] = np.where(extendidos[:, d:d + 1], (x, -0.26, 0), (x, -0.13, 0.02))
+        manos[:, DEDOS_PIP[d], 1] = np.where(extendidos[:, d], -0.20, -0.19)
+    
+    pulgar_cerca = rng.random(n) < 0.3
+    manos[pulgar_cerca, 4] = manos[pulgar_cerca, 8] + (0.01, 0.01, 0)
+    
+    # Escala, rotación, posición y ruido
+    escala = rng.uniform(0.6, 1.4, (n, 1, 1))
+    angulo = rng.uniform(-0.4, 0.4, n)
+    cos, sen = np.cos(angulo), np.sin(angulo)
+    rotacion = np.stack([np.stack([cos, -sen], -1), np.stack([sen, cos], -1)], -2)
+    manos[..., :2] = np.einsum('nij,nkj->nki', rotacion, manos[..., :2] * escala)
+    manos[..., 0] += rng.uniform(0.3, 0.7, (n, 1))
+    manos[..., 1] += rng.uniform(0.5, 0.8, (n, 1))
+    manos += rng.normal(0, 0.005, manos.shape)
+    return manos
+
+
+def a_landmarks(puntos):
+    """Convierte un array (21, 3) en una lista de objetos con .x, .y, .z"""
+    return [SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in puntos]
+
+
+# ========== MEDICIÓN ==========
+
+def medir(nombre, funcion, muestras, llamadas_por_muestra=1, elementos_por_llamada=1, calentamiento=10):
+    """
+    Mide la latencia de una función
+    
+    Para operaciones muy rápidas cada muestra agrupa varias llamadas y se
+    divide el tiempo, evitando que el costo del reloj domine la medición.
+    
+    Args:
+        nombre: Nombre del benchmark
+        funcion: Función sin argumentos a medir
+        muestras: Número de muestras de tiempo
+        llamadas_por_muestra: Llamadas a la función en cada muestra
+        elementos_por_llamada: Elementos procesados por llamada (para el throughput)
+        calentamiento: Llamadas previas no medidas
+    
+    Returns:
+        dict: Latencias en microsegundos (media, p50, p95, p99, max) y throughput
+    """
+    for _ in range(calentamiento):
+        funcion()
+    
+    tiempos = np.empty(muestras)
+    reloj = time.perf_counter
+    for i in range(muestras):
+        inicio = reloj()
+        for _ in range(llamadas_por_muestra):
+            funcion()
+        tiempos[i] = (reloj() - inicio) / llamadas_por_muestra
+    
+    tiempos_us = tiempos * 1e6
+    media = float(tiempos.mean())
+    return {
+        'nombre': nombre,
+        'llamadas': muestras * llamadas_por_muestra,
+        'elementos_por_llamada': elementos_por_llamada,
+        'media_us': round(float(tiempos_us.mean()), 3),
+        'p50_us': round(float(np.percentile(tiempos_us, 50)), 3),
+        'p95_us': round(float(np.percentile(tiempos_us, 95)), 3),
+        'p99_us': round(float(np.percentile(tiempos_us, 99)), 3),
+        'max_us': round(float(tiempos_us.max()), 3),
+        'elementos_por_s': round(elementos_por_llamada / media, 1) if media > 0 else None,
+    }
+
+
+# ========== BENCHMARKS ==========
+
+def benchmark_geometria(manos, muestras):
+    """Primitivas de geometryutils sobre landmarks individuales"""
+    lm = a_landmarks(manos[0])
+    return [
+        medir('geometria.distancia3', lambda: distancia3(lm[4], lm[8]), muestras, 100),
+        medir('geometria.angulo_entre_puntos', lambda: angulo_entre_puntos(lm[5], lm[6], lm[8]), muestras, 100),
+        medir('geometria.esta_doblado_mejorado', lambda: esta_doblado_mejorado(lm[8], lm[6], lm[5]), muestras, 100),
+        medir('geometria.calcular_bounding_box', lambda: calcular_bounding_box(lm, 1280, 720), muestras, 20),
+        medir('geometria.caracteristicas_dedos', lambda: caracteristicas_dedos(manos[0]), muestras, 20),
+    ]
+
+
+def benchmark_deteccion(manos, muestras, tamaños_lote):
+    """detectar_vocal, detectar_vocales_lote y confirmar_gesto"""
+    detector = GestureDetector()
+    lista = [a_landmarks(p) for p in manos[:256]]
+    ciclo = {'i': 0}
+    
+    def detectar_una():
+        ciclo['i'] = (ciclo['i'] + 1) % len(lista)
+        detector.detectar_vocal(lista[ciclo['i']])
+    
+    gestos = detector.detectar_vocales_lote(manos[:256])[0]
+    
+    def confirmar():
+        ciclo['i'] = (ciclo['i'] + 1) % len(gestos)
+        detector.confirmar_gesto(ciclo['i'] % 4, gestos[ciclo['i']])
+    
+    resultados = [
+        medir('deteccion.detectar_vocal', detectar_una, muestras, 10),
+        medir('deteccion.confirmar_gesto', confirmar, muestras, 100),
+    ]
+    for tamaño in tamaños_lote:
+        lote = manos[:tamaño]
+        llamadas = max(1, 1000 // tamaño)
+        resultados.append(medir(f'deteccion.detectar_vocales_lote[{tamaño}]',
+                                lambda: detector.detectar_vocales_lote(lote),
+                                max(5, muestras // 10), llamadas, elementos_por_llamada=tamaño))
+    return resultados
+
+
+def benchmark_app(manos, frames, manos_por_frame):
+    """
+    Bucle de la app (clasificación, confirmación, audio y dibujo) alimentado
+    con landmarks sintéticos o grabados, sin cámara, inferencia ni ventana
+    """
+    from mediapipe.framework.formats import landmark_pb2, classification_pb2
+    with contextlib.redirect_stdout(sys.stderr):
+        from main import GestureRecognitionApp
+        app = GestureRecognitionApp(abrir_camara=False, audio=False)
+    ancho, alto = BENCHMARK_CONFIG['tamaño_frame']
+    frame = np.zeros((alto, ancho, 3), dtype=np.uint8)
+    
+    # Resultados con la misma estructura que Hands.process()
+    resultados = []
+    for f in range(frames):
+        landmarks = []
+        lados = []
+        for m in range(manos_por_frame):
+            puntos = manos[(f * manos_por_frame + m) % len(manos)]
+            lista = landmark_pb2.NormalizedLandmarkList()
+            for x, y, z in puntos:
+                lista.landmark.add(x=x, y=y, z=z)
+            landmarks.append(lista)
+            lado = classification_pb2.ClassificationList()
+            lado.classification.add(label='Right' if m % 2 else 'Left', score=1.0)
+            lados.append(lado)
+        resultados.append(SimpleNamespace(multi_hand_landmarks=landmarks, multi_handedness=lados))
+    
+    ciclo = {'i': 0}
+    
+    def procesar_frame():
+        ciclo['i'] = (ciclo['i'] + 1) % len(resultados)
+        app.procesar_resultados(frame, resultados[ciclo['i']])
+    
+    # Los mensajes de la app van a stderr para no mezclarse con el JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        return [medir(f'app.procesar_resultados[{manos_por_frame} manos]', procesar_frame,
+                      frames, elementos_por_llamada=manos_por_frame)]
+
+
+def concordancia_normalizacion(manos, aspecto=1.0):
+    """
+    Compara las reglas en coordenadas de imagen con las reglas en el marco de
+    la mano (DISTANCE_THRESHOLDS_PALMA, GESTURE_TOLERANCES_PALMA)
+    
+    Args:
+        manos: Array (N, 21, 3) de landmarks
+        aspecto: Ancho / alto de las manos (las sintéticas no distinguen x de y)
+    
+    Returns:
+        dict: 'concordancia' (fracción de manos con la misma vocal) y
+              'cambios' con el conteo de cada par (cruda -> normalizada) distinto
+    """
+    crudas = GestureDetector({**NORMALIZATION_CONFIG, 'activo': False}).reglas_lote(manos)
+    normalizadas = GestureDetector({**NORMALIZATION_CONFIG, 'activo': True}).reglas_lote(manos, aspecto)
+    iguales = crudas == normalizadas
+    cambios = {}
+    for cruda, normalizada in zip(crudas[~iguales], normalizadas[~iguales]):
+        clave = f'{cruda} -> {normalizada}'
+        cambios[clave] = cambios.get(clave, 0) + 1
+    return {
+        'manos': len(manos),
+        'concordancia': float(iguales.mean()) if len(manos) else 1.0,
+        'cambios': dict(sorted(cambios.items(), key=lambda par: -par[1])),
+    }
+
+
+def comparar(resultados, base, tolerancia):
+    """
+    Compara el p50 de cada benchmark con una ejecución base
+    
+    Returns:
+        list: (nombre, p50_base, p50_actual) de los benchmarks más lentos
+              que la base por encima de la tolerancia
+    """
+    base_por_nombre = {r['nombre']: r for r in base['resultados']}
+    regresiones = []
+    for r in resultados:
+        anterior = base_por_nombre.get(r['nombre'])
+        if anterior and r['p50_us'] > anterior['p50_us'] * (1 + tolerancia):
+            regresiones.append((r['nombre'], anterior['p50_us'], r['p50_us']))
+    return regresiones
+
+
+def main():
+    """Ejecuta los benchmarks y escribe los resultados en JSON"""
+    parser = argparse.ArgumentParser(description='Benchmarks de geometría y detección')
+    parser.add_argument('-o', '--salida', help='Archivo JSON de salida (por defecto stdout)')
+    parser.add_argument('--grabacion', help='Usar landmarks de una grabación en lugar de sintéticos')
+    parser.add_argument('--muestras', type=int, default=BENCHMARK_CONFIG['muestras'])
+    parser.add_argument('--sin-app', action='store_true',
+                        help='Omitir el bucle de la app (no requiere MediaPipe ni OpenCV)')
+    parser.add_argument('--comparar', help='JSON de una ejecución base para detectar regresiones')
+    parser.add_argument('--tolerancia', type=float, default=BENCHMARK_CONFIG['tolerancia'],
+                        help='Aumento relativo del p50 tolerado antes de marcar regresión')
+    parser.add_argument('--concordancia', action='store_true',
+                        help='Solo comparar las reglas con y sin normalización de la mano')
+    args = parser.parse_args()
+    
+    tamaños_lote = BENCHMARK_CONFIG['tamaños_lote']
+    aspecto = 1.0
+    if args.grabacion:
+        from landmarkrecorder import LandmarkReplay
+        grabacion = LandmarkReplay(args.grabacion)
+        manos = np.asarray(grabacion.landmarks, dtype=np.float64)
+        if len(manos) == 0:
+            print(f"✗ La grabación {args.grabacion} no tiene manos", file=sys.stderr)
+            sys.exit(1)
+        aspecto = grabacion.aspecto
+        origen = args.grabacion
+    elif args.concordancia:
+        manos = generar_manos(BENCHMARK_CONFIG['manos_concordancia'])
+        origen = 'sintetico'
+    else:
+        manos = generar_manos(max(tamaños_lote))
+        origen = 'sintetico'
+    
+    if args.concordancia:
+        informe = {'origen': origen, **concordancia_normalizacion(manos, aspecto)}
+        print(json.dumps(informe, indent=2, ensure_ascii=False))
+        if informe['concordancia'] < BENCHMARK_CONFIG['concordancia_minima']:
+            print(f"✗ Concordancia {informe['concordancia']:.1%} por debajo de "
+                  f"{BENCHMARK_CONFIG['concordancia_minima']:.0%}", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    resultados = benchmark_geometria(manos, args.muestras)
+    resultados += benchmark_deteccion(manos, args.muestras, [t for t in tamaños_lote if t <= len(manos)])
+    if not args.sin_app:
+        for manos_por_frame in BENCHMARK_CONFIG['manos_por_frame']:
+            resultados += benchmark_app(manos, args.muestras, manos_por_frame)
+    
+    informe = {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'origen': origen,
+        'entorno': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'procesador': platform.processor(),
+        },
+        'resultados': resultados,
+    }
+    
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto)
+    else:
+        print(texto)
+    
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            regresiones = comparar(resultados, json.load(archivo), args.tolerancia)
+        for nombre, antes, ahora in regresiones:
+            print(f"✗ Regresión en {nombre}: p50 {antes:.2f}us -> {ahora:.2f}us", file=sys.stderr)
+        if regresiones:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
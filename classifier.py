@@ -0,0 +1,382 @@
+"""
+classifier.py
+Clasificadores aprendidos (NumPy puro) sobre las características de los landmarks
+"""
+
+import argparse
+import time
+import numpy as np
+from config import CLASSIFIER_CONFIG
+from geometryutils import caracteristicas_dedos, MUÑECA, DEDOS_MCP, DEDOS_TIP
+from handframe import normalizar, aspecto_por_defecto
+
+
+# Clase de las manos que no muestran ningún gesto (en la línea de comandos: ninguno=ruta)
+SIN_GESTO = ''
+NOMBRE_SIN_GESTO = 'ninguno'
+
+_MEDIO_MCP = DEDOS_MCP[1]
+
+
+def vector_caracteristicas(puntos, caracteristicas=None, aspecto=None):
+    """
+    Arma el vector de entrada de los modelos, invariante a la escala de la mano
+    
+    Las distancias y alturas se dividen por el tamaño de la palma (muñeca a
+    MCP del medio), así una mano cerca o lejos de la cámara da el mismo vector.
+    
+    Args:
+        puntos: Array (N, 21, 3); si se pasan características, en el mismo
+                marco que ellas (el de la mano que usa GestureDetector)
+        caracteristicas: dict de GestureDetector._calcular_caracteristicas
+                         (None = normalizar los puntos y calcularlas aquí)
+        aspecto: Ancho / alto del frame al normalizar, escalar o array (N,)
+    
+    Returns:
+        np.ndarray: Array (N, 17) float32
+    """
+    if caracteristicas is None:
+        puntos, _ = normalizar(puntos, aspecto=aspecto)
+        angulos, doblados, distancias = caracteristicas_dedos(puntos)
+    else:
+        angulos = caracteristicas['angulos']
+        doblados = caracteristicas['doblados']
+        distancias = caracteristicas['distancias']
+    
+    palma = np.linalg.norm(puntos[:, _MEDIO_MCP] - puntos[:, MUÑECA], axis=-1, keepdims=True)
+    palma = np.maximum(palma, 1e-6)
+    alturas = (puntos[:, DEDOS_TIP, 1] - puntos[:, MUÑECA, 1:2]) / palma
+    
+    return np.concatenate([
+        angulos / 180.0,
+        doblados,
+        distancias / palma,
+        alturas
+    ], axis=-1).astype(np.float32)
+
+
+class _Modelo:
+    """Normalización y predicción comunes a los modelos"""
+    
+    tipo = None
+    
+    def __init__(self, clases, media, escala):
+        self.clases = np.array(clases, dtype=object)
+        self.media = media
+        self.escala = escala
+        # Etiquetas de salida: la clase sin gesto se reporta como None
+        self.etiquetas = np.array([c if c != SIN_GESTO else None for c in clases], dtype=object)
+    
+    def probabilidades(self, X):
+        """Probabilidad de cada clase, (N, K) en el orden de self.clases"""
+        raise NotImplementedError
+    
+    def predecir(self, puntos, caracteristicas=None, confianza_minima=0.0, aspecto=None):
+        """
+        Clasifica un lote de manos
+        
+        Args:
+            puntos: Array (N, 21, 3)
+            caracteristicas: Características ya calculadas (opcional)
+            confianza_minima: Por debajo de esta probabilidad la mano queda sin gesto
+            aspecto: Ancho / alto del frame (solo si no se pasan características)
+        
+        Returns:
+            tuple: (gestos (N,) con la letra o None, probabilidades (N, K))
+        """
+        X = vector_caracteristicas(puntos, caracteristicas, aspecto)
+        probabilidades = self.probabilidades(X)
+        mejor = probabilidades.argmax(axis=-1)
+        gestos = self.etiquetas[mejor]
+        gestos[probabilidades[np.arange(len(mejor)), mejor] < confianza_minima] = None
+        return gestos, probabilidades
+    
+    def parametros(self):
+        """Arrays que se guardan en el archivo del modelo"""
+        raise NotImplementedError
+    
+    def _normalizar(self, X):
+        return (X - self.media) / self.escala
+    
+    @staticmethod
+    def _estadisticas(X):
+        """Media y escala de cada columna (escala 1 en columnas constantes)"""
+        media = X.mean(axis=0)
+        escala = X.std(axis=0)
+        escala[escala < 1e-6] = 1.0
+        return media.astype(np.float32), escala.astype(np.float32)
+
+
+class ClasificadorCentroides(_Modelo):
+    """
+    Centroide más cercano sobre las características estandarizadas
+    
+    La confianza es un softmax de -d²/2 (gaussianas de varianza unitaria
+    alrededor de cada centroide).
+    """
+    
+    tipo = 'centroides'
+    
+    def __init__(self, clases, media, escala, centroides):
+        super().__init__(clases, media, escala)
+        self.centroides = centroides
+    
+    @classmethod
+    def entrenar(cls, X, y, clases):
+        """
+        Args:
+            X: Array (N, F) de vector_caracteristicas
+            y: Índice de clase de cada fila (N,)
+            clases: Nombres de las clases
+        """
+        media, escala = cls._estadisticas(X)
+        Z = (X - media) / escala
+        centroides = np.stack([Z[y == k].mean(axis=0) for k in range(len(clases))])
+        return cls(clases, media, escala, centroides.astype(np.float32))
+    
+    def probabilidades(self, X):
+        Z = self._normalizar(X)
+        # |z - c|² = |z|² - 2 z·c + |c|² (una sola multiplicación de matrices)
+        d2 = ((Z * Z).sum(axis=1, keepdims=True) - 2 * Z @ self.centroides.T
+              + (self.centroides * self.centroides).sum(axis=1))
+        return _softmax(-0.5 * d2)
+    
+    def parametros(self):
+        return {'centroides': self.centroides}
+
+
+class ClasificadorMLP(_Modelo):
+    """Perceptrón de una capa oculta (ReLU) con salida softmax"""
+    
+    tipo = 'mlp'
+    
+    def __init__(self, clases, media, escala, W1, b1, W2, b2):
+        super().__init__(clases, media, escala)
+        self.W1, self.b1, self.W2, self.b2 = W1, b1, W2, b2
+    
+    @classmethod
+    def entrenar(cls, X, y, clases, ocultas=32, epocas=300, tasa_aprendizaje=0.01, semilla=0):
+        """
+        Entrena con descenso de gradiente por lote completo (Adam)
+        
+        Cada mano pesa en la pérdida de forma inversa a la frecuencia de su
+        clase, para que las vocales poco grabadas no se pierdan frente a
+        las manos sin gesto.
+        
+        Args:
+            X: Array (N, F) de vector_caracteristicas
+            y: Índice de clase de cada fila (N,)
+            clases: Nombres de las clases
+            ocultas: Neuronas de la capa oculta
+            epocas: Iteraciones sobre todo el conjunto
+            tasa_aprendizaje: Paso de Adam
+            semilla: Semilla de la inicialización
+        """
+        rng = np.random.default_rng(semilla)
+        media, escala = cls._estadisticas(X)
+        Z = ((X - media) / escala).astype(np.float32)
+        f = Z.shape[1]
+        k = len(clases)
+        objetivo = np.eye(k, dtype=np.float32)[y]
+        conteos = np.bincount(y, minlength=k)
+        pesos = (1.0 / (k * np.maximum(conteos, 1)))[y, None].astype(np.float32)
+        
+        parametros = [
+            (rng.standard_normal((f, ocultas)) * np.sqrt(2 / f)).astype(np.float32),
+            np.zeros(ocultas, dtype=np.float32),
+            (rng.standard_normal((ocultas, k)) * np.sqrt(1 / ocultas)).astype(np.float32),
+            np.zeros(k, dtype=np.float32),
+        ]
+        m = [np.zeros_like(p) for p in parametros]
+        v = [np.zeros_like(p) for p in parametros]
+        beta1, beta2 = 0.9, 0.999
+        
+        for t in range(1, epocas + 1):
+            W1, b1, W2, b2 = parametros
+            oculta = np.maximum(Z @ W1 + b1, 0)
+            error = (_softmax(oculta @ W2 + b2) - objetivo) * pesos
+            d_oculta = (error @ W2.T) * (oculta > 0)
+            gradientes = [Z.T @ d_oculta, d_oculta.sum(axis=0), oculta.T @ error, error.sum(axis=0)]
+            
+            for i, g in enumerate(gradientes):
+                m[i] = beta1 * m[i] + (1 - beta1) * g
+                v[i] = beta2 * v[i] + (1 - beta2) * g * g
+                m_hat = m[i] / (1 - beta1 ** t)
+                v_hat = v[i] / (1 - beta2 ** t)
+                parametros[i] -= tasa_aprendizaje * m_hat / (np.sqrt(v_hat) + 1e-8)
+        
+        return cls(clases, media, escala, *parametros)
+    
+    def probabilidades(self, X):
+        oculta = np.maximum(self._normalizar(X) @ self.W1 + self.b1, 0)
+        return _softmax(oculta @ self.W2 + self.b2)
+    
+    def parametros(self):
+        return {'W1': self.W1, 'b1': self.b1, 'W2': self.W2, 'b2': self.b2}
+
+
+MODELOS = {modelo.tipo: modelo for modelo in (ClasificadorCentroides, ClasificadorMLP)}
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def guardar_modelo(modelo, ruta):
+    """Guarda el modelo en un archivo .npz"""
+    np.savez(ruta, tipo=modelo.tipo, clases=np.array(modelo.clases, dtype=str),
+             media=modelo.media, escala=modelo.escala, **modelo.parametros())
+
+
+def cargar_modelo(ruta):
+    """Carga un modelo guardado con guardar_modelo"""
+    with np.load(ruta) as datos:
+        tipo = str(datos['tipo'])
+        if tipo not in MODELOS:
+            raise ValueError(f"{ruta}: tipo de modelo desconocido '{tipo}'")
+        arrays = {clave: datos[clave] for clave in datos.files if clave not in ('tipo', 'clases')}
+        return MODELOS[tipo](datos['clases'].tolist(), **arrays)
+
+
+# ========== ENTRENAMIENTO Y EVALUACIÓN ==========
+
+def cargar_ejemplos(etiquetadas, detector=None):
+    """
+    Lee grabaciones de landmarks con su etiqueta
+    
+    Args:
+        etiquetadas: Lista de 'ETIQUETA=ruta' ('ninguno' = sin gesto) o,
+                     si se pasa detector, rutas sin etiqueta
+        detector: GestureDetector cuyas reglas etiquetan cada mano
+    
+    Returns:
+        tuple: (puntos (N, 21, 3), etiquetas (N,) de texto,
+                aspectos (N,) ancho / alto del frame de cada mano)
+    """
+    from landmarkrecorder import LandmarkReplay
+    
+    puntos, etiquetas, aspectos = [], [], []
+    for entrada in etiquetadas:
+        etiqueta, separador, ruta = entrada.rpartition('=')
+        if not separador and detector is None:
+            raise ValueError(f"Falta la etiqueta en '{entrada}' (formato VOCAL=ruta)")
+        replay = LandmarkReplay(ruta)
+        manos = np.asarray(replay.landmarks, dtype=np.float64)
+        aspecto = replay.aspecto or aspecto_por_defecto()
+        if detector is not None and not separador:
+            gestos = detector.reglas_lote(manos, aspecto=aspecto)
+            etiquetas.append(np.array([g or SIN_GESTO for g in gestos], dtype=object))
+        else:
+            etiqueta = SIN_GESTO if etiqueta == NOMBRE_SIN_GESTO else etiqueta
+            etiquetas.append(np.full(len(manos), etiqueta, dtype=object))
+        puntos.append(manos)
+        aspectos.append(np.full(len(manos), aspecto))
+        print(f"  {ruta}: {len(manos)} manos")
+    
+    if not puntos:
+        return np.zeros((0, 21, 3)), np.zeros(0, dtype=object), np.zeros(0)
+    return np.concatenate(puntos), np.concatenate(etiquetas), np.concatenate(aspectos)
+
+
+def evaluar(nombre, clasificar, puntos, etiquetas, aspectos, repeticiones=5):
+    """
+    Mide exactitud y velocidad de una función de clasificación por lotes
+    
+    Args:
+        clasificar: Función (puntos (N, 21, 3), aspectos (N,)) -> gestos (N,)
+                    con None = sin gesto
+    
+    Returns:
+        dict: exactitud global, exactitud por clase y manos por segundo
+    """
+    gestos = clasificar(puntos, aspectos)
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        clasificar(puntos, aspectos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    
+    predichas = np.array([g or SIN_GESTO for g in gestos], dtype=object)
+    aciertos = predichas == etiquetas
+    por_clase = {clase: float(aciertos[etiquetas == clase].mean())
+                 for clase in sorted(set(etiquetas.tolist()))}
+    
+    print(f"{nombre}: exactitud {aciertos.mean():.3f}, "
+          f"{len(puntos) / mejor:,.0f} manos/s ({mejor * 1000:.2f} ms para {len(puntos)})")
+    print("  " + ", ".join(f"{clase or NOMBRE_SIN_GESTO}: {valor:.3f}" for clase, valor in por_clase.items()))
+    return {'exactitud': float(aciertos.mean()), 'por_clase': por_clase, 'manos_por_s': len(puntos) / mejor}
+
+
+def main():
+    """Entrena un modelo con grabaciones etiquetadas o lo compara con las reglas"""
+    from gesturedetector import GestureDetector
+    
+    parser = argparse.ArgumentParser(description='Clasificador aprendido de gestos')
+    sub = parser.add_subparsers(dest='comando', required=True)
+    
+    entrenar = sub.add_parser('entrenar', help='Entrenar un modelo')
+    entrenar.add_argument('grabaciones', nargs='+',
+                          help=f"VOCAL=ruta por grabación ('{NOMBRE_SIN_GESTO}=ruta' para manos sin gesto)")
+    entrenar.add_argument('-o', '--salida', default=CLASSIFIER_CONFIG['modelo'])
+    entrenar.add_argument('--tipo', choices=sorted(MODELOS), default=CLASSIFIER_CONFIG['tipo'])
+    entrenar.add_argument('--reglas', action='store_true',
+                          help='Etiquetar las grabaciones sin VOCAL= con las reglas actuales')
+    entrenar.add_argument('--validacion', type=float, default=0.2,
+                          help='Fracción de manos reservada para evaluar')
+    
+    comparar = sub.add_parser('evaluar', help='Comparar un modelo con las reglas')
+    comparar.add_argument('modelo')
+    comparar.add_argument('grabaciones', nargs='+', help='VOCAL=ruta por grabación')
+    args = parser.parse_args()
+    
+    detector = GestureDetector()
+    print("Leyendo grabaciones...")
+    puntos, etiquetas, aspectos = cargar_ejemplos(
+        args.grabaciones, detector if args.comando == 'entrenar' and args.reglas else None)
+    if len(puntos) == 0:
+        parser.error("las grabaciones no tienen manos")
+    
+    if args.comando == 'evaluar':
+        modelo = cargar_modelo(args.modelo)
+        minima = CLASSIFIER_CONFIG['confianza_minima']
+        evaluar('reglas', detector.reglas_lote, puntos, etiquetas, aspectos)
+        evaluar(f'modelo ({modelo.tipo})',
+                lambda manos, aspecto: modelo.predecir(manos, confianza_minima=minima, aspecto=aspecto)[0],
+                puntos, etiquetas, aspectos)
+        return
+    
+    # Separar entrenamiento y validación
+    rng = np.random.default_rng(0)
+    orden = rng.permutation(len(puntos))
+    n_validacion = int(len(puntos) * args.validacion)
+    validacion, entrenamiento = orden[:n_validacion], orden[n_validacion:]
+    
+    clases = sorted(set(etiquetas.tolist()))
+    y = np.array([clases.index(e) for e in etiquetas])
+    X = vector_caracteristicas(puntos[entrenamiento], aspecto=aspectos[entrenamiento])
+    
+    inicio = time.perf_counter()
+    if args.tipo == 'mlp':
+        modelo = ClasificadorMLP.entrenar(X, y[entrenamiento], clases,
+                                          ocultas=CLASSIFIER_CONFIG['ocultas'],
+                                          epocas=CLASSIFIER_CONFIG['epocas'],
+                                          tasa_aprendizaje=CLASSIFIER_CONFIG['tasa_aprendizaje'])
+    else:
+        modelo = ClasificadorCentroides.entrenar(X, y[entrenamiento], clases)
+    print(f"✓ Modelo '{args.tipo}' entrenado con {len(entrenamiento)} manos en "
+          f"{time.perf_counter() - inicio:.2f}s (clases: {', '.join(c or NOMBRE_SIN_GESTO for c in clases)})")
+    
+    if n_validacion:
+        evaluar('reglas', detector.reglas_lote, puntos[validacion], etiquetas[validacion],
+                aspectos[validacion])
+        evaluar(f'modelo ({args.tipo})', lambda manos, aspecto: modelo.predecir(manos, aspecto=aspecto)[0],
+                puntos[validacion], etiquetas[validacion], aspectos[validacion])
+    
+    guardar_modelo(modelo, args.salida)
+    print(f"✓ Modelo guardado en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,12 +17,184 @@ CAMERA_CONFIG = {
     'width': 1280,
     'height': 720,
     'fps': 30,
-    'backend': 'cv2.CAP_DSHOW'  # Windows
+    'backend': 'cv2.CAP_DSHOW',  # Windows
+    'espejo': 'imagen'         # 'imagen' (voltear el frame en el lugar) o 'landmarks'
+                               # (inferir sin voltear y reflejar x de los landmarks)
+}
+
+# ========== ARRANQUE ==========
+STARTUP_CONFIG = {
+    'paralelo': True           # Cargar modelo, cámara y audio a la vez
+}
+
+# ========== CONFIGURACIÓN DEL PIPELINE ==========
+PIPELINE_CONFIG = {
+    'modo': 'secuencial',      # 'secuencial' o 'hilos' (captura | inferencia | render)
+    'tamaño_cola': 1           # Frames por cola; al llenarse se descarta el más viejo
+}
+
+# ========== MODO SIN VENTANA (SERVIDORES) ==========
+HEADLESS_CONFIG = {
+    'activo': False,           # Sin dibujo ni ventana: resultados como eventos JSONL
+    'eventos': 'eventos.jsonl',  # Un evento JSON por línea (None = no escribir)
+    'intervalo_flush': 1.0,    # Segundos entre escrituras al disco de los eventos
+    'video': None,             # Video anotado opcional, ej. 'anotado.mp4'
+    'video_cada': 5,           # Se anota 1 de cada N frames
+    'video_fps': None,         # None = fps de la cámara / video_cada
+    'video_codec': 'mp4v',
+    'tamaño_cola_video': 8,    # Frames pendientes de codificar; si se llena se descartan
+    'frames_maximos': None,    # Terminar tras N frames (None = hasta que falle la captura)
+    'audio': False             # Reproducir los gestos también sin ventana
+}
+
+# ========== SERVIDOR DE VARIAS CÁMARAS ==========
+SERVER_CONFIG = {
+    'trabajadores': 2,         # Hilos de inferencia compartidos entre todas las estaciones
+    'tamaño_cola': 1,          # Frames pendientes por estación; al llenarse se descarta el más viejo
+    'eventos': 'eventos_{indice}.jsonl',  # Eventos por estación (None = no escribir)
+    'velocidad_archivos': 1.0,  # Ritmo de los videos respecto a su fps (0 = lo más rápido posible)
+    'intervalo_estadisticas': 5,  # Segundos entre reportes (0 = solo al terminar)
+    'archivo_estadisticas': None,  # JSONL de estadísticas (None = consola)
+    'audio': False             # Reproducir los gestos confirmados en este equipo
+}
+
+# ========== BUS DE EVENTOS ==========
+EVENTBUS_CONFIG = {
+    'activo': False,           # Publicar detecciones, confirmaciones y liberaciones (app y servidor)
+    'direccion': '127.0.0.1:8765',  # 'host:puerto' o ruta de socket Unix (None = solo en proceso)
+    'estacion': 'local',       # Nombre de la fuente en los eventos de la app
+    'tamaño_cola': 1024,       # Eventos pendientes por suscriptor; al llenarse se descartan los más viejos
+    'lote_maximo': 256         # Eventos máximos entregados de una vez
+}
+
+# ========== REGIÓN DE INTERÉS (ROI) ==========
+ROI_CONFIG = {
+    'activo': False,           # Procesar solo la zona de las manos del frame anterior
+    'margen': 0.3,             # Relleno alrededor de cada mano (fracción de su tamaño)
+    'intervalo_completo': 30,  # Cada cuántos frames se vuelve a buscar en el frame completo
+    'area_maxima': 0.6         # Si el recorte supera esta fracción del frame, usar el frame completo
+}
+
+# ========== INFERENCIA CADA K FRAMES ==========
+SCHEDULER_CONFIG = {
+    'activo': False,           # Ejecutar MediaPipe cada k frames y extrapolar los landmarks en los demás
+    'intervalo_maximo': 4,     # k con las manos quietas (1 = inferir siempre)
+    'velocidad_quieta': 0.3,   # Palmas por segundo bajo las que se usa intervalo_maximo
+    'velocidad_rapida': 2.0,   # Palmas por segundo desde las que se infiere en cada frame
+    'suavizado': 0.5           # Peso de la velocidad recién medida frente a la anterior
+}
+
+# ========== CONTROL ADAPTATIVO DE CALIDAD ==========
+ADAPTIVE_CONFIG = {
+    'activo': False,           # Ajustar modelo, resolución y manos según el tiempo por frame
+    'presupuesto_ms': 25,      # Tiempo objetivo de preproceso + inferencia por frame
+    'ventana': 30,             # Frames medidos antes de cada decisión
+    'margen_mejora': 0.6,      # Mejorar solo si la mediana queda bajo este % del presupuesto
+    'ventanas_para_mejorar': 3,  # Ventanas holgadas seguidas antes de mejorar (histéresis)
+    # Niveles del más preciso al más barato; 'escala' reduce la imagen de entrada
+    'niveles': [
+        {'model_complexity': 1, 'escala': 1.0, 'max_num_hands': 4},
+        {'model_complexity': 0, 'escala': 1.0, 'max_num_hands': 4},
+        {'model_complexity': 0, 'escala': 0.75, 'max_num_hands': 2},
+        {'model_complexity': 0, 'escala': 0.5, 'max_num_hands': 2},
+        {'model_complexity': 0, 'escala': 0.5, 'max_num_hands': 1},
+    ]
+}
+
+# ========== MÉTRICAS POR ETAPA ==========
+METRICS_CONFIG = {
+    'ventana': 300,              # Frames recientes usados para p50/p95/p99
+    'overlay': True,             # Mostrar latencia por etapa sobre el video
+    'refresco_overlay': 0.5,     # Segundos entre actualizaciones del overlay
+    'intervalo_exportacion': 10.0,  # Segundos entre exportaciones (0 = nunca)
+    'archivo': None              # Archivo JSON Lines (None = imprimir en consola)
+}
+
+# ========== CONFIGURACIÓN DEL MODO POR LOTES ==========
+BATCH_CONFIG = {
+    'espejo': True,            # Voltear frames como en la app en vivo
+    'extensiones_imagen': ('.jpg', '.jpeg', '.png', '.bmp'),
+    'salida': 'resultados.csv',
+    'procesos': 1,              # Procesos en paralelo (0 = todos los núcleos)
+    'frames_por_tramo': 3000,   # Videos largos se dividen en tramos de este tamaño
+    'frames_calentamiento': 30  # Frames previos a cada tramo para estabilizar tracking y buffers
+}
+
+# ========== GRABACIÓN DE LANDMARKS ==========
+RECORDING_CONFIG = {
+    'ruta': None,              # Archivo donde la app en vivo graba los landmarks (None = no grabar)
+    'salida_reproduccion': 'reproduccion.csv'
+}
+
+# ========== CONFIGURACIÓN DE BENCHMARKS ==========
+BENCHMARK_CONFIG = {
+    'muestras': 500,                   # Muestras de tiempo por benchmark
+    'tamaños_lote': [1, 4, 64, 1024],  # Manos por llamada a detectar_vocales_lote
+    'manos_por_frame': [1, 4],         # Manos por frame en el bucle de la app
+    'tamaño_frame': (1280, 720),
+    'tolerancia': 0.25,                # Aumento del p50 tolerado con --comparar
+    'manos_concordancia': 20000,       # Manos sintéticas con --concordancia
+    'concordancia_minima': 0.95        # Fracción mínima de vocales iguales con y sin normalización
 }
 
 # ========== CONFIGURACIÓN DE DETECCIÓN ==========
 DETECTION_CONFIG = {
     'frames_confirmacion': 3,  # Frames consecutivos para confirmar gesto
+    'frames_por_vocal': {},    # Ventana particular por vocal, ej. {'E': 5}
+    'modo_confirmacion': 'consecutivo',  # 'consecutivo' o 'mayoria' (votación con histéresis)
+    'umbral_entrada': 0.8,     # Modo mayoría: fracción de la ventana para confirmar
+    'umbral_salida': 0.5,      # Modo mayoría: fracción bajo la cual se libera
+    'frames_olvido': 30,       # Frames sin ver una mano antes de borrar su estado
+    'tolerancia_cache': None   # Movimiento máximo para reutilizar características (ej. 0.002; None = sin caché)
+}
+
+# ========== NORMALIZACIÓN DE LA MANO ==========
+# Con la normalización activa las características se calculan en el marco de la
+# mano (origen en la muñeca, palma vertical y de largo palma_referencia) y las
+# reglas usan DISTANCE_THRESHOLDS_PALMA y GESTURE_TOLERANCES_PALMA, que no
+# cambian con la distancia a la cámara ni con la inclinación de la mano.
+# Concordancia con las reglas en coordenadas de imagen: python benchmark.py --concordancia
+NORMALIZATION_CONFIG = {
+    'activo': False,
+    'palma_referencia': 0.15,  # Largo muñeca -> MCP del medio para el que están pensados los umbrales
+    'aspecto': None            # Ancho / alto si no se conoce el frame (None = el de CAMERA_CONFIG)
+}
+
+# ========== DELETREO ==========
+SPELLING_CONFIG = {
+    'activo': False,           # Armar letras y palabras con los gestos confirmados
+    'lexico': None,            # Palabras para completar (una por línea, opcional "palabra frecuencia")
+    'sugerencias': 3,          # Completados por prefijo
+    'pausa_palabra': 1.5,      # Segundos sin letra que cierran la palabra
+    'pausa_repeticion': 0.15,  # Liberación mínima para repetir la misma letra (menos = parpadeo)
+    'retencion_repeticion': None  # Segundos sosteniendo una letra para repetirla (None = soltar y volver)
+}
+
+# ========== CLASIFICADOR APRENDIDO ==========
+CLASSIFIER_CONFIG = {
+    'backend': 'reglas',       # 'reglas' (GESTURE_DEFINITIONS) o 'modelo'
+    'modelo': 'modelo_gestos.npz',  # Archivo generado con: python classifier.py entrenar
+    'confianza_minima': 0.6,   # Probabilidad mínima para aceptar la clase del modelo
+    'tipo': 'mlp',             # Modelo por defecto al entrenar: 'centroides' o 'mlp'
+    'ocultas': 32,             # MLP: neuronas de la capa oculta
+    'epocas': 300,             # MLP: iteraciones de descenso de gradiente
+    'tasa_aprendizaje': 0.01
+}
+
+# ========== SEGUIMIENTO DE MANOS ==========
+TRACKING_CONFIG = {
+    'distancia_maxima': 0.25,  # Costo a partir del cual una mano recibe un ID nuevo
+    'penalizacion_lado': 0.2,  # Costo extra si cambia la lateralidad (Left/Right)
+    'frames_perdida': 10       # Frames sin ver un ID antes de descartarlo
+}
+
+# ========== SUAVIZADO DE LANDMARKS ==========
+FILTER_CONFIG = {
+    'tipo': None,              # None, 'one_euro' o 'exponencial'
+    'frecuencia_minima': 1.5,  # One-Euro: corte (Hz) con la mano quieta
+    'beta': 10.0,              # One-Euro: aumento del corte con la velocidad
+    'frecuencia_derivada': 1.0,  # One-Euro: corte (Hz) de la velocidad
+    'alfa': 0.5                # Exponencial: peso del frame nuevo
 }
 
 # ========== UMBRALES DE DISTANCIA ==========
@@ -33,6 +205,15 @@ DISTANCE_THRESHOLDS = {
     'lejos': 0.18
 }
 
+# Los mismos umbrales en largos de palma (muñeca -> MCP del medio), usados con
+# NORMALIZATION_CONFIG['activo']
+DISTANCE_THRESHOLDS_PALMA = {
+    'muy_cerca': 0.27,
+    'cerca': 0.53,
+    'medio': 0.8,
+    'lejos': 1.2
+}
+
 # ========== UMBRALES DE ÁNGULOS ==========
 ANGLE_THRESHOLDS = {
     'doblado': 140,      # grados - menos de esto está doblado
@@ -41,6 +222,12 @@ ANGLE_THRESHOLDS = {
 
 # ========== CONFIGURACIÓN DE AUDIO ==========
 AUDIO_CONFIG = {
+    'motor': 'pygame',         # 'pygame' (mixer) o 'pcm' (PCM en memoria + hilo de mezcla)
+    'salida': 'dispositivo',   # Motor pcm: 'dispositivo', 'nula' o 'archivo' (sin tarjeta de sonido)
+    'archivo_salida': 'audio_salida.wav',  # WAV generado con salida 'archivo'
+    'frecuencia': 44100,
+    'canales': 2,
+    'tamaño_bloque': 256,      # Muestras por bloque: menor = menos latencia, más CPU
     'archivos': {
         'A': 'A.WAV',
         'E': 'e.mp3',
@@ -73,7 +260,8 @@ VISUAL_CONFIG = {
         'fuente_info': 0.6,
         'fuente_gesto': 1.0,
         'fuente_detectando': 0.7,
-        'fuente_fps': 0.8
+        'fuente_fps': 0.8,
+        'fuente_metricas': 0.45
     }
 }
 
@@ -94,4 +282,65 @@ GESTURE_TOLERANCES = {
     'E': {
         'pulgar_toca_dedos': True  # Pulgar debe tocar los dedos doblados
     }
+}
+
+# Tolerancias de longitud en largos de palma, usadas con NORMALIZATION_CONFIG['activo']
+GESTURE_TOLERANCES_PALMA = {
+    **GESTURE_TOLERANCES,
+    'O': {
+        'variacion_altura_max': 0.53
+    },
+    'U': {
+        'diferencia_altura_max': 0.33
+    }
+}
+
+# ========== DEFINICIÓN DE GESTOS ==========
+# Cada gesto es una lista de condiciones (característica, operador, valor) que
+# deben cumplirse todas. El orden del dict es la prioridad: gana el primero que
+# se cumple. Los valores de texto apuntan a los umbrales de arriba:
+# 'umbral.<clave>' (DISTANCE_THRESHOLDS), 'angulo.<clave>' (ANGLE_THRESHOLDS)
+# y 'tolerancia.<gesto>.<clave>' (GESTURE_TOLERANCES).
+# Características disponibles: ver ruleengine.CARACTERISTICAS
+GESTURE_DEFINITIONS = {
+    # A: puño cerrado con pulgar al costado
+    'A': [
+        ('todos_doblados', '==', True),
+        ('angulo_indice', '<', 'angulo.doblado'),
+        ('angulo_medio', '<', 'angulo.doblado'),
+        ('pulgar_mcp', '>', 'umbral.medio'),
+        ('pulgar_indice', '>', 'umbral.cerca'),
+    ],
+    # E: dedos doblados tocando el pulgar
+    'E': [
+        ('todos_doblados', '==', True),
+        ('angulo_indice', '<', 'angulo.doblado'),
+        ('pulgar_indice', '<', 'umbral.cerca'),
+    ],
+    # I: solo meñique extendido y más alto que el medio
+    'I': [
+        ('doblado_indice', '==', True),
+        ('doblado_medio', '==', True),
+        ('doblado_anular', '==', True),
+        ('doblado_meñique', '==', False),
+        ('angulo_meñique', '>', 'angulo.extendido'),
+        ('meñique_sobre_medio', '==', True),
+    ],
+    # O: dedos formando círculo
+    'O': [
+        ('promedio_adyacentes', '<', 'umbral.medio'),
+        ('todos_doblados', '==', False),
+        ('variacion_altura_puntas', '<', 'tolerancia.O.variacion_altura_max'),
+    ],
+    # U: índice y medio extendidos juntos
+    'U': [
+        ('doblado_indice', '==', False),
+        ('doblado_medio', '==', False),
+        ('angulo_indice', '>', 'angulo.extendido'),
+        ('angulo_medio', '>', 'angulo.extendido'),
+        ('doblado_anular', '==', True),
+        ('doblado_meñique', '==', True),
+        ('indice_medio', '<', 'umbral.cerca'),
+        ('diferencia_altura_indice_medio', '<', 'tolerancia.U.diferencia_altura_max'),
+    ],
 }
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+confirmation.py
+Confirmación de gestos con buffers circulares de tamaño fijo (tiempo constante por frame)
+"""
+
+import math
+
+
+class _EstadoMano:
+    """Estado de confirmación de una mano (se reutiliza, no se reasigna por frame)"""
+    
+    __slots__ = ('historial', 'posicion', 'llenos', 'conteos',
+                 'actual', 'racha', 'confirmada', 'ausente')
+    
+    def __init__(self, tamaño, etiquetas):
+        self.historial = [0] * tamaño    # Códigos de los últimos frames (buffer circular)
+        self.conteos = [0] * etiquetas   # Apariciones de cada código en el historial
+        self.reiniciar()
+    
+    def reiniciar(self):
+        """Vacía el estado sin crear listas nuevas"""
+        self.posicion = 0
+        self.llenos = 0
+        for i in range(len(self.conteos)):
+            self.conteos[i] = 0
+        self.actual = -1                 # Código de la racha actual
+        self.racha = 0                   # Frames consecutivos con ese código
+        self.confirmada = -1             # Código confirmado (modo mayoría)
+        self.ausente = 0                 # Frames seguidos sin ver la mano
+
+
+class ConfirmationEngine:
+    """
+    Confirma gestos por mano
+    
+    Modos:
+        'consecutivo': el gesto se confirma tras N frames seguidos iguales
+                       (contador de racha, equivalente al buffer original)
+        'mayoria': el gesto se confirma cuando ocupa al menos umbral_entrada
+                   de su ventana y se mantiene mientras no baje de
+                   umbral_salida (histéresis) o aparezca otro gesto confirmado
+    
+    Cada gesto puede tener su propia ventana (frames_por_gesto); en modo
+    mayoría todas comparten un buffer circular del tamaño de la mayor.
+    """
+    
+    def __init__(self, etiquetas, frames_confirmacion=3, frames_por_gesto=None,
+                 modo='consecutivo', umbral_entrada=0.8, umbral_salida=0.5, frames_olvido=0):
+        """
+        Args:
+            etiquetas: Gestos posibles, incluido None (sin gesto)
+            frames_confirmacion: Ventana por defecto
+            frames_por_gesto: Dict {gesto: frames} con ventanas particulares
+            modo: 'consecutivo' o 'mayoria'
+            umbral_entrada: Fracción de la ventana para confirmar (modo mayoría)
+            umbral_salida: Fracción por debajo de la cual se libera (modo mayoría)
+            frames_olvido: Frames de ausencia tras los que se borra una mano (0 = nunca)
+        """
+        if modo not in ('consecutivo', 'mayoria'):
+            raise ValueError(f"Modo de confirmación desconocido: {modo}")
+        
+        self.etiquetas = tuple(etiquetas)
+        self.codigos = {etiqueta: i for i, etiqueta in enumerate(self.etiquetas)}
+        self.modo = modo
+        self.frames_olvido = frames_olvido
+        
+        frames_por_gesto = frames_por_gesto or {}
+        self.requeridos = [frames_por_gesto.get(e, frames_confirmacion) for e in self.etiquetas]
+        self.tamaño = max(self.requeridos)
+        self.entrada = [max(1, math.ceil(umbral_entrada * r)) for r in self.requeridos]
+        self.salida = [max(1, math.ceil(umbral_salida * r)) for r in self.requeridos]
+        
+        self.estados = {}
+    
+    def actualizar(self, i_mano, gesto):
+        """
+        Agrega el gesto detectado en este frame
+        
+        Args:
+            i_mano: Identificador de la mano
+            gesto: Gesto detectado (None si no hay)
+        
+        Returns:
+            str: Gesto confirmado o None
+        """
+        estado = self.estados.get(i_mano)
+        if estado is None:
+            estado = self.estados[i_mano] = _EstadoMano(self.tamaño, len(self.etiquetas))
+        estado.ausente = 0
+        codigo = self.codigos[gesto]
+        
+        if self.modo == 'consecutivo':
+            if codigo == estado.actual:
+                if estado.racha < self.tamaño:
+                    estado.racha += 1
+            else:
+                estado.actual = codigo
+                estado.racha = 1
+            return gesto if estado.racha >= self.requeridos[codigo] else None
+        
+        # Buffer circular: sale el código más viejo, entra el nuevo
+        if estado.llenos == self.tamaño:
+            estado.conteos[estado.historial[estado.posicion]] -= 1
+        else:
+            estado.llenos += 1
+        estado.historial[estado.posicion] = codigo
+        estado.conteos[codigo] += 1
+        estado.posicion = (estado.posicion + 1) % self.tamaño
+        
+        confirmada = estado.confirmada
+        if confirmada >= 0 and estado.conteos[confirmada] < self.salida[confirmada]:
+            confirmada = -1
+        if codigo != confirmada and estado.conteos[codigo] >= self.entrada[codigo]:
+            confirmada = codigo
+        estado.confirmada = confirmada
+        
+        return self.etiquetas[confirmada] if confirmada >= 0 else None
+    
+    def limpiar(self, i_mano):
+        """Reinicia la confirmación de una mano"""
+        estado = self.estados.get(i_mano)
+        if estado is not None:
+            estado.reiniciar()
+    
+    def olvidar(self, i_mano):
+        """Elimina el estado de una mano"""
+        self.estados.pop(i_mano, None)
+    
+    def olvidar_ausentes(self, presentes):
+        """
+        Cuenta un frame de ausencia para las manos que no están en presentes
+        y elimina las que superaron frames_olvido
+        
+        Args:
+            presentes: Identificadores de las manos vistas en este frame
+        
+        Returns:
+            list: Identificadores eliminados
+        """
+        if not self.frames_olvido:
+            return []
+        
+        eliminadas = []
+        for i_mano, estado in self.estados.items():
+            if i_mano in presentes:
+                continue
+            estado.ausente += 1
+            if estado.ausente > self.frames_olvido:
+                eliminadas.append(i_mano)
+        for i_mano in eliminadas:
+            del self.estados[i_mano]
+        return eliminadas
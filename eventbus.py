@@ -0,0 +1,311 @@
+"""
+eventbus.py
+Bus de eventos asyncio: detecciones, confirmaciones y liberaciones para otros procesos
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import threading
+import time
+from config import EVENTBUS_CONFIG
+
+
+class Suscripcion:
+    """
+    Eventos pendientes de un consumidor
+    
+    La cola es acotada y descarta los eventos más viejos: un consumidor lento
+    pierde eventos (se cuentan en `descartados`) pero nunca frena al bus ni
+    al bucle de frames. Se recorre con `async for lote in suscripcion`, donde
+    cada lote es la lista de todos los eventos acumulados desde la vuelta anterior.
+    """
+    
+    def __init__(self, bus, tamaño, tipos=None, lote_maximo=None):
+        self.bus = bus
+        self.pendientes = collections.deque(maxlen=tamaño)
+        self.tipos = set(tipos) if tipos else None
+        self.lote_maximo = lote_maximo
+        self.descartados = 0
+        self.cerrada = False
+        self._aviso = asyncio.Event()
+    
+    def _entregar(self, eventos):
+        """Agrega un lote (se ejecuta en el loop del bus)"""
+        for evento in eventos:
+            if self.tipos is not None and evento['tipo'] not in self.tipos:
+                continue
+            if len(self.pendientes) == self.pendientes.maxlen:
+                self.descartados += 1
+            self.pendientes.append(evento)
+        if self.pendientes:
+            self._aviso.set()
+    
+    async def recibir(self):
+        """
+        Espera eventos y retorna todos los pendientes (hasta lote_maximo)
+        
+        Returns:
+            list: Eventos en orden de publicación, o [] si la suscripción se cerró
+        """
+        while not self.pendientes and not self.cerrada:
+            self._aviso.clear()
+            await self._aviso.wait()
+        n = len(self.pendientes)
+        if self.lote_maximo:
+            n = min(n, self.lote_maximo)
+        return [self.pendientes.popleft() for _ in range(n)]
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        lote = await self.recibir()
+        if not lote:
+            raise StopAsyncIteration
+        return lote
+    
+    def cancelar(self):
+        """Deja de recibir eventos"""
+        self.cerrada = True
+        self.bus._quitar(self)
+        self._aviso.set()
+
+
+class EventBus:
+    """
+    Publica eventos desde el bucle de frames hacia suscriptores asyncio
+    
+    El loop de asyncio corre en un hilo propio. publicar() solo agrega el
+    evento a una deque y, si el loop no tiene ya un despacho pendiente, lo
+    despierta con call_soon_threadsafe: el costo en el hilo de frames es de
+    microsegundos y los eventos llegan a los suscriptores sin esperar al
+    frame siguiente. Los eventos que se juntan mientras el loop trabaja se
+    entregan como un solo lote.
+    
+    Además de los suscriptores del mismo proceso, el bus puede servir los
+    eventos como líneas JSON en un socket local (TCP 'host:puerto' o la ruta
+    de un socket Unix); cada cliente es una suscripción más, con su propia cola.
+    """
+    
+    def __init__(self, direccion=None, tamaño_cola=1024, lote_maximo=256):
+        """
+        Args:
+            direccion: 'host:puerto' o ruta de socket Unix (None = solo en proceso)
+            tamaño_cola: Eventos pendientes por suscriptor antes de descartar
+            lote_maximo: Eventos máximos por lote entregado
+        """
+        self.direccion = direccion
+        self.tamaño_cola = tamaño_cola
+        self.lote_maximo = lote_maximo
+        
+        self.publicados = 0
+        self.descartados = 0
+        self._entrada = collections.deque(maxlen=tamaño_cola * 4)
+        self._despacho_pendiente = False
+        self._suscripciones = []
+        self._loop = None
+        self._hilo = None
+        self._servidor = None
+    
+    def iniciar(self):
+        """Arranca el loop en su hilo (y el socket si hay dirección)"""
+        listo = threading.Event()
+        errores = []
+        
+        def ejecutar():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                if self.direccion:
+                    self._servidor = loop.run_until_complete(self._abrir_socket())
+            except OSError as e:
+                errores.append(e)
+            else:
+                self._loop = loop
+            listo.set()
+            if not errores:
+                loop.run_forever()
+                # Consumidores que siguen esperando (sus suscripciones ya se cerraron)
+                pendientes = asyncio.all_tasks(loop)
+                for tarea in pendientes:
+                    tarea.cancel()
+                loop.run_until_complete(asyncio.gather(*pendientes, return_exceptions=True))
+            loop.close()
+        
+        self._hilo = threading.Thread(target=ejecutar, name='bus_eventos', daemon=True)
+        self._hilo.start()
+        listo.wait()
+        if errores:
+            raise errores[0]
+    
+    async def _abrir_socket(self):
+        host, separador, puerto = self.direccion.rpartition(':')
+        if separador and puerto.isdigit():
+            return await asyncio.start_server(self._atender, host or '127.0.0.1', int(puerto))
+        return await asyncio.start_unix_server(self._atender, self.direccion)
+    
+    def publicar(self, evento):
+        """
+        Publica un evento (desde cualquier hilo, no bloquea)
+        
+        Args:
+            evento: dict serializable a JSON con la clave 'tipo'
+        """
+        if self._loop is None:
+            return
+        if len(self._entrada) == self._entrada.maxlen:
+            self.descartados += 1
+        self._entrada.append(evento)
+        self.publicados += 1
+        if not self._despacho_pendiente:
+            self._despacho_pendiente = True
+            try:
+                self._loop.call_soon_threadsafe(self._despachar)
+            except RuntimeError:
+                # El loop ya se cerró
+                pass
+    
+    def _despachar(self):
+        """Reparte lo acumulado entre los suscriptores (en el loop)"""
+        self._despacho_pendiente = False
+        lote = []
+        while self._entrada:
+            lote.append(self._entrada.popleft())
+        if not lote:
+            return
+        for suscripcion in tuple(self._suscripciones):
+            suscripcion._entregar(lote)
+    
+    def suscribir(self, tipos=None, tamaño=None):
+        """
+        Crea una suscripción para consumir desde el loop del bus
+        
+        Args:
+            tipos: Tipos de evento a recibir (None = todos)
+            tamaño: Eventos pendientes antes de descartar (None = tamaño_cola)
+        
+        Returns:
+            Suscripcion
+        """
+        suscripcion = Suscripcion(self, tamaño or self.tamaño_cola, tipos, self.lote_maximo)
+        self._suscripciones.append(suscripcion)
+        return suscripcion
+    
+    def ejecutar(self, corrutina):
+        """
+        Ejecuta una corrutina consumidora en el loop del bus
+        
+        Returns:
+            concurrent.futures.Future de la corrutina
+        """
+        return asyncio.run_coroutine_threadsafe(corrutina, self._loop)
+    
+    def _quitar(self, suscripcion):
+        if suscripcion in self._suscripciones:
+            self._suscripciones.remove(suscripcion)
+    
+    async def _atender(self, lector, escritor):
+        """Envía los eventos a un cliente del socket como líneas JSON"""
+        suscripcion = self.suscribir()
+        try:
+            async for lote in suscripcion:
+                escritor.write(b''.join(
+                    json.dumps(evento, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+                    for evento in lote))
+                # Si el cliente no lee, se espera aquí y su cola descarta lo viejo
+                await escritor.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            suscripcion.cancelar()
+            escritor.close()
+    
+    def cerrar(self):
+        """Cierra el socket, termina las suscripciones y detiene el loop"""
+        if self._loop is None:
+            return
+        loop = self._loop
+        self._loop = None
+        
+        async def terminar():
+            if self._servidor is not None:
+                self._servidor.close()
+            for suscripcion in tuple(self._suscripciones):
+                suscripcion.cancelar()
+            await asyncio.sleep(0)
+            loop.stop()
+        
+        asyncio.run_coroutine_threadsafe(terminar(), loop)
+        self._hilo.join(timeout=2.0)
+
+
+def crear_evento(tipo, mano, vocal, estacion=None, tiempo_captura=None):
+    """
+    Arma un evento de gesto
+    
+    Args:
+        tipo: 'deteccion', 'confirmacion' o 'liberacion'
+        mano: ID de la mano (tracker)
+        vocal: Letra (la que se libera, en 'liberacion')
+        estacion: Nombre de la fuente (None = EVENTBUS_CONFIG['estacion'])
+        tiempo_captura: time.perf_counter() al capturar el frame, para la latencia
+    
+    Returns:
+        dict
+    """
+    evento = {
+        'tipo': tipo,
+        'estacion': estacion or EVENTBUS_CONFIG['estacion'],
+        'mano': mano,
+        'vocal': vocal,
+        'tiempo': round(time.time(), 4),
+    }
+    if tiempo_captura is not None:
+        evento['latencia_ms'] = round((time.perf_counter() - tiempo_captura) * 1000, 2)
+    return evento
+
+
+def crear_bus():
+    """Crea e inicia el bus indicado en EVENTBUS_CONFIG (None si está desactivado)"""
+    if not EVENTBUS_CONFIG['activo']:
+        return None
+    bus = EventBus(EVENTBUS_CONFIG['direccion'], EVENTBUS_CONFIG['tamaño_cola'],
+                   EVENTBUS_CONFIG['lote_maximo'])
+    try:
+        bus.iniciar()
+    except OSError as e:
+        print(f"✗ No se pudo abrir el socket de eventos {EVENTBUS_CONFIG['direccion']}: {e}")
+        return None
+    print(f"✓ Bus de eventos en {EVENTBUS_CONFIG['direccion'] or 'proceso'}")
+    return bus
+
+
+async def _escuchar(direccion):
+    host, separador, puerto = direccion.rpartition(':')
+    if separador and puerto.isdigit():
+        lector, _ = await asyncio.open_connection(host or '127.0.0.1', int(puerto))
+    else:
+        lector, _ = await asyncio.open_unix_connection(direccion)
+    while True:
+        linea = await lector.readline()
+        if not linea:
+            break
+        print(linea.decode('utf-8'), end='')
+
+
+def main():
+    """Muestra los eventos que publica una app o un servidor en ejecución"""
+    parser = argparse.ArgumentParser(description='Cliente del bus de eventos de gestos')
+    parser.add_argument('direccion', nargs='?', default=EVENTBUS_CONFIG['direccion'],
+                        help="'host:puerto' o ruta del socket Unix")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_escuchar(args.direccion))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+eventwriter.py
+Flujo de eventos estructurados (JSON por línea) para el modo sin ventana
+"""
+
+import json
+import time
+
+
+class EventWriter:
+    """
+    Escribe cada evento como una línea JSON (formato JSONL)
+    
+    Las líneas se acumulan en el buffer del archivo y se bajan al disco cada
+    intervalo_flush segundos, así un proceso que sigue el archivo (tail -f)
+    las ve con poco retraso sin pagar una escritura por frame.
+    """
+    
+    def __init__(self, ruta, intervalo_flush=1.0):
+        """
+        Args:
+            ruta: Archivo de salida (.jsonl)
+            intervalo_flush: Segundos máximos que un evento queda en el buffer
+        """
+        self.ruta = ruta
+        self.intervalo_flush = intervalo_flush
+        self.archivo = open(ruta, 'w', encoding='utf-8', buffering=1 << 16)
+        self.eventos = 0
+        self._ultimo_flush = time.monotonic()
+    
+    def emitir(self, evento):
+        """
+        Agrega un evento
+        
+        Args:
+            evento: dict serializable a JSON (debe incluir la clave 'tipo')
+        """
+        self.archivo.write(json.dumps(evento, ensure_ascii=False, separators=(',', ':')))
+        self.archivo.write('\n')
+        self.eventos += 1
+        
+        ahora = time.monotonic()
+        if ahora - self._ultimo_flush >= self.intervalo_flush:
+            self.archivo.flush()
+            self._ultimo_flush = ahora
+    
+    def cerrar(self):
+        """Escribe lo pendiente y cierra el archivo"""
+        if not self.archivo.closed:
+            self.archivo.close()
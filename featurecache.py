@@ -0,0 +1,110 @@
+"""
+featurecache.py
+Caché de características por mano: evita recalcular ángulos y distancias de una mano quieta
+"""
+
+import numpy as np
+
+
+class FeatureCache:
+    """
+    Guarda la última clasificación de cada mano (por ID del tracker)
+    
+    Si ningún landmark se movió más de `tolerancia` desde el frame en que se
+    calcularon las características, se reutilizan. La referencia es ese frame
+    y no el anterior, así un movimiento lento no se acumula sin recalcular.
+    Las manos que no aparecen en una consulta se descartan.
+    """
+    
+    def __init__(self, tolerancia=0.002):
+        """
+        Args:
+            tolerancia: Desplazamiento máximo por coordenada (normalizada)
+                        para reutilizar las características
+        """
+        self.tolerancia = tolerancia
+        self.entradas = {}      # id -> (referencia (21, 3), vocal, {clave: fila})
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def vigentes(self, ids, puntos):
+        """
+        Indica qué manos pueden reutilizar su clasificación
+        
+        Args:
+            ids: ID de cada mano
+            puntos: Array (n, 21, 3)
+        
+        Returns:
+            np.ndarray: Máscara booleana (n,)
+        """
+        vigentes = np.zeros(len(ids), dtype=bool)
+        previas = [i for i, id_mano in enumerate(ids) if id_mano in self.entradas]
+        if previas:
+            referencias = np.stack([self.entradas[ids[i]][0] for i in previas])
+            desplazamiento = np.abs(puntos[previas] - referencias).max(axis=(1, 2))
+            vigentes[previas] = desplazamiento <= self.tolerancia
+        
+        aciertos = int(vigentes.sum())
+        self.aciertos += aciertos
+        self.fallos += len(ids) - aciertos
+        return vigentes
+    
+    def combinar(self, ids, puntos, vigentes, vocales_nuevas, caracteristicas_nuevas):
+        """
+        Une las clasificaciones reutilizadas con las recién calculadas y
+        actualiza la caché
+        
+        Args:
+            ids: ID de cada mano
+            puntos: Array (n, 21, 3)
+            vigentes: Máscara devuelta por vigentes()
+            vocales_nuevas: Vocales de las manos no vigentes, en orden
+            caracteristicas_nuevas: dict de arrays (m, ...) de esas manos
+                                    (None si todas están vigentes)
+        
+        Returns:
+            tuple: (vocales (n,), caracteristicas {clave: (n, ...)})
+        """
+        n = len(ids)
+        vocales = np.empty(n, dtype=object)
+        if caracteristicas_nuevas is None:
+            caracteristicas_nuevas = {}
+            modelo = self.entradas[ids[0]][2]
+            caracteristicas = {clave: np.empty((n,) + fila.shape, dtype=fila.dtype)
+                               for clave, fila in modelo.items()}
+        else:
+            caracteristicas = {clave: np.empty((n,) + valor.shape[1:], dtype=valor.dtype)
+                               for clave, valor in caracteristicas_nuevas.items()}
+        
+        entradas = {}
+        k = 0
+        for i, id_mano in enumerate(ids):
+            if vigentes[i]:
+                entrada = self.entradas[id_mano]
+                vocales[i] = entrada[1]
+                for clave, fila in entrada[2].items():
+                    caracteristicas[clave][i] = fila
+            else:
+                vocales[i] = vocales_nuevas[k]
+                filas = {clave: valor[k] for clave, valor in caracteristicas_nuevas.items()}
+                for clave, fila in filas.items():
+                    caracteristicas[clave][i] = fila
+                entrada = (puntos[i].copy(), vocales[i], filas)
+                k += 1
+            entradas[id_mano] = entrada
+        
+        self.entradas = entradas
+        return vocales, caracteristicas
+    
+    def invalidar(self, id_mano=None):
+        """Descarta la entrada de una mano (None = todas), por ejemplo al cambiar umbrales"""
+        if id_mano is None:
+            self.entradas.clear()
+        else:
+            self.entradas.pop(id_mano, None)
+    
+    def tasa_aciertos(self):
+        """Fracción de consultas resueltas desde la caché"""
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
@@ -0,0 +1,104 @@
+"""
+framebuffers.py
+Buffers de imagen reutilizables para no asignar memoria en cada frame
+"""
+
+import collections
+import numpy as np
+
+
+class FramePool:
+    """
+    Frames de captura reutilizables
+    
+    cap.read() escribe en un frame libre del pool en lugar de crear uno
+    nuevo; el frame vuelve al pool con liberar() cuando termina su recorrido
+    (después del render o al descartarse en el pipeline). En modo secuencial
+    siempre se reutiliza el mismo frame; con hilos el pool crece hasta el
+    número de frames en tránsito y se estabiliza.
+    
+    append/pop de la deque son atómicos: captura y render pueden usar el
+    pool desde hilos distintos sin locks.
+    """
+    
+    def __init__(self, perfil=None):
+        """
+        Args:
+            perfil: metrics.Profiler donde contar las asignaciones (opcional)
+        """
+        self.libres = collections.deque()
+        self.perfil = perfil
+        self.asignaciones = 0
+    
+    def leer(self, cap):
+        """
+        Lee un frame de la cámara sobre un buffer libre
+        
+        Returns:
+            tuple: (ret, frame) como cap.read()
+        """
+        try:
+            buffer = self.libres.pop()
+        except IndexError:
+            buffer = None
+        
+        ret, frame = cap.read() if buffer is None else cap.read(buffer)
+        if not ret:
+            if buffer is not None:
+                self.libres.append(buffer)
+            return ret, frame
+        
+        # OpenCV crea un array nuevo si no había buffer o si cambió el tamaño
+        if frame is not buffer:
+            self.asignaciones += 1
+            _contar(self.perfil, frame)
+        return ret, frame
+    
+    def liberar(self, frame):
+        """Devuelve un frame al pool (no debe usarse después)"""
+        if frame is not None:
+            self.libres.append(frame)
+
+
+class BufferSet:
+    """
+    Buffers persistentes por nombre (destino de cvtColor, resize, flip...)
+    
+    Cada nombre debe usarse desde un solo hilo; el buffer se vuelve a crear
+    solo si cambia la forma pedida.
+    """
+    
+    def __init__(self, perfil=None):
+        """
+        Args:
+            perfil: metrics.Profiler donde contar las asignaciones (opcional)
+        """
+        self.buffers = {}
+        self.perfil = perfil
+        self.asignaciones = 0
+    
+    def obtener(self, nombre, forma, dtype=np.uint8):
+        """
+        Retorna el buffer `nombre` con la forma indicada
+        
+        Args:
+            nombre: Identificador del buffer
+            forma: Tupla con la forma del array
+            dtype: Tipo de los elementos
+        
+        Returns:
+            np.ndarray: Buffer sin inicializar (su contenido es el del uso anterior)
+        """
+        buffer = self.buffers.get(nombre)
+        if buffer is None or buffer.shape != forma or buffer.dtype != dtype:
+            buffer = self.buffers[nombre] = np.empty(forma, dtype=dtype)
+            self.asignaciones += 1
+            _contar(self.perfil, buffer)
+        return buffer
+
+
+def _contar(perfil, array):
+    """Registra una asignación en los contadores del perfil"""
+    if perfil is not None:
+        perfil.contar('asignaciones_frame')
+        perfil.contar('bytes_asignados', array.nbytes)
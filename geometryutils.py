@@ -5,6 +5,29 @@ Autor: Juan Camilo Quiceno - 2363251-2724
 """
 
 import math
+import numpy as np
+
+
+# ========== ÍNDICES DE LANDMARKS (numeración de MediaPipe Hands) ==========
+MUÑECA = 0
+PULGAR_MCP = 2
+PULGAR_IP = 3
+PULGAR_TIP = 4
+
+# Orden de los dedos: índice, medio, anular, meñique
+DEDOS_MCP = [5, 9, 13, 17]
+DEDOS_PIP = [6, 10, 14, 18]
+DEDOS_TIP = [8, 12, 16, 20]
+
+# Índices de todos los puntos que usan las características, para extraerlos
+# con un único indexado: MCP, PIP y TIP de los 4 dedos, y luego los pares
+# pulgar-índice, índice-medio, medio-anular, anular-meñique, pulgar-mcp índice
+_INDICES_CARACTERISTICAS = np.array(
+    DEDOS_MCP + DEDOS_PIP + DEDOS_TIP +
+    [PULGAR_TIP, 8, 12, 16, PULGAR_TIP] +
+    [8, 12, 16, 20, 5],
+    dtype=np.intp
+)
 
 
 def distancia2(a, b):
@@ -170,4 +193,71 @@ def variacion_valores(valores):
     """
     if not valores:
         return 0
-    return max(valores) - min(valores)
\ No newline at end of file
+    return max(valores) - min(valores)
+
+
+def landmarks_a_array(landmarks):
+    """
+    Convierte los landmarks de una mano en un array (21, 3)
+    
+    Args:
+        landmarks: Lista de landmarks con atributos .x, .y, .z
+                   (si ya es un np.ndarray se retorna sin copiar)
+    
+    Returns:
+        np.ndarray: Coordenadas (x, y, z) de cada landmark
+    """
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float64)
+
+
+def caracteristicas_dedos(puntos):
+    """
+    Calcula en pocas operaciones vectorizadas todas las características
+    que usan las reglas de las vocales
+    
+    Equivale a aplicar angulo_entre_puntos (MCP-PIP-TIP) y
+    esta_doblado_mejorado a los 4 dedos, y distancia3 a los pares de puntas,
+    pero sobre una o muchas manos a la vez.
+    
+    Args:
+        puntos: Array (..., 21, 3) con los landmarks de una o varias manos
+    
+    Returns:
+        tuple: (angulos, doblados, distancias)
+            - angulos: Array (..., 4) en grados (0-180)
+            - doblados: Array booleano (..., 4)
+            - distancias: Array (..., 5) con las distancias pulgar-índice,
+              índice-medio, medio-anular, anular-meñique y pulgar-mcp índice
+    """
+    sel = puntos.take(_INDICES_CARACTERISTICAS, axis=-2)
+    
+    # Coordenadas XY de las articulaciones, cada una con forma (..., 4)
+    x = sel[..., :12, 0]
+    y = sel[..., :12, 1]
+    mcp_x, pip_x, tip_x = x[..., 0:4], x[..., 4:8], x[..., 8:12]
+    mcp_y, pip_y, tip_y = y[..., 0:4], y[..., 4:8], y[..., 8:12]
+    
+    # Ángulo en PIP: vectores ba (pip->mcp) y bc (pip->tip)
+    ba_x, ba_y = mcp_x - pip_x, mcp_y - pip_y
+    bc_x, bc_y = tip_x - pip_x, tip_y - pip_y
+    dot_product = ba_x * bc_x + ba_y * bc_y
+    magnitudes = np.sqrt(ba_x * ba_x + ba_y * ba_y) * np.sqrt(bc_x * bc_x + bc_y * bc_y)
+    
+    # Si algún vector es nulo el coseno queda en 1 (ángulo 0)
+    cos_angle = np.divide(dot_product, magnitudes,
+                          out=np.ones_like(magnitudes), where=magnitudes != 0)
+    np.clip(cos_angle, -1, 1, out=cos_angle)
+    angulos = np.degrees(np.arccos(cos_angle))
+    
+    # Doblado: punta por debajo de PIP y más cerca del MCP que el PIP
+    dist_tip_mcp = np.hypot(tip_x - mcp_x, tip_y - mcp_y)
+    dist_pip_mcp = np.hypot(pip_x - mcp_x, pip_y - mcp_y)
+    doblados = (tip_y > pip_y) & (dist_tip_mcp < dist_pip_mcp * 0.9)
+    
+    # Distancias 3D entre pares de puntos
+    d = sel[..., 12:17, :] - sel[..., 17:22, :]
+    distancias = np.sqrt(np.sum(d * d, axis=-1))
+    
+    return angulos, doblados, distancias
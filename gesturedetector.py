@@ -3,189 +3,191 @@ gesture_detector.py
 Módulo para detección de gestos de vocales en lenguaje de señas
 """
 
-import mediapipe as mp
-from config import DISTANCE_THRESHOLDS, ANGLE_THRESHOLDS, GESTURE_TOLERANCES, DETECTION_CONFIG
+import numpy as np
+from config import (
+    DISTANCE_THRESHOLDS, ANGLE_THRESHOLDS, GESTURE_TOLERANCES, GESTURE_DEFINITIONS,
+    DISTANCE_THRESHOLDS_PALMA, GESTURE_TOLERANCES_PALMA,
+    DETECTION_CONFIG, CLASSIFIER_CONFIG, NORMALIZATION_CONFIG
+)
 from geometryutils import (
-    distancia3, angulo_entre_puntos, esta_doblado_mejorado, variacion_valores
+    landmarks_a_array, caracteristicas_dedos, DEDOS_TIP
 )
+from confirmation import ConfirmationEngine
+from featurecache import FeatureCache
+from handframe import normalizar, escalar_umbrales
+from ruleengine import RuleEngine
+from classifier import cargar_modelo
+
+
+# Gestos en orden de especificidad (prioridad de las reglas)
+VOCALES = tuple(GESTURE_DEFINITIONS)
+_ETIQUETAS = np.array((None,) + VOCALES, dtype=object)
 
 
 class GestureDetector:
     """Clase para detectar gestos de vocales ASL"""
     
-    def __init__(self):
-        self.mp_manos = mp.solutions.hands
-        self.gesto_buffer = {}
+    def __init__(self, normalizacion=NORMALIZATION_CONFIG):
+        """
+        Args:
+            normalizacion: Configuración de handframe.normalizar; con 'activo'
+                           las reglas usan los umbrales en largos de palma
+        """
+        self.normalizacion = normalizacion
+        self.ultima_confirmada = {}
         self.frames_confirmacion = DETECTION_CONFIG['frames_confirmacion']
-        
-        # Cargar umbrales
-        self.th = DISTANCE_THRESHOLDS
+        self.confirmacion = ConfirmationEngine(
+            _ETIQUETAS,
+            frames_confirmacion=self.frames_confirmacion,
+            frames_por_gesto=DETECTION_CONFIG['frames_por_vocal'],
+            modo=DETECTION_CONFIG['modo_confirmacion'],
+            umbral_entrada=DETECTION_CONFIG['umbral_entrada'],
+            umbral_salida=DETECTION_CONFIG['umbral_salida'],
+            frames_olvido=DETECTION_CONFIG['frames_olvido']
+        )
+        
+        # Caché de características por ID de mano (None = desactivada)
+        self.cache = None
+        if DETECTION_CONFIG['tolerancia_cache'] is not None:
+            self.cache = FeatureCache(DETECTION_CONFIG['tolerancia_cache'])
+        
+        # Cargar umbrales y compilar las definiciones de gestos
+        if normalizacion['activo']:
+            palma = normalizacion['palma_referencia']
+            self.th = escalar_umbrales(DISTANCE_THRESHOLDS_PALMA, palma)
+            self.tol = escalar_umbrales(GESTURE_TOLERANCES_PALMA, palma)
+        else:
+            self.th = DISTANCE_THRESHOLDS
+            self.tol = GESTURE_TOLERANCES
         self.ang = ANGLE_THRESHOLDS
-        self.tol = GESTURE_TOLERANCES
+        self.reglas = RuleEngine(GESTURE_DEFINITIONS, {
+            'umbral': self.th,
+            'angulo': self.ang,
+            'tolerancia': self.tol
+        })
+        
+        # Clasificador aprendido opcional (classifier.py) en lugar de las reglas
+        self.modelo = None
+        self.confianza_minima = CLASSIFIER_CONFIG['confianza_minima']
+        if CLASSIFIER_CONFIG['backend'] == 'modelo':
+            try:
+                self.modelo = cargar_modelo(CLASSIFIER_CONFIG['modelo'])
+                print(f"✓ Modelo de gestos cargado: {CLASSIFIER_CONFIG['modelo']} ({self.modelo.tipo})")
+            except Exception as e:
+                print(f"✗ No se pudo cargar el modelo ({e}); se usan las reglas")
     
-    def detectar_vocal(self, lm, mano_label=None):
+    def detectar_vocal(self, lm, mano_label=None, aspecto=None):
         """
         Detecta qué vocal está siendo señalada
         
         Args:
-            lm: Landmarks de la mano (lista de 21 puntos)
+            lm: Landmarks de la mano (lista de 21 puntos o array (21, 3))
             mano_label: Etiqueta de la mano ('Left' o 'Right')
+            aspecto: Ancho / alto del frame (None = ver handframe.normalizar)
         
         Returns:
             str: Letra de la vocal ('A', 'E', 'I', 'O', 'U') o None
         """
-        # Extraer todos los landmarks necesarios
-        landmarks = self._extraer_landmarks(lm)
-        
-        # Calcular estado de los dedos
-        estado_dedos = self._calcular_estado_dedos(landmarks)
-        
-        # Calcular distancias importantes
-        distancias = self._calcular_distancias(landmarks)
-        
-        # Detectar cada vocal en orden de especificidad
-        if self._es_vocal_a(estado_dedos, distancias):
-            return 'A'
-        
-        if self._es_vocal_e(estado_dedos, distancias):
-            return 'E'
-        
-        if self._es_vocal_i(estado_dedos, landmarks):
-            return 'I'
+        # Convertir los 21 landmarks a un array (21, 3) una sola vez
+        puntos = self._extraer_landmarks(lm)
+        if self.modelo is not None:
+            return self._clasificar_lote(puntos[None], aspecto)[0][0]
+        
+        # Recorrer el árbol de decisión: solo se evalúan las condiciones necesarias
+        locales, _ = normalizar(puntos, self.normalizacion, aspecto)
+        return self.reglas.clasificar(self._calcular_caracteristicas(locales))
+    
+    def detectar_vocales_lote(self, manos, ids=None, aspecto=None):
+        """
+        Detecta las vocales de muchas manos en una sola llamada
         
-        if self._es_vocal_o(estado_dedos, distancias, landmarks):
-            return 'O'
+        Las reglas A/E/I/O/U se evalúan como máscaras sobre todo el lote y
+        se resuelve la prioridad sin bucles de Python por mano.
         
-        if self._es_vocal_u(estado_dedos, distancias, landmarks):
-            return 'U'
+        Args:
+            manos: Array (N, 21, 3) con los landmarks de N manos (de uno o
+                   varios frames) o secuencia de N listas de landmarks
+            ids: IDs de mano del tracker (una mano por ID, mismo frame); si se
+                 indican, las manos casi quietas reutilizan su clasificación
+            aspecto: Ancho / alto del frame de las manos, escalar o array (N,)
+                     (None = ver handframe.normalizar)
         
-        return None
-    
-    def _extraer_landmarks(self, lm):
-        """Extrae y organiza todos los landmarks necesarios"""
-        return {
-            # Muñeca
-            'muñeca': lm[self.mp_manos.HandLandmark.WRIST],
-            
-            # Pulgar
-            'pulgar_mcp': lm[self.mp_manos.HandLandmark.THUMB_MCP],
-            'pulgar_ip': lm[self.mp_manos.HandLandmark.THUMB_IP],
-            'pulgar_tip': lm[self.mp_manos.HandLandmark.THUMB_TIP],
-            
-            # Índice
-            'indice_mcp': lm[self.mp_manos.HandLandmark.INDEX_FINGER_MCP],
-            'indice_pip': lm[self.mp_manos.HandLandmark.INDEX_FINGER_PIP],
-            'indice_tip': lm[self.mp_manos.HandLandmark.INDEX_FINGER_TIP],
-            
-            # Medio
-            'medio_mcp': lm[self.mp_manos.HandLandmark.MIDDLE_FINGER_MCP],
-            'medio_pip': lm[self.mp_manos.HandLandmark.MIDDLE_FINGER_PIP],
-            'medio_tip': lm[self.mp_manos.HandLandmark.MIDDLE_FINGER_TIP],
-            
-            # Anular
-            'anular_mcp': lm[self.mp_manos.HandLandmark.RING_FINGER_MCP],
-            'anular_pip': lm[self.mp_manos.HandLandmark.RING_FINGER_PIP],
-            'anular_tip': lm[self.mp_manos.HandLandmark.RING_FINGER_TIP],
-            
-            # Meñique
-            'meñique_mcp': lm[self.mp_manos.HandLandmark.PINKY_MCP],
-            'meñique_pip': lm[self.mp_manos.HandLandmark.PINKY_PIP],
-            'meñique_tip': lm[self.mp_manos.HandLandmark.PINKY_TIP],
-        }
-    
-    def _calcular_estado_dedos(self, lm):
-        """Calcula si cada dedo está doblado o extendido"""
-        return {
-            'indice': {
-                'doblado': esta_doblado_mejorado(lm['indice_tip'], lm['indice_pip'], lm['indice_mcp']),
-                'angulo': angulo_entre_puntos(lm['indice_mcp'], lm['indice_pip'], lm['indice_tip'])
-            },
-            'medio': {
-                'doblado': esta_doblado_mejorado(lm['medio_tip'], lm['medio_pip'], lm['medio_mcp']),
-                'angulo': angulo_entre_puntos(lm['medio_mcp'], lm['medio_pip'], lm['medio_tip'])
-            },
-            'anular': {
-                'doblado': esta_doblado_mejorado(lm['anular_tip'], lm['anular_pip'], lm['anular_mcp']),
-                'angulo': angulo_entre_puntos(lm['anular_mcp'], lm['anular_pip'], lm['anular_tip'])
-            },
-            'meñique': {
-                'doblado': esta_doblado_mejorado(lm['meñique_tip'], lm['meñique_pip'], lm['meñique_mcp']),
-                'angulo': angulo_entre_puntos(lm['meñique_mcp'], lm['meñique_pip'], lm['meñique_tip'])
-            }
-        }
+        Returns:
+            tuple: (vocales, caracteristicas)
+                - vocales: Array de objetos (N,) con la letra o None
+                - caracteristicas: dict con 'angulos' (N, 4), 'doblados' (N, 4),
+                  'distancias' (N, 5) en el marco de la mano (handframe.py),
+                  'palma' (N,) con el largo original de cada palma y
+                  'mascaras' (N, 5) en el orden de VOCALES;
+                  con el modelo también 'confianzas' (N, K) en el orden de
+                  self.modelo.clases
+        """
+        puntos = self._extraer_lote(manos)
+        if ids is None or self.cache is None or len(puntos) == 0:
+            return self._clasificar_lote(puntos, aspecto)
+        
+        vigentes = self.cache.vigentes(ids, puntos)
+        if vigentes.all():
+            return self.cache.combinar(ids, puntos, vigentes, [], None)
+        if np.ndim(aspecto):
+            aspecto = np.asarray(aspecto)[~vigentes]
+        vocales, caracteristicas = self._clasificar_lote(puntos[~vigentes], aspecto)
+        return self.cache.combinar(ids, puntos, vigentes, vocales, caracteristicas)
     
-    def _calcular_distancias(self, lm):
-        """Calcula distancias importantes entre puntos"""
-        return {
-            'pulgar_indice': distancia3(lm['pulgar_tip'], lm['indice_tip']),
-            'indice_medio': distancia3(lm['indice_tip'], lm['medio_tip']),
-            'medio_anular': distancia3(lm['medio_tip'], lm['anular_tip']),
-            'anular_meñique': distancia3(lm['anular_tip'], lm['meñique_tip']),
-            'pulgar_mcp': distancia3(lm['pulgar_tip'], lm['indice_mcp']),
-        }
+    def _clasificar_lote(self, puntos, aspecto=None):
+        """Normaliza, calcula características y clasifica un array (N, 21, 3)"""
+        locales, palma = normalizar(puntos, self.normalizacion, aspecto)
+        caracteristicas = self._calcular_caracteristicas(locales)
+        caracteristicas['palma'] = palma
+        if self.modelo is not None:
+            vocales, confianzas = self.modelo.predecir(locales, caracteristicas, self.confianza_minima)
+            mascaras = vocales[:, None] == _ETIQUETAS[None, 1:]
+            caracteristicas['confianzas'] = confianzas
+        else:
+            mascaras = self.reglas.evaluar_lote(caracteristicas)
+            vocales = _primera_regla(mascaras)
+        
+        del caracteristicas['puntas_y']
+        caracteristicas['mascaras'] = mascaras
+        return vocales, caracteristicas
     
-    def _es_vocal_a(self, estado, dist):
-        """Detecta vocal A: puño cerrado con pulgar al costado"""
-        todos_doblados = all(estado[d]['doblado'] for d in ['indice', 'medio', 'anular', 'meñique'])
-        angulos_doblados = all(estado[d]['angulo'] < self.ang['doblado'] 
-                              for d in ['indice', 'medio'])
-        pulgar_separado = (dist['pulgar_mcp'] > self.th['medio'] and 
-                          dist['pulgar_indice'] > self.th['cerca'])
-        
-        return todos_doblados and angulos_doblados and pulgar_separado
+    def reglas_lote(self, manos, aspecto=None):
+        """Vocales según las reglas, sin caché ni modelo (referencia para comparar)"""
+        locales, _ = normalizar(self._extraer_lote(manos), self.normalizacion, aspecto)
+        return _primera_regla(self.reglas.evaluar_lote(self._calcular_caracteristicas(locales)))
     
-    def _es_vocal_e(self, estado, dist):
-        """Detecta vocal E: dedos doblados tocando el pulgar"""
-        todos_doblados = all(estado[d]['doblado'] for d in ['indice', 'medio', 'anular', 'meñique'])
-        angulo_doblado = estado['indice']['angulo'] < self.ang['doblado']
-        pulgar_cerca = dist['pulgar_indice'] < self.th['cerca']
-        
-        return todos_doblados and angulo_doblado and pulgar_cerca
+    def _extraer_lote(self, manos):
+        """Convierte un lote de manos en un array (N, 21, 3)"""
+        if isinstance(manos, np.ndarray):
+            return manos.reshape(-1, 21, 3)
+        if len(manos) == 0:
+            return np.empty((0, 21, 3))
+        return np.stack([landmarks_a_array(lm) for lm in manos])
     
-    def _es_vocal_i(self, estado, lm):
-        """Detecta vocal I: solo meñique extendido"""
-        dedos_doblados = all(estado[d]['doblado'] for d in ['indice', 'medio', 'anular'])
-        meñique_extendido = (not estado['meñique']['doblado'] and 
-                            estado['meñique']['angulo'] > self.ang['extendido'])
-        
-        # Verificación adicional: meñique más alto que medio
-        meñique_alto = lm['meñique_tip'].y < lm['medio_tip'].y
-        
-        return dedos_doblados and meñique_extendido and meñique_alto
-    
-    def _es_vocal_o(self, estado, dist, lm):
-        """Detecta vocal O: dedos formando círculo"""
-        # Promedio de distancias entre dedos adyacentes
-        distancias_lista = [dist['pulgar_indice'], dist['indice_medio'], 
-                           dist['medio_anular'], dist['anular_meñique']]
-        promedio = sum(distancias_lista) / len(distancias_lista)
-        
-        todos_cercanos = promedio < self.th['medio']
-        no_todos_doblados = not all(estado[d]['doblado'] 
-                                    for d in ['indice', 'medio', 'anular', 'meñique'])
-        
-        # Verificar altura similar de las puntas
-        alturas = [lm['indice_tip'].y, lm['medio_tip'].y, 
-                  lm['anular_tip'].y, lm['meñique_tip'].y]
-        variacion = variacion_valores(alturas)
-        
-        return todos_cercanos and no_todos_doblados and variacion < self.tol['O']['variacion_altura_max']
+    def _extraer_landmarks(self, lm):
+        """Convierte los landmarks en un array (21, 3) de coordenadas"""
+        return landmarks_a_array(lm)
     
-    def _es_vocal_u(self, estado, dist, lm):
-        """Detecta vocal U: índice y medio extendidos juntos"""
-        ind_med_extendidos = (not estado['indice']['doblado'] and 
-                             not estado['medio']['doblado'] and
-                             estado['indice']['angulo'] > self.ang['extendido'] and
-                             estado['medio']['angulo'] > self.ang['extendido'])
-        
-        anu_meñ_doblados = estado['anular']['doblado'] and estado['meñique']['doblado']
-        ind_med_juntos = dist['indice_medio'] < self.th['cerca']
+    def _calcular_caracteristicas(self, puntos):
+        """
+        Calcula el estado de los dedos, las distancias importantes y la altura
+        de las puntas (entrada de las reglas de ruleengine.py)
         
-        # Verificar altura similar
-        diferencia_altura = abs(lm['indice_tip'].y - lm['medio_tip'].y)
-        altura_similar = diferencia_altura < self.tol['U']['diferencia_altura_max']
+        Args:
+            puntos: Array (..., 21, 3), normalmente ya en el marco de la mano
         
-        return ind_med_extendidos and anu_meñ_doblados and ind_med_juntos and altura_similar
+        Returns:
+            dict: 'angulos' y 'doblados' (..., 4) en el orden de DEDOS,
+                  'distancias' (..., 5) en el orden de DISTANCIAS y
+                  'puntas_y' (..., 4)
+        """
+        angulos, doblados, distancias = caracteristicas_dedos(puntos)
+        return {
+            'angulos': angulos,
+            'doblados': doblados,
+            'distancias': distancias,
+            'puntas_y': puntos[..., DEDOS_TIP, 1]
+        }
     
     def confirmar_gesto(self, i_mano, gesto_actual):
         """
@@ -198,24 +200,52 @@ class GestureDetector:
         Returns:
             str: Gesto confirmado o None
         """
-        if i_mano not in self.gesto_buffer:
-            self.gesto_buffer[i_mano] = []
+        return self.confirmacion.actualizar(i_mano, gesto_actual)
+    
+    def confirmar_con_liberacion(self, i_mano, gesto_actual):
+        """
+        Confirma un gesto con la misma lógica de liberación que la app en vivo:
+        cuando una mano con gesto confirmado deja de mostrar gesto, su buffer
+        se limpia (usado al reprocesar grabaciones sin audio)
         
-        # Agregar al buffer
-        self.gesto_buffer[i_mano].append(gesto_actual)
+        Args:
+            i_mano: Índice de la mano
+            gesto_actual: Gesto detectado actualmente
         
-        # Mantener solo los últimos N frames
-        if len(self.gesto_buffer[i_mano]) > self.frames_confirmacion:
-            self.gesto_buffer[i_mano].pop(0)
+        Returns:
+            str: Gesto confirmado o None
+        """
+        gesto_confirmado = self.confirmar_gesto(i_mano, gesto_actual)
         
-        # Confirmar si todos coinciden
-        if len(self.gesto_buffer[i_mano]) == self.frames_confirmacion:
-            if all(g == gesto_actual for g in self.gesto_buffer[i_mano]):
-                return gesto_actual
+        if gesto_confirmado is not None:
+            self.ultima_confirmada[i_mano] = gesto_confirmado
+        elif gesto_actual is None and self.ultima_confirmada.get(i_mano) is not None:
+            self.ultima_confirmada[i_mano] = None
+            self.limpiar_buffer(i_mano)
         
-        return None
+        return gesto_confirmado
     
     def limpiar_buffer(self, i_mano):
         """Limpia el buffer de confirmación de una mano"""
-        if i_mano in self.gesto_buffer:
-            self.gesto_buffer[i_mano] = []
\ No newline at end of file
+        self.confirmacion.limpiar(i_mano)
+    
+    def olvidar_ausentes(self, presentes):
+        """
+        Elimina el estado de las manos que llevan frames_olvido frames sin verse
+        
+        Args:
+            presentes: Índices de las manos del frame actual
+        
+        Returns:
+            list: Índices eliminados
+        """
+        eliminadas = self.confirmacion.olvidar_ausentes(presentes)
+        for i_mano in eliminadas:
+            self.ultima_confirmada.pop(i_mano, None)
+        return eliminadas
+
+
+def _primera_regla(mascaras):
+    """Vocal de la primera regla que se cumple en cada fila (None si ninguna)"""
+    codigos = np.where(mascaras.any(axis=-1), mascaras.argmax(axis=-1) + 1, 0)
+    return _ETIQUETAS[codigos]
\ No newline at end of file
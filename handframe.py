@@ -0,0 +1,112 @@
+"""
+handframe.py
+Marco local de la mano: landmarks sin posición, escala ni giro para umbrales estables
+"""
+
+import numpy as np
+from config import NORMALIZATION_CONFIG, CAMERA_CONFIG
+from geometryutils import MUÑECA, DEDOS_MCP
+
+# Eje de la palma: de la muñeca al MCP del dedo medio
+_MEDIO_MCP = DEDOS_MCP[1]
+
+
+def marco_mano(puntos, palma_referencia=0.15, aspecto=1.0):
+    """
+    Expresa los landmarks en el marco de la mano, en una pasada vectorizada
+    
+    El origen pasa a la muñeca, el eje muñeca -> MCP del medio se gira para
+    apuntar hacia arriba (-y, la mano vertical frente a la cámara) y todo se
+    escala para que ese eje mida `palma_referencia`. Así los umbrales
+    pensados para una palma de ese tamaño valen igual con la mano cerca o
+    lejos de la cámara e inclinada.
+    
+    Args:
+        puntos: Array (..., 21, 3) en coordenadas normalizadas de MediaPipe
+        palma_referencia: Largo de la palma en el resultado
+        aspecto: Ancho / alto de la imagen (x e y vienen normalizadas por
+                 separado; se igualan antes de girar); escalar o array (...,)
+                 con el de cada mano
+    
+    Returns:
+        tuple: (locales, palma)
+            - locales: Array (..., 21, 3) en el marco de la mano
+            - palma: Array (...,) con el largo original de la palma (en unidades de y)
+    """
+    locales = puntos - puntos[..., MUÑECA:MUÑECA + 1, :]
+    if np.ndim(aspecto) or aspecto != 1.0:
+        locales[..., 0] *= np.asarray(aspecto)[..., None]
+    
+    eje_x = locales[..., _MEDIO_MCP, 0]
+    eje_y = locales[..., _MEDIO_MCP, 1]
+    palma = np.hypot(eje_x, eje_y)
+    
+    # Una palma nula (landmarks degenerados) queda sin girar ni escalar
+    valida = palma > 1e-9
+    inversa = np.divide(1.0, palma, out=np.zeros_like(palma), where=valida)
+    ux = eje_x * inversa
+    uy = np.where(valida, eje_y * inversa, -1.0)
+    factor = np.where(valida, palma_referencia * inversa, 1.0)
+    
+    # Giro que lleva (ux, uy) a (0, -1), combinado con la escala
+    a = (-uy * factor)[..., None]
+    b = (ux * factor)[..., None]
+    x = locales[..., 0].copy()
+    y = locales[..., 1]
+    locales[..., 0] = a * x + b * y
+    locales[..., 1] = a * y - b * x
+    locales[..., 2] *= factor[..., None]
+    return locales, palma
+
+
+def normalizar(puntos, config=NORMALIZATION_CONFIG, aspecto=None):
+    """
+    Aplica marco_mano según NORMALIZATION_CONFIG
+    
+    Args:
+        puntos: Array (..., 21, 3) en coordenadas normalizadas de MediaPipe
+        config: Configuración de la normalización
+        aspecto: Ancho / alto del frame de donde salieron los landmarks
+                 (escalar o array (...,)); None = aspecto_por_defecto()
+    
+    Returns:
+        tuple: (puntos para las características, palma (...,)); si la
+               normalización está desactivada los puntos se retornan tal cual
+    """
+    if not config['activo']:
+        eje = puntos[..., _MEDIO_MCP, :2] - puntos[..., MUÑECA, :2]
+        return puntos, np.hypot(eje[..., 0], eje[..., 1])
+    if aspecto is None:
+        aspecto = aspecto_por_defecto(config)
+    return marco_mano(puntos, config['palma_referencia'], aspecto)
+
+
+def aspecto_por_defecto(config=NORMALIZATION_CONFIG):
+    """Ancho / alto cuando no se conoce el frame: config['aspecto'] o el de la cámara"""
+    if config['aspecto'] is not None:
+        return config['aspecto']
+    return CAMERA_CONFIG['width'] / CAMERA_CONFIG['height']
+
+
+def escalar_umbrales(umbrales, palma_referencia):
+    """
+    Pasa umbrales en largos de palma (DISTANCE_THRESHOLDS_PALMA,
+    GESTURE_TOLERANCES_PALMA) a las unidades de marco_mano
+    
+    Args:
+        umbrales: Dict de umbrales, con dicts anidados; los booleanos se
+                  copian sin cambios
+        palma_referencia: Largo de la palma en el marco de la mano
+    
+    Returns:
+        dict: Copia con cada longitud multiplicada por palma_referencia
+    """
+    escalados = {}
+    for clave, valor in umbrales.items():
+        if isinstance(valor, dict):
+            escalados[clave] = escalar_umbrales(valor, palma_referencia)
+        elif isinstance(valor, bool):
+            escalados[clave] = valor
+        else:
+            escalados[clave] = valor * palma_referencia
+    return escalados
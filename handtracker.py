@@ -0,0 +1,215 @@
+"""
+handtracker.py
+Identificadores persistentes de manos entre frames
+"""
+
+import numpy as np
+from geometryutils import MUÑECA
+
+
+class HandTracker:
+    """
+    Asigna a cada mano detectada un ID estable entre frames
+    
+    MediaPipe no garantiza el orden de multi_hand_landmarks; el tracker
+    empareja las manos con las del frame anterior minimizando una matriz de
+    costos (distancia de muñeca y centro, más una penalización si cambia la
+    lateralidad). La asignación óptima se resuelve con el método húngaro
+    sobre los tracks que quedan a menos de distancia_maxima de alguna mano.
+    """
+    
+    def __init__(self, distancia_maxima=0.25, penalizacion_lado=0.2, frames_perdida=10):
+        """
+        Args:
+            distancia_maxima: Costo a partir del cual una mano se considera nueva
+                              (en coordenadas normalizadas)
+            penalizacion_lado: Costo extra si la lateralidad no coincide
+            frames_perdida: Frames sin ver un ID antes de descartarlo
+        """
+        self.distancia_maxima = distancia_maxima
+        self.penalizacion_lado = penalizacion_lado
+        self.frames_perdida = frames_perdida
+        
+        self.ids = []               # ID de cada track
+        self.posiciones = np.zeros((0, 4))   # Última (muñeca x, y, centro x, y) observada
+        self.velocidades = np.zeros((0, 4))  # Desplazamiento por frame
+        self.lados = []
+        self.ausencias = []
+        self.siguiente_id = 0
+    
+    def actualizar(self, manos, lados=None):
+        """
+        Empareja las manos del frame con los tracks existentes
+        
+        Args:
+            manos: Lista de landmarks (21 puntos) o array (n, 21, 3)
+            lados: Lateralidad de cada mano ('Left'/'Right'/None)
+        
+        Returns:
+            list: ID de cada mano, en el orden de entrada
+        """
+        posiciones = self._posiciones(manos)
+        n = len(posiciones)
+        lados = list(lados) if lados is not None else [None] * n
+        
+        existentes = len(self.ids)
+        asignacion = self._asignar(posiciones, lados)
+        
+        ids = []
+        vistos = set()
+        for i, track in enumerate(asignacion):
+            if track is None:
+                ids.append(self._crear(posiciones[i], lados[i]))
+                continue
+            pasos = self.ausencias[track] + 1
+            self.velocidades[track] = (posiciones[i] - self.posiciones[track]) / pasos
+            self.posiciones[track] = posiciones[i]
+            self.lados[track] = lados[i] or self.lados[track]
+            self.ausencias[track] = 0
+            vistos.add(track)
+            ids.append(self.ids[track])
+        
+        # Envejecer los tracks que no aparecieron en este frame
+        vivos = list(range(existentes, len(self.ids)))
+        for track in range(existentes):
+            if track not in vistos:
+                self.ausencias[track] += 1
+            if self.ausencias[track] <= self.frames_perdida:
+                vivos.append(track)
+        if len(vivos) < len(self.ids):
+            self._conservar(sorted(vivos))
+        return ids
+    
+    def _asignar(self, posiciones, lados):
+        """Retorna para cada mano el índice de track asignado o None"""
+        n, m = len(posiciones), len(self.ids)
+        if n == 0:
+            return []
+        if m == 0:
+            return [None] * n
+        
+        # Posición predicha con velocidad constante desde la última observación
+        prediccion = self.posiciones + self.velocidades * (np.array(self.ausencias) + 1)[:, None]
+        costos = np.linalg.norm(posiciones[:, None, :] - prediccion[None, :, :], axis=-1) / 2
+        for i, lado in enumerate(lados):
+            for j, lado_track in enumerate(self.lados):
+                if lado and lado_track and lado != lado_track:
+                    costos[i, j] += self.penalizacion_lado
+        
+        # Solo los tracks que alguna mano puede tomar; los demás equivalen a "mano nueva"
+        candidatos = np.flatnonzero((costos < self.distancia_maxima).any(axis=0))
+        if len(candidatos) == 0:
+            return [None] * n
+        costos = costos[:, candidatos]
+        
+        # Columnas extra con costo distancia_maxima: "mano nueva"
+        costos = np.concatenate([costos, np.full((n, n), self.distancia_maxima)], axis=1)
+        columnas = _asignacion_minima(costos)
+        
+        return [int(candidatos[j]) if j < len(candidatos) and costos[i, j] < self.distancia_maxima else None
+                for i, j in enumerate(columnas)]
+    
+    def _crear(self, posicion, lado):
+        """Agrega un track nuevo y retorna su ID"""
+        id_mano = self.siguiente_id
+        self.siguiente_id += 1
+        self.ids.append(id_mano)
+        self.posiciones = np.vstack([self.posiciones, posicion])
+        self.velocidades = np.vstack([self.velocidades, np.zeros(4)])
+        self.lados.append(lado)
+        self.ausencias.append(0)
+        return id_mano
+    
+    def _conservar(self, tracks):
+        """Descarta los tracks que no están en la lista"""
+        self.ids = [self.ids[t] for t in tracks]
+        self.posiciones = self.posiciones[tracks]
+        self.velocidades = self.velocidades[tracks]
+        self.lados = [self.lados[t] for t in tracks]
+        self.ausencias = [self.ausencias[t] for t in tracks]
+    
+    @staticmethod
+    def _posiciones(manos):
+        """Muñeca y centro del bounding box de cada mano, (n, 4)"""
+        if isinstance(manos, np.ndarray):
+            puntos = manos[..., :2]
+        else:
+            puntos = np.array([[(lm.x, lm.y) for lm in landmarks] for landmarks in manos])
+        if len(puntos) == 0:
+            return np.zeros((0, 4))
+        centro = (puntos.min(axis=1) + puntos.max(axis=1)) / 2
+        return np.concatenate([puntos[:, MUÑECA], centro], axis=1)
+
+
+def _asignacion_minima(costos):
+    """
+    Método húngaro (con potenciales) para una matriz de costos (n, m), n <= m
+    
+    Cada fila agrega un camino de aumento de costo mínimo; el bucle interno
+    se hace sobre todas las columnas a la vez con numpy, así con pocas manos
+    el costo es O(n² · m) operaciones vectorizadas.
+    
+    Returns:
+        list: Columna asignada a cada fila
+    """
+    n, m = costos.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    fila_de = np.zeros(m + 1, dtype=np.intp)    # Fila (1..n) asignada a cada columna, 0 = libre
+    camino = np.zeros(m + 1, dtype=np.intp)
+    
+    for i in range(1, n + 1):
+        fila_de[0] = i
+        j0 = 0
+        minimos = np.full(m + 1, np.inf)
+        usadas = np.zeros(m + 1, dtype=bool)
+        while True:
+            usadas[j0] = True
+            i0 = fila_de[j0]
+            reducidos = costos[i0 - 1] - u[i0] - v[1:]
+            mejora = ~usadas[1:] & (reducidos < minimos[1:])
+            minimos[1:][mejora] = reducidos[mejora]
+            camino[1:][mejora] = j0
+            
+            libres = np.where(usadas[1:], np.inf, minimos[1:])
+            j1 = int(np.argmin(libres)) + 1
+            delta = libres[j1 - 1]
+            u[fila_de[usadas]] += delta
+            v[usadas] -= delta
+            minimos[~usadas] -= delta
+            j0 = j1
+            if fila_de[j0] == 0:
+                break
+        
+        # Invertir el camino de aumento
+        while j0:
+            j1 = camino[j0]
+            fila_de[j0] = fila_de[j1]
+            j0 = j1
+    
+    columnas = [0] * n
+    for j in range(1, m + 1):
+        if fila_de[j]:
+            columnas[fila_de[j] - 1] = j - 1
+    return columnas
+
+
+def obtener_lados(resultados):
+    """Lateralidad de cada mano de un resultado de MediaPipe (None si falta)"""
+    manos = resultados.multi_hand_landmarks or []
+    clasificaciones = resultados.multi_handedness or []
+    return [clasificaciones[i].classification[0].label if i < len(clasificaciones) else None
+            for i in range(len(manos))]
+
+
+def reflejar_resultados(resultados):
+    """
+    Refleja horizontalmente los landmarks de MediaPipe (x -> 1 - x) y
+    la lateralidad, como si la imagen se hubiera volteado antes de inferir
+    """
+    for lm_mano in resultados.multi_hand_landmarks or []:
+        for lm in lm_mano.landmark:
+            lm.x = 1.0 - lm.x
+    for clasificacion in resultados.multi_handedness or []:
+        for categoria in clasificacion.classification:
+            categoria.label = 'Left' if categoria.label == 'Right' else 'Right'
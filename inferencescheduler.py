@@ -0,0 +1,155 @@
+"""
+inferencescheduler.py
+Planificador de inferencia: MediaPipe cada k frames y landmarks extrapolados en los demás
+"""
+
+import collections
+import numpy as np
+from config import TRACKING_CONFIG
+from geometryutils import landmarks_a_array, MUÑECA, DEDOS_MCP
+from handtracker import HandTracker, obtener_lados
+
+
+# Misma interfaz que la salida de Hands.process() para el resto de la app
+ResultadosPredichos = collections.namedtuple('ResultadosPredichos',
+                                             ('multi_hand_landmarks', 'multi_handedness'))
+
+_MEDIO_MCP = DEDOS_MCP[1]
+
+
+class InferenceScheduler:
+    """
+    Decide en qué frames ejecutar MediaPipe y predice los landmarks en el resto
+    
+    Tras cada inferencia se estima la velocidad de cada landmark por track
+    (las manos se emparejan con un HandTracker propio) y se elige k según la
+    mano más rápida, medida en palmas por segundo: con las manos quietas se
+    infiere 1 de cada intervalo_maximo frames y a partir de velocidad_rapida
+    en todos. En los frames salteados los landmarks se extrapolan con
+    velocidad constante desde la última inferencia, así GestureDetector
+    sigue recibiendo manos en cada frame.
+    
+    Se infiere siempre que no haya manos (para encontrar las nuevas) y
+    cuando aparece una mano sin velocidad conocida. Una mano que entra
+    mientras se saltean frames se ve recién en la siguiente inferencia
+    (a lo sumo intervalo_maximo - 1 frames después).
+    """
+    
+    def __init__(self, intervalo_maximo=4, velocidad_quieta=0.3, velocidad_rapida=2.0, suavizado=0.5):
+        """
+        Args:
+            intervalo_maximo: k con las manos quietas (1 = inferir siempre)
+            velocidad_quieta: Palmas por segundo bajo las que se usa intervalo_maximo
+            velocidad_rapida: Palmas por segundo desde las que se infiere en cada frame
+            suavizado: Peso de la velocidad recién medida frente a la anterior
+        """
+        self.intervalo_maximo = max(1, int(intervalo_maximo))
+        self.velocidad_quieta = velocidad_quieta
+        self.velocidad_rapida = velocidad_rapida
+        self.suavizado = suavizado
+        self.tracker = HandTracker(**TRACKING_CONFIG)
+        
+        self.intervalo = 1
+        self.pendientes = 0          # Frames que aún se pueden predecir
+        self.base = None             # Resultados de la última inferencia
+        self.puntos = np.zeros((0, 21, 3))
+        self.velocidades = np.zeros((0, 21, 3))
+        self.tiempo = 0.0
+        self._tracks = {}            # ID -> (puntos, velocidad, tiempo) de la última inferencia
+        self.inferencias = 0
+        self.predicciones = 0
+    
+    def debe_inferir(self):
+        """True si el frame actual necesita MediaPipe"""
+        return self.pendientes <= 0 or self.base is None
+    
+    def registrar(self, resultados, tiempo):
+        """
+        Actualiza el modelo de movimiento con una inferencia real
+        
+        Args:
+            resultados: Salida de Hands.process() (ya en coordenadas del frame completo)
+            tiempo: Instante de captura del frame (segundos)
+        """
+        self.inferencias += 1
+        manos = resultados.multi_hand_landmarks or []
+        if not manos:
+            self.base = None
+            self.pendientes = 0
+            self.tracker.actualizar(np.zeros((0, 21, 3)))
+            return
+        
+        puntos = np.stack([landmarks_a_array(lm_mano.landmark) for lm_mano in manos])
+        ids = self.tracker.actualizar(puntos, obtener_lados(resultados))
+        
+        velocidades = np.zeros_like(puntos)
+        conocidas = True
+        tracks = {}
+        for k, id_mano in enumerate(ids):
+            previo = self._tracks.get(id_mano)
+            if previo is None or tiempo <= previo[2]:
+                conocidas = False
+            else:
+                medida = (puntos[k] - previo[0]) / (tiempo - previo[2])
+                velocidades[k] = self.suavizado * medida + (1 - self.suavizado) * previo[1]
+            tracks[id_mano] = (puntos[k], velocidades[k], tiempo)
+        self._tracks = tracks
+        
+        self.base = resultados
+        self.puntos = puntos
+        self.velocidades = velocidades.copy()
+        self.tiempo = tiempo
+        
+        # Rapidez de cada mano en palmas por segundo; se usa la velocidad media de
+        # sus landmarks, donde el temblor independiente de cada uno se cancela
+        palma = np.linalg.norm(puntos[:, _MEDIO_MCP, :2] - puntos[:, MUÑECA, :2], axis=-1)
+        rapidez = np.linalg.norm(velocidades[..., :2].mean(axis=1), axis=-1) / np.maximum(palma, 1e-6)
+        
+        # Una mano quieta se mantiene donde está: su "velocidad" es solo el temblor de los landmarks
+        self.velocidades[rapidez <= self.velocidad_quieta] = 0.0
+        
+        self.intervalo = self._elegir_intervalo(float(rapidez.max())) if conocidas else 1
+        self.pendientes = self.intervalo - 1
+    
+    def _elegir_intervalo(self, movimiento):
+        """k según la rapidez de la mano más rápida (palmas por segundo)"""
+        if movimiento <= self.velocidad_quieta:
+            return self.intervalo_maximo
+        if movimiento >= self.velocidad_rapida:
+            return 1
+        fraccion = (self.velocidad_rapida - movimiento) / (self.velocidad_rapida - self.velocidad_quieta)
+        return 1 + int(round((self.intervalo_maximo - 1) * fraccion))
+    
+    def predecir(self, tiempo):
+        """
+        Extrapola los landmarks de la última inferencia al instante indicado
+        
+        Los landmarks se escriben en copias de los de la última inferencia
+        (conservan visibilidad y presencia), así el render de un frame
+        anterior no ve cambiar los suyos.
+        
+        Args:
+            tiempo: Instante de captura del frame salteado (segundos)
+        
+        Returns:
+            ResultadosPredichos
+        """
+        self.pendientes -= 1
+        self.predicciones += 1
+        predichos = (self.puntos + self.velocidades * (tiempo - self.tiempo)).tolist()
+        
+        manos = []
+        for lm_mano, coordenadas in zip(self.base.multi_hand_landmarks, predichos):
+            copia = type(lm_mano)()
+            copia.CopyFrom(lm_mano)
+            for lm, (x, y, z) in zip(copia.landmark, coordenadas):
+                lm.x = x
+                lm.y = y
+                lm.z = z
+            manos.append(copia)
+        return ResultadosPredichos(manos, self.base.multi_handedness)
+    
+    def fraccion_inferida(self):
+        """Fracción de frames en los que se ejecutó MediaPipe"""
+        total = self.inferencias + self.predicciones
+        return self.inferencias / total if total else 1.0
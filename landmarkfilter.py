@@ -0,0 +1,112 @@
+"""
+landmarkfilter.py
+Suavizado temporal de landmarks por mano (One-Euro o exponencial)
+"""
+
+import math
+import numpy as np
+
+
+class LandmarkFilter:
+    """
+    Filtra los 21 landmarks de todas las manos de un frame en una sola operación
+    
+    El estado se guarda por ID de mano (ver handtracker.py); las manos que no
+    aparecen en un frame pierden su estado y al volver arrancan sin suavizado,
+    para no arrastrar posiciones viejas.
+    
+    Tipos:
+        'one_euro': frecuencia de corte adaptativa; suaviza mucho con la mano
+                    quieta y casi nada cuando se mueve rápido (poco retraso)
+        'exponencial': media móvil exponencial con alfa fijo
+    """
+    
+    def __init__(self, tipo='one_euro', frecuencia_minima=1.5, beta=10.0,
+                 frecuencia_derivada=1.0, alfa=0.5, periodo_defecto=1 / 30):
+        """
+        Args:
+            tipo: 'one_euro' o 'exponencial'
+            frecuencia_minima: Corte (Hz) de One-Euro con la mano quieta
+            beta: Cuánto sube el corte con la velocidad (One-Euro)
+            frecuencia_derivada: Corte (Hz) del filtro de la velocidad (One-Euro)
+            alfa: Peso del frame nuevo (exponencial)
+            periodo_defecto: Segundos entre frames si no hay marca de tiempo válida
+        """
+        if tipo not in ('one_euro', 'exponencial'):
+            raise ValueError(f"Tipo de filtro desconocido: {tipo}")
+        self.tipo = tipo
+        self.frecuencia_minima = frecuencia_minima
+        self.beta = beta
+        self.frecuencia_derivada = frecuencia_derivada
+        self.alfa = alfa
+        self.periodo_defecto = periodo_defecto
+        
+        self.posiciones = {}    # id -> (21, 3) última posición filtrada
+        self.velocidades = {}   # id -> (21, 3) velocidad filtrada
+        self.tiempos = {}       # id -> marca de tiempo del último frame
+    
+    def filtrar(self, ids, puntos, tiempo):
+        """
+        Suaviza los landmarks de las manos de un frame
+        
+        Args:
+            ids: ID estable de cada mano
+            puntos: Array (n, 21, 3)
+            tiempo: Marca de tiempo del frame en segundos
+        
+        Returns:
+            np.ndarray: Landmarks filtrados (n, 21, 3)
+        """
+        puntos = np.asarray(puntos, dtype=np.float64)
+        previas = [i for i, id_mano in enumerate(ids) if id_mano in self.posiciones]
+        salida = puntos.copy()
+        
+        if previas:
+            ids_previos = [ids[i] for i in previas]
+            x = puntos[previas]
+            x_anterior = np.stack([self.posiciones[id_mano] for id_mano in ids_previos])
+            dt = np.array([tiempo - self.tiempos[id_mano] for id_mano in ids_previos])
+            dt = np.where(dt > 0, dt, self.periodo_defecto)[:, None, None]
+            
+            if self.tipo == 'exponencial':
+                salida[previas] = x_anterior + self.alfa * (x - x_anterior)
+            else:
+                v_anterior = np.stack([self.velocidades[id_mano] for id_mano in ids_previos])
+                v = (x - x_anterior) / dt
+                v_filtrada = v_anterior + _alfa(self.frecuencia_derivada, dt) * (v - v_anterior)
+                corte = self.frecuencia_minima + self.beta * np.abs(v_filtrada)
+                salida[previas] = x_anterior + _alfa(corte, dt) * (x - x_anterior)
+                for k, id_mano in enumerate(ids_previos):
+                    self.velocidades[id_mano] = v_filtrada[k]
+        
+        # Solo se conserva el estado de las manos presentes
+        self.posiciones = {id_mano: salida[i] for i, id_mano in enumerate(ids)}
+        self.velocidades = {id_mano: self.velocidades.get(id_mano, np.zeros((21, 3)))
+                            for id_mano in ids}
+        self.tiempos = {id_mano: tiempo for id_mano in ids}
+        return salida
+    
+    def reiniciar(self):
+        """Descarta el estado de todas las manos"""
+        self.posiciones.clear()
+        self.velocidades.clear()
+        self.tiempos.clear()
+
+
+def _alfa(frecuencia_corte, dt):
+    """Factor de suavizado de un filtro paso bajo de primer orden"""
+    tau = 1.0 / (2 * math.pi * frecuencia_corte)
+    return 1.0 / (1.0 + tau / dt)
+
+
+def crear_filtro(config):
+    """Crea el filtro indicado en FILTER_CONFIG (None si está desactivado)"""
+    if not config['tipo']:
+        return None
+    return LandmarkFilter(
+        tipo=config['tipo'],
+        frecuencia_minima=config['frecuencia_minima'],
+        beta=config['beta'],
+        frecuencia_derivada=config['frecuencia_derivada'],
+        alfa=config['alfa']
+    )
@@ -0,0 +1,227 @@
+"""
+landmarkrecorder.py
+Grabación de landmarks en formato binario y reproducción con memoria mapeada
+"""
+
+import argparse
+import struct
+import time
+import numpy as np
+from config import RECORDING_CONFIG
+from gesturedetector import GestureDetector
+from resultswriter import escribir_resultados
+
+
+# ========== FORMATO DEL ARCHIVO ==========
+# Cabecera de 16 bytes: firma, versión, reservado, ancho y alto del frame
+CABECERA = struct.Struct('<4sHHII')
+FIRMA = b'LMRK'
+VERSION = 2
+
+# Un registro de ancho fijo por mano detectada, en orden de frame
+REGISTRO = np.dtype([
+    ('frame', '<u4'),              # Número de frame
+    ('mano', '<u4'),               # ID de la mano (HandTracker)
+    ('lado', 'u1'),                # 0=Left, 1=Right, 255=Desconocida
+    ('filtrado', 'u1'),            # 1 si los landmarks ya pasaron por el suavizado
+    ('reservado', '<u2'),
+    ('tiempo', '<f8'),             # Segundos (time.time() al capturar)
+    ('landmarks', '<f4', (21, 3))  # x, y, z normalizados, tal como los clasificó la app
+])
+
+# Versión 1: índice de la mano en el resultado de MediaPipe y landmarks sin filtrar
+REGISTRO_V1 = np.dtype([
+    ('frame', '<u4'),
+    ('mano', 'u1'),
+    ('lado', 'u1'),
+    ('reservado', '<u2'),
+    ('tiempo', '<f8'),
+    ('landmarks', '<f4', (21, 3))
+])
+REGISTROS = {1: REGISTRO_V1, VERSION: REGISTRO}
+
+LADOS = ('Left', 'Right')
+LADO_DESCONOCIDO = 255
+
+
+class LandmarkRecorder:
+    """
+    Escribe en un archivo binario las manos que clasificó la app en cada frame
+    
+    Se graban los IDs del tracker y los landmarks después del suavizado, así
+    la reproducción confirma los gestos por las mismas manos y sobre los
+    mismos puntos que la app en vivo.
+    """
+    
+    def __init__(self, ruta, ancho, alto):
+        """
+        Args:
+            ruta: Archivo de salida
+            ancho, alto: Tamaño del frame en píxeles (para bounding boxes al reproducir)
+        """
+        self.ruta = ruta
+        self.archivo = open(ruta, 'wb')
+        self.archivo.write(CABECERA.pack(FIRMA, VERSION, 0, ancho, alto))
+        self.registros = 0
+    
+    def escribir(self, frame, tiempo, ids, lados, puntos, filtrado=False):
+        """
+        Agrega las manos de un frame
+        
+        Args:
+            frame: Número de frame
+            tiempo: Marca de tiempo en segundos
+            ids: ID de cada mano (HandTracker)
+            lados: Lateralidad de cada mano ('Left'/'Right'/None)
+            puntos: Array (n, 21, 3) con los landmarks que se clasificaron
+            filtrado: True si los puntos ya pasaron por el suavizado
+        """
+        if len(ids) == 0:
+            return
+        
+        bloque = np.zeros(len(ids), dtype=REGISTRO)
+        bloque['frame'] = frame
+        bloque['tiempo'] = tiempo
+        bloque['mano'] = ids
+        bloque['filtrado'] = filtrado
+        bloque['lado'] = [LADOS.index(lado) if lado in LADOS else LADO_DESCONOCIDO for lado in lados]
+        bloque['landmarks'] = puntos
+        
+        self.archivo.write(bloque.tobytes())
+        self.registros += len(ids)
+    
+    def cerrar(self):
+        """Cierra el archivo"""
+        if not self.archivo.closed:
+            self.archivo.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.cerrar()
+
+
+class LandmarkReplay:
+    """
+    Lee una grabación mapeándola en memoria (sin copiar los landmarks)
+    
+    Atributos:
+        registros: Array estructurado (M,) con dtype REGISTRO
+        landmarks: Vista (M, 21, 3) float32 de los landmarks
+        ancho, alto: Tamaño del frame original
+        aspecto: ancho / alto (None si la grabación no lo guarda)
+    """
+    
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with open(ruta, 'rb') as archivo:
+            firma, version, _, self.ancho, self.alto = CABECERA.unpack(archivo.read(CABECERA.size))
+        if firma != FIRMA or version not in REGISTROS:
+            raise ValueError(f"{ruta} no es una grabación de landmarks válida")
+        self.aspecto = self.ancho / self.alto if self.ancho and self.alto else None
+        self.version = version
+        registro = REGISTROS[version]
+        
+        tamaño = (_tamaño_archivo(ruta) - CABECERA.size) // registro.itemsize
+        if tamaño > 0:
+            self.registros = np.memmap(ruta, dtype=registro, mode='r',
+                                       offset=CABECERA.size, shape=(tamaño,))
+        else:
+            self.registros = np.zeros(0, dtype=registro)
+        self.landmarks = self.registros['landmarks']
+    
+    def __len__(self):
+        return len(self.registros)
+    
+    def reproducir(self, detector=None, tamaño_bloque=65536):
+        """
+        Pasa toda la grabación por el detector
+        
+        Los gestos se clasifican en bloques con detectar_vocales_lote sobre la
+        vista mapeada; la confirmación se aplica registro a registro en orden,
+        por ID de mano, y al cerrar cada frame se olvidan las manos ausentes
+        como en la app (los frames sin manos no se graban, se deducen de los
+        saltos en el número de frame). Las grabaciones de la versión 1 guardan
+        el índice de MediaPipe en lugar del ID y los landmarks sin filtrar.
+        
+        Args:
+            detector: GestureDetector a usar (None = uno nuevo)
+            tamaño_bloque: Manos clasificadas por llamada
+        
+        Yields:
+            tuple: Filas en el orden de resultswriter.COLUMNAS
+        """
+        detector = detector or GestureDetector()
+        frames_olvido = detector.confirmacion.frames_olvido
+        frame_actual = None
+        presentes = []
+        
+        for inicio in range(0, len(self.registros), tamaño_bloque):
+            bloque = self.registros[inicio:inicio + tamaño_bloque]
+            puntos = bloque['landmarks']
+            gestos, _ = detector.detectar_vocales_lote(puntos, aspecto=self.aspecto)
+            
+            # Bounding boxes de todo el bloque (misma fórmula que calcular_bounding_box)
+            cajas = np.concatenate([
+                puntos[..., 0].min(axis=-1, keepdims=True) * self.ancho,
+                puntos[..., 1].min(axis=-1, keepdims=True) * self.alto,
+                puntos[..., 0].max(axis=-1, keepdims=True) * self.ancho,
+                puntos[..., 1].max(axis=-1, keepdims=True) * self.alto,
+            ], axis=-1).astype(int).tolist()
+            
+            frames = bloque['frame'].tolist()
+            tiempos = (bloque['tiempo'] * 1000).round(1).tolist()
+            manos = bloque['mano'].tolist()
+            lados = bloque['lado'].tolist()
+            
+            for k, detectada in enumerate(gestos):
+                if frames[k] != frame_actual:
+                    if frame_actual is not None:
+                        detector.olvidar_ausentes(presentes)
+                        for _ in range(min(frames[k] - frame_actual - 1, frames_olvido + 1)):
+                            detector.olvidar_ausentes(())
+                    frame_actual = frames[k]
+                    presentes = []
+                presentes.append(manos[k])
+                
+                confirmada = detector.confirmar_con_liberacion(manos[k], detectada)
+                lado = LADOS[lados[k]] if lados[k] < len(LADOS) else ''
+                yield (self.ruta, frames[k], tiempos[k], manos[k], lado,
+                       *cajas[k], detectada or '', confirmada or '')
+
+
+def _tamaño_archivo(ruta):
+    """Retorna el tamaño del archivo en bytes"""
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(0, 2)
+        return archivo.tell()
+
+
+def main():
+    """Reproduce grabaciones de landmarks por el detector y guarda los resultados"""
+    parser = argparse.ArgumentParser(
+        description='Reproduce grabaciones de landmarks sin volver a ejecutar MediaPipe')
+    parser.add_argument('grabaciones', nargs='+', help='Archivos de landmarks grabados')
+    parser.add_argument('-o', '--salida', default=RECORDING_CONFIG['salida_reproduccion'],
+                        help='Archivo CSV de resultados (.csv o .csv.gz)')
+    args = parser.parse_args()
+    
+    inicio = time.perf_counter()
+    manos = 0
+    
+    def filas():
+        nonlocal manos
+        for ruta in args.grabaciones:
+            replay = LandmarkReplay(ruta)
+            manos += len(replay)
+            print(f"Reproduciendo {ruta} ({len(replay)} manos)...")
+            yield from replay.reproducir()
+    
+    total = escribir_resultados(filas(), args.salida)
+    duracion = time.perf_counter() - inicio
+    print(f"✓ {manos} manos, {total} filas en {duracion:.2f}s -> {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
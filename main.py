@@ -3,47 +3,234 @@ main.py
 Programa principal para detección de gestos de vocales en lenguaje de señas
 """
 
-import cv2
-import mediapipe as mp
 import time
-from config import MEDIAPIPE_CONFIG, CAMERA_CONFIG, VISUAL_CONFIG
-from audiomanager import AudioManager
+_inicio_importacion = time.perf_counter()
+
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    MEDIAPIPE_CONFIG, CAMERA_CONFIG, VISUAL_CONFIG, PIPELINE_CONFIG, RECORDING_CONFIG, METRICS_CONFIG,
+    ROI_CONFIG, ADAPTIVE_CONFIG, TRACKING_CONFIG, STARTUP_CONFIG, FILTER_CONFIG, HEADLESS_CONFIG,
+    EVENTBUS_CONFIG, SPELLING_CONFIG, SCHEDULER_CONFIG
+)
+from framebuffers import FramePool, BufferSet
 from gesturedetector import GestureDetector
-from geometryutils import calcular_bounding_box
+from geometryutils import calcular_bounding_box, landmarks_a_array
+from handtracker import HandTracker, obtener_lados, reflejar_resultados
+from landmarkfilter import crear_filtro
+from metrics import Profiler
+
+# MediaPipe se importa al cargar el modelo, en paralelo con la cámara y el audio.
+# Los módulos de cada modo (audio, calidad adaptativa, ROI, planificador,
+# pipeline, grabación, eventos, video anotado, bus y deletreo) se importan
+# solo si el modo está activo.
+_TIEMPO_IMPORTACION = time.perf_counter() - _inicio_importacion
 
 
 class GestureRecognitionApp:
     """Aplicacion principal de reconocimientos de gestos"""
     
-    def __init__(self):
-        # Inicializar componentes
-        self.audio_manager = AudioManager()
+    def __init__(self, abrir_camara=True, audio=True, sin_ventana=None):
+        """
+        Args:
+            abrir_camara: False para alimentar la app con frames/landmarks
+                          externos (por ejemplo desde benchmark.py)
+            audio: False para no inicializar el audio
+            sin_ventana: True para no dibujar ni mostrar nada y publicar los
+                         resultados como eventos (None = HEADLESS_CONFIG['activo'])
+        """
+        # Métricas por etapa
+        self.perfil = Profiler(
+            ventana=METRICS_CONFIG['ventana'],
+            intervalo_exportacion=METRICS_CONFIG['intervalo_exportacion'],
+            archivo=METRICS_CONFIG['archivo']
+        )
+        
+        inicio = time.perf_counter()
+        self.tiempos_inicio = {'importacion': _TIEMPO_IMPORTACION}
+        self.sin_ventana = HEADLESS_CONFIG['activo'] if sin_ventana is None else sin_ventana
+        
+        # Frames de captura y buffers intermedios reutilizables
+        self.frames = FramePool(self.perfil)
+        self.buffers = BufferSet(self.perfil)
+        self.espejo_landmarks = CAMERA_CONFIG['espejo'] == 'landmarks'
+        
+        # Inicializar componentes livianos
         self.gesture_detector = GestureDetector()
+        self.tracker = HandTracker(**TRACKING_CONFIG)
+        self.filtro = crear_filtro(FILTER_CONFIG)
         
-        # Configurar MediaPipe
-        self.mp_manos = mp.solutions.hands
-        self.mp_dibujo = mp.solutions.drawing_utils
-        self.manos = self.mp_manos.Hands(**MEDIAPIPE_CONFIG)
+        # Ajuste de calidad en tiempo de ejecución
+        self.controlador = None
+        self.manos_config = dict(MEDIAPIPE_CONFIG)
+        self.escala_entrada = 1.0
+        if ADAPTIVE_CONFIG['activo']:
+            from adaptivecontroller import AdaptiveController
+            self.controlador = AdaptiveController(
+                ADAPTIVE_CONFIG['niveles'],
+                ADAPTIVE_CONFIG['presupuesto_ms'],
+                ventana=ADAPTIVE_CONFIG['ventana'],
+                margen_mejora=ADAPTIVE_CONFIG['margen_mejora'],
+                ventanas_para_mejorar=ADAPTIVE_CONFIG['ventanas_para_mejorar']
+            )
+            nivel = self.controlador.nivel_actual()
+            self.manos_config.update(model_complexity=nivel['model_complexity'],
+                                     max_num_hands=nivel['max_num_hands'])
+            self.escala_entrada = nivel['escala']
+        
+        # Recorte alrededor de las manos del frame anterior
+        self.roi = None
+        if ROI_CONFIG['activo']:
+            from roitracker import ROITracker
+            self.roi = ROITracker(
+                margen=ROI_CONFIG['margen'],
+                intervalo_completo=ROI_CONFIG['intervalo_completo'],
+                area_maxima=ROI_CONFIG['area_maxima'],
+                buffers=self.buffers
+            )
         
-        # Configurar cámara
-        self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_CONFIG['width'])
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_CONFIG['height'])
-        self.cap.set(cv2.CAP_PROP_FPS, CAMERA_CONFIG['fps'])
+        # MediaPipe cada k frames; en los demás se extrapolan los landmarks
+        self.planificador = None
+        if SCHEDULER_CONFIG['activo']:
+            from inferencescheduler import InferenceScheduler
+            self.planificador = InferenceScheduler(
+                intervalo_maximo=SCHEDULER_CONFIG['intervalo_maximo'],
+                velocidad_quieta=SCHEDULER_CONFIG['velocidad_quieta'],
+                velocidad_rapida=SCHEDULER_CONFIG['velocidad_rapida'],
+                suavizado=SCHEDULER_CONFIG['suavizado']
+            )
+        
+        # Modelo, cámara y audio son lentos e independientes: se inician a la vez.
+        # Sin ventana el audio solo se inicia si HEADLESS_CONFIG['audio'] lo pide
+        audio = audio and (not self.sin_ventana or HEADLESS_CONFIG['audio'])
+        tareas = {'modelo': self._cargar_modelo}
+        if audio:
+            tareas['audio'] = self._crear_audio
+        if abrir_camara:
+            tareas['camara'] = self._abrir_camara
+        
+        if STARTUP_CONFIG['paralelo']:
+            with ThreadPoolExecutor(max_workers=len(tareas)) as pool:
+                futuros = {nombre: pool.submit(self._medir_inicio, nombre, tarea)
+                           for nombre, tarea in tareas.items()}
+                resultados = {nombre: futuro.result() for nombre, futuro in futuros.items()}
+        else:
+            resultados = {nombre: self._medir_inicio(nombre, tarea) for nombre, tarea in tareas.items()}
+        
+        self.audio_manager = resultados['audio'] if audio else self._crear_audio(habilitado=False)
+        self.cap = resultados.get('camara')
+        self.tiempos_inicio['total'] = time.perf_counter() - inicio
         
         # Estado
         self.ultimo_tiempo_gesto = {}
-        self.tiempo_prev = 0
+        self.ultima_detectada = {}
         self.corriendo = True
+        self.num_frame = 0
+        self.grabador = None
+        self.resumen_metricas = self.perfil.resumen()
+        self.ultima_actualizacion_metricas = 0
         
         # Configuración visual
         self.colores = VISUAL_CONFIG['colores']
         self.grosor = VISUAL_CONFIG['grosor']
         self.tamaños = VISUAL_CONFIG['tamaños']
+        
+        # Modo sin ventana: eventos JSONL y, opcionalmente, video anotado en segundo plano
+        self.eventos = None
+        self.video = None
+        if self.sin_ventana:
+            if HEADLESS_CONFIG['eventos']:
+                from eventwriter import EventWriter
+                self.eventos = EventWriter(HEADLESS_CONFIG['eventos'], HEADLESS_CONFIG['intervalo_flush'])
+            if HEADLESS_CONFIG['video']:
+                from videowriter import AnnotatedVideoWriter
+                cada = HEADLESS_CONFIG['video_cada']
+                self.video = AnnotatedVideoWriter(
+                    HEADLESS_CONFIG['video'], self._dibujar_anotaciones,
+                    cada=cada,
+                    fps=HEADLESS_CONFIG['video_fps'] or CAMERA_CONFIG['fps'] / cada,
+                    codec=HEADLESS_CONFIG['video_codec'],
+                    tamaño_cola=HEADLESS_CONFIG['tamaño_cola_video'],
+                    espejo=self.espejo_landmarks
+                )
+        
+        # Bus de eventos para otros procesos (latencia medida desde la captura del frame)
+        self.bus = None
+        self.crear_evento = None
+        if EVENTBUS_CONFIG['activo']:
+            from eventbus import crear_bus, crear_evento
+            self.bus = crear_bus()
+            self.crear_evento = crear_evento
+        self.tiempo_captura = None   # Captura del frame que se está procesando
+        
+        # Letras y palabras a partir de los gestos confirmados
+        self.deletreo = None
+        if SPELLING_CONFIG['activo']:
+            from spelling import Deletreador
+            self.deletreo = Deletreador.desde_config()
+    
+    def _medir_inicio(self, nombre, tarea):
+        """Ejecuta una tarea de arranque y guarda su duración"""
+        inicio = time.perf_counter()
+        resultado = tarea()
+        self.tiempos_inicio[nombre] = time.perf_counter() - inicio
+        return resultado
+    
+    def _crear_audio(self, habilitado=True):
+        """Crea el motor de audio (pygame se importa solo si se usa)"""
+        from audioengine import crear_audio
+        return crear_audio(habilitado=habilitado, perfil=self.perfil)
+    
+    def _cargar_modelo(self):
+        """Importa MediaPipe y construye Hands"""
+        import mediapipe as mp
+        self.mp_manos = mp.solutions.hands
+        self.mp_dibujo = mp.solutions.drawing_utils
+        self.manos = self.mp_manos.Hands(**self.manos_config)
     
-    def procesar_mano(self, i_mano, lm_mano, frame, h, w, resultados):
-        """Procesa una mano detectada"""
+    def _abrir_camara(self):
+        """Abre y configura la cámara"""
+        cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_CONFIG['width'])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_CONFIG['height'])
+        cap.set(cv2.CAP_PROP_FPS, CAMERA_CONFIG['fps'])
+        return cap
+    
+    def procesar_mano(self, i_mano, lm_mano, frame, h, w, resultados, gesto_detectado, id_mano=None):
+        """
+        Procesa una mano detectada (el gesto ya viene clasificado en lote)
+        
+        i_mano es la posición en los resultados de MediaPipe; id_mano es el
+        ID estable del tracker, usado para la confirmación y el audio.
         
+        Returns:
+            tuple: (etiqueta de la mano, gesto confirmado o None)
+        """
+        if id_mano is None:
+            id_mano = i_mano
+        
+        # Obtener etiqueta de mano
+        etiqueta_mano = "Desconocida"
+        if resultados.multi_handedness and len(resultados.multi_handedness) > i_mano:
+            etiqueta_mano = resultados.multi_handedness[i_mano].classification[0].label
+        
+        # Confirmar gesto
+        with self.perfil.medir('confirmacion'):
+            gesto_confirmado = self.gesture_detector.confirmar_gesto(id_mano, gesto_detectado)
+        
+        # Manejar reproducción de audio (antes de dibujar, para no retrasarlo)
+        with self.perfil.medir('audio'):
+            self._manejar_audio(id_mano, gesto_detectado, gesto_confirmado)
+        
+        if not self.sin_ventana:
+            with self.perfil.medir('dibujo'):
+                self._dibujar_mano(frame, lm_mano, h, w, id_mano, etiqueta_mano,
+                                   gesto_detectado, gesto_confirmado)
+        return etiqueta_mano, gesto_confirmado
+    
+    def _dibujar_mano(self, frame, lm_mano, h, w, id_mano, etiqueta_mano, gesto_detectado, gesto_confirmado):
+        """Dibuja landmarks, bounding box e información de una mano"""
         # Dibujar landmarks
         self.mp_dibujo.draw_landmarks(
             frame,
@@ -59,8 +246,7 @@ class GestureRecognitionApp:
                 thickness=self.grosor['conexiones']
             )
         )
-
-
+        
         # Calcular bounding box
         x_min, y_min, x_max, y_max, cx, cy = calcular_bounding_box(lm_mano.landmark, w, h)
         
@@ -70,28 +256,27 @@ class GestureRecognitionApp:
         cv2.circle(frame, (cx, cy), self.tamaños['circulo_centro'],
                   self.colores['bbox'], -1)
         
-        # Obtener etiqueta de mano
-        etiqueta_mano = "Desconocida"
-        if resultados.multi_handedness and len(resultados.multi_handedness) > i_mano:
-            etiqueta_mano = resultados.multi_handedness[i_mano].classification[0].label
-        
-        # Detectar gesto
-        gesto_detectado = self.gesture_detector.detectar_vocal(lm_mano.landmark, etiqueta_mano)
-        
-        # Confirmar gesto
-        gesto_confirmado = self.gesture_detector.confirmar_gesto(i_mano, gesto_detectado)
-        
-        # Manejar reproducción de audio
-        self._manejar_audio(i_mano, gesto_detectado, gesto_confirmado)
-        
         # Dibujar información
-        self._dibujar_info(frame, i_mano, etiqueta_mano, x_min, y_min, y_max,
+        self._dibujar_info(frame, id_mano, etiqueta_mano, x_min, y_min, y_max,
                           gesto_detectado, gesto_confirmado)
     
+    def _dibujar_anotaciones(self, frame, anotaciones):
+        """Dibuja las manos de un frame del video anotado (hilo del codificador)"""
+        h, w = frame.shape[:2]
+        for lm_mano, id_mano, etiqueta_mano, gesto_detectado, gesto_confirmado in anotaciones:
+            self._dibujar_mano(frame, lm_mano, h, w, id_mano, etiqueta_mano,
+                               gesto_detectado, gesto_confirmado)
+    
     def _manejar_audio(self, i_mano, gesto_detectado, gesto_confirmado):
-        """Maneja la lógica de reproducción de audio"""
+        """Maneja la lógica de reproducción de audio (y publica los cambios en el bus)"""
         ahora = time.time()
         
+        if self.bus is not None and gesto_detectado != self.ultima_detectada.get(i_mano):
+            self.ultima_detectada[i_mano] = gesto_detectado
+            if gesto_detectado is not None:
+                self.bus.publicar(self.crear_evento('deteccion', i_mano, gesto_detectado,
+                                                    tiempo_captura=self.tiempo_captura))
+        
         if i_mano in self.ultimo_tiempo_gesto:
             ultima_letra, ultimo_ts = self.ultimo_tiempo_gesto[i_mano]
         else:
@@ -102,11 +287,20 @@ class GestureRecognitionApp:
             if ultima_letra != gesto_confirmado:
                 self.audio_manager.reproducir(gesto_confirmado)
                 self.ultimo_tiempo_gesto[i_mano] = (gesto_confirmado, ahora)
+                if self.bus is not None:
+                    self.bus.publicar(self.crear_evento('confirmacion', i_mano, gesto_confirmado,
+                                                        tiempo_captura=self.tiempo_captura))
+                if self.eventos is not None:
+                    self.eventos.emitir({'tipo': 'gesto', 'frame': self.num_frame, 'tiempo': round(ahora, 3),
+                                         'mano': i_mano, 'gesto': gesto_confirmado})
                 print(f"Mano {i_mano}: Reproduciendo '{gesto_confirmado}'")
         else:
             if ultima_letra is not None and gesto_detectado is None:
                 self.ultimo_tiempo_gesto[i_mano] = (None, ahora)
                 self.gesture_detector.limpiar_buffer(i_mano)
+                if self.bus is not None:
+                    self.bus.publicar(self.crear_evento('liberacion', i_mano, ultima_letra,
+                                                        tiempo_captura=self.tiempo_captura))
     
     def _dibujar_info(self, frame, i_mano, etiqueta, x_min, y_min, y_max,
                      gesto_detectado, gesto_confirmado):
@@ -130,17 +324,41 @@ class GestureRecognitionApp:
             cv2.putText(frame, 'Gesto: -', (x_min, y_max + 25),
                        cv2.FONT_HERSHEY_SIMPLEX, self.tamaños['fuente_detectando'],
                        self.colores['texto_sin_gesto'], self.grosor['texto_normal'])
- 
+    
     def _dibujar_fps(self, frame):
-        """Calcula y dibuja FPS"""
-        tiempo_actual = time.time()
-        fps = 1 / (tiempo_actual - self.tiempo_prev) if self.tiempo_prev != 0 else 0
-        self.tiempo_prev = tiempo_actual
+        """Dibuja FPS (mediana del periodo de frame) y, si está activo, la latencia por etapa"""
+        ahora = time.perf_counter()
+        if ahora - self.ultima_actualizacion_metricas >= METRICS_CONFIG['refresco_overlay']:
+            # Los percentiles se recalculan pocas veces por segundo, no en cada frame
+            self.ultima_actualizacion_metricas = ahora
+            self.resumen_metricas = self.perfil.resumen()
         
-        cv2.putText(frame, f'FPS: {int(fps)}', (10, 30),
+        cv2.putText(frame, f'FPS: {int(self.resumen_metricas["fps"])}', (10, 30),
                    cv2.FONT_HERSHEY_SIMPLEX, self.tamaños['fuente_fps'],
                    self.colores['texto_confirmado'], self.grosor['texto_normal'])
-
+        
+        if not METRICS_CONFIG['overlay']:
+            return
+        
+        y = 55
+        for etapa, p in self.resumen_metricas['etapas'].items():
+            if etapa == 'frame':
+                continue
+            cv2.putText(frame, f"{etapa}: {p['p50']:.1f} / {p['p95']:.1f} / {p['p99']:.1f} ms",
+                       (10, y), cv2.FONT_HERSHEY_SIMPLEX, self.tamaños['fuente_metricas'],
+                       self.colores['texto_detectando'], 1)
+            y += 18
+    
+    def _dibujar_deletreo(self, frame):
+        """Dibuja las palabras en curso y su mejor completado al pie del frame"""
+        y = frame.shape[0] - 20
+        for id_mano, prefijo, sugerencias in self.deletreo.en_curso():
+            texto = f"Mano {id_mano}: {prefijo}" + (f"  -> {sugerencias[0]}" if sugerencias else '')
+            cv2.putText(frame, texto, (10, y), cv2.FONT_HERSHEY_SIMPLEX,
+                       self.tamaños['fuente_fps'], self.colores['texto_confirmado'],
+                       self.grosor['texto_normal'])
+            y -= 30
+    
     def ejecutar(self):
         """bucle principal del programa"""
         
@@ -150,55 +368,367 @@ class GestureRecognitionApp:
         print(f"Audio disponible: {'✓ Sí' if self.audio_manager.esta_disponible() else '✗ No'}")
         if self.audio_manager.esta_disponible():
             print(f"Vocales cargadas: {', '.join(self.audio_manager.obtener_vocales_disponibles())}")
-        print("\nControles:")
-        print("  ESC o Q - Salir")
+        print("Inicio: " + ", ".join(f"{nombre} {segundos:.2f}s"
+                                     for nombre, segundos in self.tiempos_inicio.items()))
+        if self.sin_ventana:
+            print(f"Sin ventana: eventos en {HEADLESS_CONFIG['eventos']}"
+                  + (f", video anotado en {HEADLESS_CONFIG['video']}" if self.video else ""))
+            print("\nControles:")
+            print("  Ctrl+C - Salir")
+        else:
+            print("\nControles:")
+            print("  ESC o Q - Salir")
         print("="*60 + "\n")
         
+        try:
+            if PIPELINE_CONFIG['modo'] == 'hilos':
+                self._ejecutar_pipeline()
+            else:
+                self._ejecutar_secuencial()
+        finally:
+            # También al interrumpir, para no perder eventos ni el final del video
+            self.limpiar()
+    
+    def _ejecutar_secuencial(self):
+        """Captura, inferencia y render uno tras otro en el hilo principal"""
         while self.corriendo:
-            ret, frame = self.cap.read()
-            if not ret:
-                print("Error: No se pudo capturar frame")
+            inicio = time.perf_counter()
+            frame = self._capturar()
+            if frame is None:
                 break
             
-            # Voltear para efecto espejo
-            frame = cv2.flip(frame, 1)
-            h, w, _ = frame.shape
+            frame, resultados = self._inferir(frame, inicio)
+            self.corriendo = self._renderizar(frame, resultados, inicio)
+    
+    def _ejecutar_pipeline(self):
+        """Captura, inferencia y render en etapas concurrentes (ver pipeline.py)"""
+        from pipeline import FramePipeline
+        print("Modo pipeline: captura | inferencia | render en hilos separados")
+        pipeline = FramePipeline(
+            self._capturar, self._inferir, self._renderizar,
+            tamaño_cola=PIPELINE_CONFIG['tamaño_cola'],
+            perfil=self.perfil,
+            liberar=self.frames.liberar
+        )
+        pipeline.ejecutar()
+        self.corriendo = False
+    
+    def _capturar(self):
+        """Lee un frame de la cámara sobre un buffer reutilizado (None si falla)"""
+        with self.perfil.medir('captura'):
+            ret, frame = self.frames.leer(self.cap)
+        if not ret:
+            print("Error: No se pudo capturar frame")
+            return None
+        return frame
+    
+    def _inferir(self, frame, tiempo_captura=None):
+        """
+        Voltea el frame, lo convierte a RGB y ejecuta MediaPipe
+        
+        El volteo y la conversión escriben sobre buffers existentes; con
+        CAMERA_CONFIG['espejo'] = 'landmarks' el frame no se voltea y en su
+        lugar se reflejan los landmarks (el render voltea solo lo que muestra).
+        
+        Con el planificador activo, en los frames que no toca inferir los
+        landmarks se extrapolan desde la última inferencia.
+        
+        Args:
+            frame: Frame BGR capturado
+            tiempo_captura: time.perf_counter() al capturarlo (None = ahora)
+        """
+        inicio = time.perf_counter()
+        with self.perfil.medir('preproceso'):
+            h, w = frame.shape[:2]
             
+            # Voltear para efecto espejo (en el lugar, sin copiar el frame)
+            if not self.espejo_landmarks:
+                cv2.flip(frame, 1, dst=frame)
+        
+        if tiempo_captura is None:
+            tiempo_captura = inicio
+        if self.planificador and not self.planificador.debe_inferir():
+            # Los landmarks base ya están en coordenadas del frame completo y reflejados
+            with self.perfil.medir('prediccion'):
+                resultados = self.planificador.predecir(tiempo_captura)
+            self.perfil.contar('frames_predichos')
+            return frame, resultados
+        
+        with self.perfil.medir('preproceso'):
             # Convertir a RGB
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            resultados = self.manos.process(rgb)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.buffers.obtener('rgb', frame.shape))
             
-            # Procesar manos detectadas
-            if resultados.multi_hand_landmarks:
-                for i_mano, lm_mano in enumerate(resultados.multi_hand_landmarks):
-                    self.procesar_mano(i_mano, lm_mano, frame, h, w, resultados)
-            
-            # Dibujar FPS
-            self._dibujar_fps(frame)
+            region = None
+            if self.roi:
+                rgb, region = self.roi.preparar(rgb)
             
+            # Los landmarks son normalizados: reducir la entrada no cambia su escala
+            if self.escala_entrada < 1.0:
+                alto, ancho = rgb.shape[:2]
+                forma = (max(1, round(alto * self.escala_entrada)), max(1, round(ancho * self.escala_entrada)), 3)
+                rgb = cv2.resize(rgb, (forma[1], forma[0]), dst=self.buffers.obtener('reducida', forma),
+                                 interpolation=cv2.INTER_AREA)
+        
+        with self.perfil.medir('inferencia'):
+            resultados = self.manos.process(rgb)
+        
+        if self.roi:
+            self.roi.mapear(resultados, region, w, h)
+            self.roi.actualizar(resultados, region, w, h)
+            self.perfil.contar('frames_roi' if region else 'frames_completos')
+        
+        if self.espejo_landmarks:
+            reflejar_resultados(resultados)
+        
+        if self.planificador:
+            self.planificador.registrar(resultados, tiempo_captura)
+        
+        if self.controlador:
+            nivel = self.controlador.registrar(time.perf_counter() - inicio)
+            if nivel is not None:
+                self._aplicar_nivel(nivel)
+        return frame, resultados
+    
+    def _aplicar_nivel(self, nivel):
+        """
+        Reconstruye Hands con el nivel de calidad indicado
+        
+        Se llama desde el hilo que ejecuta la inferencia, el único que usa self.manos.
+        """
+        configuracion = dict(MEDIAPIPE_CONFIG,
+                             model_complexity=nivel['model_complexity'],
+                             max_num_hands=nivel['max_num_hands'])
+        if (configuracion['model_complexity'] != self.manos_config['model_complexity'] or
+                configuracion['max_num_hands'] != self.manos_config['max_num_hands']):
+            with self.perfil.medir('reconstruccion'):
+                self.manos.close()
+                self.manos = self.mp_manos.Hands(**configuracion)
+            self.manos_config = configuracion
+        self.escala_entrada = nivel['escala']
+        self.perfil.contar('cambios_nivel')
+        print(f"Calidad: modelo {nivel['model_complexity']}, escala {nivel['escala']}, "
+              f"{nivel['max_num_hands']} manos")
+    
+    def _renderizar(self, frame, resultados, tiempo_captura=None):
+        """
+        Clasifica las manos, maneja el audio y muestra el frame
+        
+        Returns:
+            bool: False si el usuario pidió salir
+        """
+        mostrado = self.procesar_resultados(frame, resultados, tiempo_captura)
+        
+        if self.sin_ventana:
+            frames_maximos = HEADLESS_CONFIG['frames_maximos']
+            continuar = not frames_maximos or self.num_frame < frames_maximos
+        else:
             # Mostrar frame
-            cv2.imshow('Detección Mejorada - Vocales ASL', frame)
-            
-            # Manejar teclas
-            tecla = cv2.waitKey(1) & 0xFF
-            if tecla == 27 or tecla == ord('q'):  # ESC o Q
-                self.corriendo = False
+            with self.perfil.medir('mostrar'):
+                cv2.imshow('Detección Mejorada - Vocales ASL', mostrado)
+                
+                # Manejar teclas
+                tecla = cv2.waitKey(1) & 0xFF
+            continuar = not (tecla == 27 or tecla == ord('q'))  # ESC o Q
+        
+        # Registrar las etapas del frame y exportar métricas periódicamente
+        self.perfil.cerrar_frame('frame')
+        self.perfil.exportar_si_corresponde()
         
-        self.limpiar()
+        # El frame ya se mostró (y el video anotado hizo su copia): vuelve al pool
+        self.frames.liberar(frame)
+        return continuar
+    
+    def procesar_resultados(self, frame, resultados, tiempo_captura=None):
+        """
+        Clasifica y confirma las manos, maneja el audio y dibuja sobre el frame
+        (sin ventana, en lugar de dibujar publica los eventos del frame)
+        
+        Args:
+            frame: Frame BGR
+            resultados: Salida de Hands.process() (o del planificador)
+            tiempo_captura: time.perf_counter() al capturar el frame; fija el dt
+                            del suavizado y la latencia de los eventos del bus
+        
+        Returns:
+            np.ndarray: Frame dibujado (con espejo de landmarks, una copia volteada)
+        """
+        h, w, _ = frame.shape
+        self.tiempo_captura = tiempo_captura
+        if self.espejo_landmarks and not self.sin_ventana:
+            frame = cv2.flip(frame, 1, dst=self.buffers.obtener('espejo', frame.shape))
+        self.num_frame += 1
+        
+        # IDs estables aunque MediaPipe cambie el orden de las manos
+        manos = resultados.multi_hand_landmarks or []
+        with self.perfil.medir('seguimiento'):
+            puntos = np.array([landmarks_a_array(lm_mano.landmark) for lm_mano in manos]).reshape(-1, 21, 3)
+            lados = obtener_lados(resultados)
+            ids = self.tracker.actualizar(puntos, lados)
+        
+        crudos = puntos
+        
+        # Suavizado temporal antes de clasificar (los landmarks dibujados no cambian).
+        # El dt sale de la captura: con el pipeline o frames descartados el
+        # momento en que se procesa el frame no es el momento en que se tomó
+        if self.filtro is not None:
+            with self.perfil.medir('filtro'):
+                tiempo = self.tiempo_captura if self.tiempo_captura is not None else time.perf_counter()
+                puntos = self.filtro.filtrar(ids, puntos, tiempo)
+        
+        # Grabar lo que se clasifica para reproducirlo sin volver a ejecutar MediaPipe
+        if RECORDING_CONFIG['ruta']:
+            if self.grabador is None:
+                from landmarkrecorder import LandmarkRecorder
+                self.grabador = LandmarkRecorder(RECORDING_CONFIG['ruta'], w, h)
+            self.grabador.escribir(self.num_frame, time.time(), ids, lados, puntos,
+                                   filtrado=self.filtro is not None)
+        
+        # Procesar manos detectadas
+        anotaciones = []
+        if manos:
+            # Clasificar todas las manos del frame en una sola llamada
+            with self.perfil.medir('deteccion'):
+                gestos, _ = self.gesture_detector.detectar_vocales_lote(puntos, ids, aspecto=w / h)
+            for i_mano, lm_mano in enumerate(manos):
+                etiqueta, confirmado = self.procesar_mano(i_mano, lm_mano, frame, h, w, resultados,
+                                                          gestos[i_mano], ids[i_mano])
+                anotaciones.append((lm_mano, ids[i_mano], etiqueta, gestos[i_mano], confirmado))
+        
+        if self.sin_ventana:
+            with self.perfil.medir('eventos'):
+                self._publicar(frame, crudos, anotaciones)
+        
+        # Olvidar las manos que desaparecieron
+        olvidadas = self.gesture_detector.olvidar_ausentes(ids)
+        for id_mano in olvidadas:
+            ultima_letra, _ = self.ultimo_tiempo_gesto.pop(id_mano, (None, 0))
+            self.ultima_detectada.pop(id_mano, None)
+            # Una mano que se fue con un gesto confirmado también lo libera
+            if self.bus is not None and ultima_letra is not None:
+                self.bus.publicar(self.crear_evento('liberacion', id_mano, ultima_letra,
+                                                    tiempo_captura=self.tiempo_captura))
+        
+        if self.deletreo is not None:
+            with self.perfil.medir('deletreo'):
+                self._deletrear(anotaciones, olvidadas)
+        
+        # Dibujar FPS y métricas
+        if not self.sin_ventana:
+            with self.perfil.medir('dibujo'):
+                self._dibujar_fps(frame)
+                if self.deletreo is not None:
+                    self._dibujar_deletreo(frame)
+        return frame
+    
+    def _deletrear(self, anotaciones, olvidadas):
+        """Pasa los gestos confirmados del frame al deletreador y publica letras y palabras"""
+        ahora = time.perf_counter()
+        eventos = self.deletreo.avanzar(ahora)
+        for _, id_mano, _, _, confirmado in anotaciones:
+            eventos += self.deletreo.registrar(id_mano, confirmado, ahora)
+        for id_mano in olvidadas:
+            eventos += self.deletreo.terminar(id_mano, ahora)
+        self._emitir_deletreo(eventos)
+    
+    def _emitir_deletreo(self, eventos):
+        """Muestra las palabras cerradas y publica letras y palabras (archivo de eventos y bus)"""
+        for evento in eventos:
+            if evento['tipo'] == 'palabra':
+                print(f"Mano {evento['mano']}: palabra '{evento['palabra']}'"
+                      + (f" (¿{evento['sugerencias'][0]}?)"
+                         if evento['sugerencias'] and not evento['en_lexico'] else ''))
+            evento = dict(evento, tiempo=round(time.time(), 3))
+            if self.eventos is not None:
+                self.eventos.emitir(dict(evento, frame=self.num_frame))
+            if self.bus is not None:
+                self.bus.publicar(dict(evento, estacion=EVENTBUS_CONFIG['estacion']))
+    
+    def _publicar(self, frame, puntos, anotaciones):
+        """Emite el evento del frame (si hay manos) y pasa el frame al video anotado"""
+        if self.eventos is not None and anotaciones:
+            h, w = frame.shape[:2]
+            escala = np.array([w, h])
+            minimos = (puntos[..., :2].min(axis=1) * escala).astype(int).tolist()
+            maximos = (puntos[..., :2].max(axis=1) * escala).astype(int).tolist()
+            self.eventos.emitir({
+                'tipo': 'frame',
+                'frame': self.num_frame,
+                'tiempo': round(time.time(), 3),
+                'manos': [
+                    {'id': id_mano, 'lado': etiqueta, 'caja': minimos[k] + maximos[k],
+                     'detectado': detectado, 'confirmado': confirmado}
+                    for k, (_, id_mano, etiqueta, detectado, confirmado) in enumerate(anotaciones)
+                ]
+            })
+        if self.video is not None:
+            self.video.agregar(self.num_frame, frame, anotaciones)
     
     def limpiar(self):
         """Libera recursos"""
         print("\nCerrando aplicación...")
-        self.cap.release()
-        cv2.destroyAllWindows()
+        if self.deletreo is not None:
+            # Cerrar las palabras en curso antes que los archivos de eventos y el bus
+            self._emitir_deletreo(self.deletreo.terminar_todas(time.perf_counter()))
+        if self.cap is not None:
+            self.cap.release()
+        if self.grabador is not None:
+            self.grabador.cerrar()
+            print(f"✓ Landmarks grabados en {self.grabador.ruta} ({self.grabador.registros} manos)")
+        if self.eventos is not None:
+            self.eventos.cerrar()
+            print(f"✓ {self.eventos.eventos} eventos en {self.eventos.ruta}")
+        if self.video is not None:
+            self.video.cerrar()
+            print(f"✓ Video anotado: {self.video.ruta} ({self.video.escritos} frames, "
+                  f"{self.video.descartados} descartados)")
+        if self.bus is not None:
+            self.bus.cerrar()
+            print(f"✓ Bus de eventos: {self.bus.publicados} publicados, {self.bus.descartados} descartados")
+        if not self.sin_ventana:
+            cv2.destroyAllWindows()
         self.audio_manager.detener_todos()
+        self.audio_manager.cerrar()
+        self.perfil.exportar()
+        cache = self.gesture_detector.cache
+        if cache is not None and cache.aciertos + cache.fallos:
+            print(f"Caché de características: {cache.tasa_aciertos():.0%} de aciertos "
+                  f"({cache.aciertos} / {cache.aciertos + cache.fallos})")
         print("✓ Recursos liberados")
 
 
 def main():
     """Función principal"""
+    import argparse
+    parser = argparse.ArgumentParser(description='Detector de gestos de vocales ASL')
+    parser.add_argument('--sin-ventana', action='store_true',
+                        help='No dibujar ni mostrar frames; publicar eventos JSONL')
+    parser.add_argument('--eventos', help='Archivo de eventos (modo sin ventana)')
+    parser.add_argument('--video', help='Video anotado en segundo plano (modo sin ventana)')
+    parser.add_argument('--bus', metavar='DIRECCION',
+                        help="Publicar los gestos en el bus de eventos ('host:puerto' o socket Unix)")
+    parser.add_argument('--intervalo', type=int, metavar='K',
+                        help='Ejecutar MediaPipe como máximo cada K frames con las manos quietas')
+    parser.add_argument('--deletreo', action='store_true',
+                        help='Armar palabras con los gestos confirmados')
+    parser.add_argument('--lexico', help='Archivo de palabras para completar al deletrear')
+    args = parser.parse_args()
+    if args.intervalo:
+        SCHEDULER_CONFIG['activo'] = args.intervalo > 1
+        SCHEDULER_CONFIG['intervalo_maximo'] = args.intervalo
+    if args.deletreo or args.lexico:
+        SPELLING_CONFIG['activo'] = True
+    if args.lexico:
+        SPELLING_CONFIG['lexico'] = args.lexico
+    if args.eventos:
+        HEADLESS_CONFIG['eventos'] = args.eventos
+    if args.video:
+        HEADLESS_CONFIG['video'] = args.video
+    if args.bus:
+        EVENTBUS_CONFIG['activo'] = True
+        EVENTBUS_CONFIG['direccion'] = args.bus
+    
     try:
-        app = GestureRecognitionApp()
+        app = GestureRecognitionApp(sin_ventana=args.sin_ventana or None)
         app.ejecutar()
     except KeyboardInterrupt:
         print("\n✗ Interrumpido por el usuario")
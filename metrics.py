@@ -0,0 +1,185 @@
+"""
+metrics.py
+Instrumentación por etapa: histogramas de latencia móviles y exportación periódica
+"""
+
+import json
+import threading
+import time
+import numpy as np
+
+
+class HistogramaLatencia:
+    """Ventana móvil de las últimas N mediciones de una etapa (buffer circular)"""
+    
+    def __init__(self, ventana):
+        self.muestras = np.zeros(ventana)
+        self.posicion = 0
+        self.total = 0
+    
+    def registrar(self, segundos):
+        """Agrega una medición en segundos"""
+        self.muestras[self.posicion] = segundos
+        self.posicion = (self.posicion + 1) % len(self.muestras)
+        self.total += 1
+    
+    def valores(self):
+        """Retorna las mediciones dentro de la ventana"""
+        return self.muestras[:min(self.total, len(self.muestras))]
+    
+    def percentiles(self, qs=(50, 95, 99)):
+        """
+        Retorna los percentiles en milisegundos (None si no hay mediciones)
+        """
+        valores = self.valores()
+        if len(valores) == 0:
+            return None
+        return [float(v) * 1000 for v in np.percentile(valores, qs)]
+
+
+class Profiler:
+    """
+    Mide el tiempo de cada etapa del procesamiento de un frame
+    
+    Cada hilo acumula sus etapas del frame actual (por ejemplo la
+    confirmación de varias manos) y al llamar a cerrar_frame() se
+    registran en los histogramas. Así el mismo perfil sirve para el modo
+    secuencial y para el pipeline con hilos.
+    """
+    
+    def __init__(self, ventana=300, intervalo_exportacion=0, archivo=None):
+        """
+        Args:
+            ventana: Mediciones recientes usadas para los percentiles
+            intervalo_exportacion: Segundos entre exportaciones (0 = nunca)
+            archivo: Archivo JSON Lines para exportar (None = imprimir en consola)
+        """
+        self.ventana = ventana
+        self.intervalo_exportacion = intervalo_exportacion
+        self.archivo = archivo
+        self.histogramas = {}
+        self.contadores = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ultima_exportacion = time.perf_counter()
+        self._ultimo_frame = None
+    
+    def medir(self, etapa):
+        """
+        Context manager que acumula el tiempo de una etapa en el frame actual
+        
+        Ejemplo:
+            with perfil.medir('inferencia'):
+                resultados = manos.process(rgb)
+        """
+        return _Medicion(self, etapa)
+    
+    def acumular(self, etapa, segundos):
+        """Suma tiempo a una etapa del frame actual de este hilo"""
+        acumulado = self._acumulado()
+        acumulado[etapa] = acumulado.get(etapa, 0.0) + segundos
+    
+    def registrar(self, etapa, segundos):
+        """Registra directamente una medición en el histograma de la etapa"""
+        with self._lock:
+            histograma = self.histogramas.get(etapa)
+            if histograma is None:
+                histograma = self.histogramas[etapa] = HistogramaLatencia(self.ventana)
+            histograma.registrar(segundos)
+    
+    def contar(self, contador, cantidad=1):
+        """Incrementa un contador (frames descartados, asignaciones, etc.)"""
+        with self._lock:
+            self.contadores[contador] = self.contadores.get(contador, 0) + cantidad
+    
+    def cerrar_frame(self, etapa_periodo=None):
+        """
+        Registra las etapas acumuladas por este hilo para el frame actual
+        
+        Args:
+            etapa_periodo: Si se indica, registra también el tiempo entre
+                           llamadas consecutivas con ese nombre (periodo de frame)
+        """
+        acumulado = self._acumulado()
+        for etapa, segundos in acumulado.items():
+            self.registrar(etapa, segundos)
+        acumulado.clear()
+        
+        if etapa_periodo:
+            ahora = time.perf_counter()
+            if self._ultimo_frame is not None:
+                self.registrar(etapa_periodo, ahora - self._ultimo_frame)
+            self._ultimo_frame = ahora
+    
+    def fps(self, etapa_periodo='frame'):
+        """FPS estimado con la mediana del periodo de frame (estable, sin saltos)"""
+        histograma = self.histogramas.get(etapa_periodo)
+        if histograma is None or histograma.total == 0:
+            return 0.0
+        mediana = float(np.median(histograma.valores()))
+        return 1.0 / mediana if mediana > 0 else 0.0
+    
+    def resumen(self):
+        """
+        Retorna el estado actual de las métricas
+        
+        Returns:
+            dict: {'fps', 'etapas': {etapa: {'p50', 'p95', 'p99', 'n'}}, 'contadores'}
+        """
+        with self._lock:
+            etapas = {}
+            for etapa, histograma in self.histogramas.items():
+                p = histograma.percentiles()
+                if p is not None:
+                    etapas[etapa] = {'p50': round(p[0], 2), 'p95': round(p[1], 2),
+                                     'p99': round(p[2], 2), 'n': histograma.total}
+            contadores = dict(self.contadores)
+        return {'fps': round(self.fps(), 1), 'etapas': etapas, 'contadores': contadores}
+    
+    def exportar_si_corresponde(self):
+        """Exporta el resumen si pasó el intervalo configurado"""
+        if not self.intervalo_exportacion:
+            return
+        ahora = time.perf_counter()
+        if ahora - self._ultima_exportacion >= self.intervalo_exportacion:
+            self._ultima_exportacion = ahora
+            self.exportar()
+    
+    def exportar(self):
+        """Escribe el resumen como una línea JSON en el archivo o en consola"""
+        resumen = self.resumen()
+        resumen['tiempo'] = time.time()
+        if self.archivo:
+            with open(self.archivo, 'a', encoding='utf-8') as archivo:
+                archivo.write(json.dumps(resumen, ensure_ascii=False) + '\n')
+            return
+        
+        print(f"FPS: {resumen['fps']}")
+        for etapa, p in resumen['etapas'].items():
+            print(f"  {etapa:<18} p50={p['p50']:.1f}ms p95={p['p95']:.1f}ms p99={p['p99']:.1f}ms")
+        for contador, valor in resumen['contadores'].items():
+            print(f"  {contador}: {valor}")
+    
+    def _acumulado(self):
+        """Acumulador de etapas del frame actual de este hilo"""
+        acumulado = getattr(self._local, 'acumulado', None)
+        if acumulado is None:
+            acumulado = self._local.acumulado = {}
+        return acumulado
+
+
+class _Medicion:
+    """Context manager creado por Profiler.medir()"""
+    
+    __slots__ = ('perfil', 'etapa', 'inicio')
+    
+    def __init__(self, perfil, etapa):
+        self.perfil = perfil
+        self.etapa = etapa
+    
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+    
+    def __exit__(self, *args):
+        self.perfil.acumular(self.etapa, time.perf_counter() - self.inicio)
@@ -0,0 +1,196 @@
+"""
+parallelbatch.py
+Reparte el procesamiento por lotes entre varios procesos (uno por núcleo)
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from config import BATCH_CONFIG
+from batchprocessor import BatchProcessor
+
+
+class ParallelBatchRunner:
+    """
+    Divide videos (o tramos de un video largo) entre procesos trabajadores
+    
+    Cada trabajador crea su propia instancia de Hands y su GestureDetector.
+    Los resultados se unen en el orden original: por entrada y por frame.
+    
+    El HandTracker de cada tramo numera sus manos desde 0; al unir, los IDs
+    se traducen a una numeración única por fuente emparejando las manos de
+    los frames de calentamiento con las que el tramo anterior emitió para
+    esos mismos frames. Las manos que no se emparejan reciben IDs nuevos en
+    orden de aparición, igual que en una ejecución secuencial.
+    """
+    
+    def __init__(self, procesos=None, espejo=None, frames_por_tramo=None, frames_calentamiento=None):
+        """
+        Args:
+            procesos: Número de procesos (None = todos los núcleos)
+            espejo: Voltear los frames (None = usar BATCH_CONFIG['espejo'])
+            frames_por_tramo: Tamaño máximo de cada tramo de un video
+            frames_calentamiento: Frames que se procesan antes de cada tramo
+                                  sin emitir resultados
+        """
+        self.procesos = procesos or os.cpu_count() or 1
+        self.espejo = espejo
+        self.frames_por_tramo = frames_por_tramo or BATCH_CONFIG['frames_por_tramo']
+        self.frames_calentamiento = (BATCH_CONFIG['frames_calentamiento']
+                                     if frames_calentamiento is None else frames_calentamiento)
+        self.frames_procesados = 0
+    
+    def planificar(self, entradas):
+        """
+        Divide las entradas en tareas (ruta, inicio, fin)
+        
+        Los videos más largos que frames_por_tramo se dividen en tramos
+        consecutivos para que un solo archivo también use todos los núcleos.
+        """
+        contador = BatchProcessor(espejo=self.espejo)
+        tareas = []
+        for ruta in entradas:
+            total = contador.contar_frames(ruta)
+            if total <= self.frames_por_tramo:
+                tareas.append((ruta, 0, None))
+                continue
+            
+            for inicio in range(0, total, self.frames_por_tramo):
+                fin = inicio + self.frames_por_tramo
+                tareas.append((ruta, inicio, fin if fin < total else None))
+        return tareas
+    
+    def procesar(self, entradas):
+        """
+        Procesa las entradas en paralelo
+        
+        Yields:
+            tuple: Filas de resultados en el orden de resultswriter.COLUMNAS
+        """
+        tareas = self.planificar(entradas)
+        print(f"Procesando {len(tareas)} tareas en {self.procesos} procesos...")
+        
+        argumentos = [(ruta, inicio, fin, self.espejo, self.frames_calentamiento)
+                      for ruta, inicio, fin in tareas]
+        
+        # 'spawn' evita heredar el estado de MediaPipe del proceso padre
+        contexto = multiprocessing.get_context('spawn')
+        renumerador = None
+        with ProcessPoolExecutor(max_workers=self.procesos, mp_context=contexto) as pool:
+            for (ruta, inicio, _), (filas, previas, frames) in zip(tareas, pool.map(_procesar_tarea, argumentos)):
+                self.frames_procesados += frames
+                if inicio == 0 or renumerador is None:
+                    renumerador = RenumeradorIds()
+                print(f"✓ {ruta} [{inicio}:] {frames} frames")
+                yield from renumerador.traducir(filas, previas)
+
+
+def _procesar_tarea(argumentos):
+    """
+    Trabajador: procesa un tramo de una entrada
+    
+    Empieza frames_calentamiento frames antes del tramo para que el tracking
+    de MediaPipe y los buffers de confirmación lleguen estabilizados, y
+    descarta las filas de esos frames previos.
+    
+    Returns:
+        tuple: (filas del tramo, filas del calentamiento, frames procesados del tramo);
+               las filas del calentamiento sirven para traducir los IDs de mano
+    """
+    ruta, inicio, fin, espejo, calentamiento = argumentos
+    procesador = BatchProcessor(espejo=espejo)
+    
+    desde = max(0, inicio - calentamiento)
+    filas = []
+    previas = []
+    for fila in procesador.procesar_fuente(ruta, desde, fin):
+        (filas if fila[1] >= inicio else previas).append(fila)
+    
+    return filas, previas, procesador.frames_procesados - (inicio - desde)
+
+
+class RenumeradorIds:
+    """
+    Traduce los IDs de mano de los tramos de una fuente a una numeración única
+    
+    Se usa un renumerador por fuente, con sus tramos en orden.
+    """
+    
+    def __init__(self):
+        self.siguiente = 0
+        self._emitidas = {}    # Frame -> filas ya traducidas del tramo anterior
+    
+    def traducir(self, filas, previas=()):
+        """
+        Traduce los IDs de un tramo
+        
+        Args:
+            filas: Filas del tramo (IDs locales)
+            previas: Filas de sus frames de calentamiento (IDs locales)
+        
+        Returns:
+            list: Filas con el ID de mano de la fuente
+        """
+        equivalencias = self._emparejar(previas)
+        traducidas = []
+        for fila in filas:
+            id_local = fila[3]
+            if id_local not in equivalencias:
+                equivalencias[id_local] = self.siguiente
+                self.siguiente += 1
+            traducidas.append(fila[:3] + (equivalencias[id_local],) + fila[4:])
+        
+        self._emitidas = {}
+        for fila in traducidas:
+            self._emitidas.setdefault(fila[1], []).append(fila)
+        return traducidas
+    
+    def _emparejar(self, previas):
+        """
+        Vota para cada ID local el ID ya emitido con la mano más cercana
+        (mismo frame, mismo lado) y asigna de a pares sin repetir
+        """
+        votos = {}
+        for indice in sorted({fila[1] for fila in previas}):
+            emitidas = self._emitidas.get(indice)
+            if not emitidas:
+                continue
+            libres = list(emitidas)
+            for fila in previas:
+                if fila[1] != indice:
+                    continue
+                candidatas = [e for e in libres if e[4] == fila[4]]
+                if not candidatas:
+                    continue
+                cercana = min(candidatas, key=lambda e: _distancia_cajas(e, fila))
+                libres.remove(cercana)
+                votos[fila[3], cercana[3]] = votos.get((fila[3], cercana[3]), 0) + 1
+        
+        equivalencias = {}
+        usados = set()
+        for (id_local, id_fuente), _ in sorted(votos.items(), key=lambda item: -item[1]):
+            if id_local not in equivalencias and id_fuente not in usados:
+                equivalencias[id_local] = id_fuente
+                usados.add(id_fuente)
+        return equivalencias
+
+
+def _distancia_cajas(a, b):
+    """Distancia entre los centros de los bounding box de dos filas (en píxeles)"""
+    return abs(a[5] + a[7] - b[5] - b[7]) + abs(a[6] + a[8] - b[6] - b[8])
+
+
+def verificar(entradas, procesos=None, espejo=None):
+    """
+    Compara el resultado en paralelo con el de una ejecución secuencial
+    
+    Returns:
+        list: Pares (fila secuencial, fila en paralelo) que difieren
+    """
+    procesador = BatchProcessor(espejo=espejo)
+    secuencial = [fila for ruta in entradas for fila in procesador.procesar_fuente(ruta)]
+    paralelo = list(ParallelBatchRunner(procesos=procesos, espejo=espejo).procesar(entradas))
+    diferencias = [(a, b) for a, b in zip(secuencial, paralelo) if a != b]
+    if len(secuencial) != len(paralelo):
+        diferencias.append((len(secuencial), len(paralelo)))
+    return diferencias
@@ -0,0 +1,229 @@
+"""
+pipeline.py
+Pipeline con hilos para solapar captura, inferencia y render
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class ColaDescarte:
+    """
+    Cola acotada que descarta el elemento más viejo cuando está llena
+    
+    Así cada etapa siempre trabaja sobre el frame más reciente en lugar
+    de acumular retraso.
+    """
+    
+    def __init__(self, tamaño):
+        self._items = deque(maxlen=tamaño)
+        self._condicion = threading.Condition()
+        self._cerrada = False
+        self.descartados = 0
+    
+    def poner(self, item):
+        """
+        Agrega un elemento, descartando el más viejo si no hay espacio
+        
+        Returns:
+            El elemento descartado, o None si había espacio
+        """
+        descartado = None
+        with self._condicion:
+            if len(self._items) == self._items.maxlen:
+                descartado = self._items.popleft()
+                self.descartados += 1
+            self._items.append(item)
+            self._condicion.notify()
+        return descartado
+    
+    def obtener(self, timeout=None):
+        """
+        Retorna el elemento más viejo de la cola
+        
+        Args:
+            timeout: Segundos máximos de espera (None = esperar indefinidamente)
+        
+        Returns:
+            El elemento, o None si se agotó el tiempo o la cola se cerró
+        """
+        with self._condicion:
+            if not self._items and not self._cerrada:
+                self._condicion.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+    
+    def cerrar(self):
+        """Despierta a los consumidores para que terminen"""
+        with self._condicion:
+            self._cerrada = True
+            self._condicion.notify_all()
+    
+    def terminada(self):
+        """True si la cola se cerró y ya no quedan elementos"""
+        with self._condicion:
+            return self._cerrada and not self._items
+    
+    def __len__(self):
+        return len(self._items)
+
+
+class Paquete:
+    """Frame en tránsito por el pipeline con sus marcas de tiempo"""
+    
+    __slots__ = ('frame', 'resultados', 'tiempos')
+    
+    def __init__(self, frame):
+        self.frame = frame
+        self.resultados = None
+        self.tiempos = {}
+
+
+class FramePipeline:
+    """
+    Ejecuta captura, inferencia y render/audio en etapas concurrentes
+    
+    - Hilo de captura: llama a capturar() y deja el frame en la cola de entrada
+    - Hilo de inferencia: toma el frame más reciente y llama a inferir()
+    - Hilo principal: toma el resultado más reciente y llama a renderizar()
+      (cv2.imshow debe ejecutarse en el hilo principal)
+    
+    Las colas entre etapas son acotadas y descartan el frame más viejo, de
+    modo que la inferencia nunca trabaja sobre frames atrasados y el render
+    nunca bloquea la detección.
+    
+    Si capturar() o inferir() lanzan una excepción, la etapa cierra su cola
+    de salida (las siguientes terminan de vaciarse) y ejecutar() la vuelve a
+    lanzar en el hilo principal.
+    """
+    
+    def __init__(self, capturar, inferir, renderizar, tamaño_cola=1, perfil=None, liberar=None):
+        """
+        Args:
+            capturar: Función sin argumentos que retorna un frame o None al terminar
+            inferir: Función (frame, tiempo_captura) -> (frame, resultados)
+            renderizar: Función (frame, resultados, tiempo_captura) -> bool (False para salir);
+                        tiempo_captura es time.perf_counter() al empezar a capturar el frame
+            tamaño_cola: Capacidad de cada cola entre etapas
+            perfil: metrics.Profiler donde registrar esperas, latencia total
+                    y frames descartados (opcional)
+            liberar: Función (frame) llamada con los frames descartados, para
+                     devolverlos a un pool (opcional)
+        """
+        self.capturar = capturar
+        self.inferir = inferir
+        self.renderizar = renderizar
+        self.perfil = perfil
+        self.liberar = liberar
+        
+        self.cola_captura = ColaDescarte(tamaño_cola)
+        self.cola_resultados = ColaDescarte(tamaño_cola)
+        
+        self._corriendo = threading.Event()
+        self._hilos = []
+        self.error = None
+    
+    def ejecutar(self):
+        """Arranca los hilos y ejecuta la etapa de render hasta que termine"""
+        self._corriendo.set()
+        self._hilos = [
+            threading.Thread(target=self._bucle_captura, name='captura', daemon=True),
+            threading.Thread(target=self._bucle_inferencia, name='inferencia', daemon=True),
+        ]
+        for hilo in self._hilos:
+            hilo.start()
+        
+        try:
+            while self._corriendo.is_set():
+                paquete = self.cola_resultados.obtener(timeout=0.1)
+                if paquete is None:
+                    if self.cola_resultados.terminada():
+                        break
+                    continue
+                
+                self._registrar('espera_render', time.perf_counter() - paquete.tiempos['fin_inferencia'])
+                continuar = self.renderizar(paquete.frame, paquete.resultados,
+                                            paquete.tiempos['inicio_captura'])
+                self._registrar('latencia_total', time.perf_counter() - paquete.tiempos['inicio_captura'])
+                
+                if not continuar:
+                    break
+        finally:
+            self.detener()
+        
+        if self.error is not None:
+            raise self.error
+    
+    def detener(self):
+        """Detiene los hilos de captura e inferencia"""
+        self._corriendo.clear()
+        self.cola_captura.cerrar()
+        self.cola_resultados.cerrar()
+        for hilo in self._hilos:
+            hilo.join(timeout=1.0)
+        self._hilos = []
+    
+    def _bucle_captura(self):
+        """Etapa 1: captura de frames"""
+        try:
+            while self._corriendo.is_set():
+                inicio = time.perf_counter()
+                frame = self.capturar()
+                if frame is None:
+                    # Fin de la fuente: las demás etapas terminan de vaciar sus colas
+                    break
+                
+                paquete = Paquete(frame)
+                paquete.tiempos['inicio_captura'] = inicio
+                paquete.tiempos['fin_captura'] = time.perf_counter()
+                self._descartar(self.cola_captura.poner(paquete), 'descartados_captura')
+                if self.perfil:
+                    self.perfil.cerrar_frame()
+        except Exception as e:
+            self._fallar(e)
+        finally:
+            self.cola_captura.cerrar()
+    
+    def _bucle_inferencia(self):
+        """Etapa 2: preprocesado e inferencia sobre el frame más reciente"""
+        try:
+            while self._corriendo.is_set():
+                paquete = self.cola_captura.obtener(timeout=0.1)
+                if paquete is None:
+                    if self.cola_captura.terminada():
+                        break
+                    continue
+                
+                self._registrar('espera_inferencia', time.perf_counter() - paquete.tiempos['fin_captura'])
+                paquete.frame, paquete.resultados = self.inferir(paquete.frame,
+                                                                 paquete.tiempos['inicio_captura'])
+                paquete.tiempos['fin_inferencia'] = time.perf_counter()
+                self._descartar(self.cola_resultados.poner(paquete), 'descartados_inferencia')
+                if self.perfil:
+                    self.perfil.cerrar_frame()
+        except Exception as e:
+            self._fallar(e)
+        finally:
+            self.cola_resultados.cerrar()
+    
+    def _fallar(self, error):
+        """Guarda la primera excepción de una etapa y detiene las demás"""
+        if self.error is None:
+            self.error = error
+        self._corriendo.clear()
+    
+    def _descartar(self, paquete, contador):
+        """Cuenta un paquete descartado por una cola y libera su frame"""
+        if paquete is None:
+            return
+        if self.perfil:
+            self.perfil.contar(contador)
+        if self.liberar:
+            self.liberar(paquete.frame)
+    
+    def _registrar(self, etapa, segundos):
+        """Registra una medición en el perfil, si hay uno"""
+        if self.perfil:
+            self.perfil.registrar(etapa, segundos)
@@ -0,0 +1,40 @@
+"""
+resultswriter.py
+Escritura de resultados por frame (modo por lotes y reproducción de grabaciones)
+"""
+
+import csv
+import gzip
+
+
+# Columnas del archivo de resultados (una fila por mano y frame)
+COLUMNAS = ('fuente', 'frame', 'tiempo_ms', 'mano', 'lado',
+            'x_min', 'y_min', 'x_max', 'y_max', 'detectada', 'confirmada')
+
+
+def abrir_salida(ruta):
+    """Abre el archivo de resultados (comprimido si termina en .gz)"""
+    if ruta.endswith('.gz'):
+        return gzip.open(ruta, 'wt', newline='', encoding='utf-8')
+    return open(ruta, 'w', newline='', encoding='utf-8')
+
+
+def escribir_resultados(filas, ruta_salida):
+    """
+    Escribe las filas de resultados en CSV
+    
+    Args:
+        filas: Iterable de tuplas en el orden de COLUMNAS
+        ruta_salida: Ruta del archivo (.csv o .csv.gz)
+    
+    Returns:
+        int: Número de filas escritas
+    """
+    total = 0
+    with abrir_salida(ruta_salida) as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(COLUMNAS)
+        for fila in filas:
+            escritor.writerow(fila)
+            total += 1
+    return total
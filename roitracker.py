@@ -0,0 +1,140 @@
+"""
+roitracker.py
+Seguimiento de la región de interés para procesar solo la zona de las manos
+"""
+
+import numpy as np
+from framebuffers import BufferSet
+from geometryutils import calcular_bounding_box
+
+
+class ROITracker:
+    """
+    Recorta el frame alrededor de las manos del frame anterior
+    
+    La región se mantiene fija mientras las manos sigan dentro de ella con
+    margen suficiente; así el seguimiento interno de MediaPipe no ve saltos
+    de coordenadas en cada frame. Se vuelve al frame completo cada
+    intervalo_completo frames, cuando se pierde una mano o cuando la región
+    ya ocupa casi todo el frame.
+    """
+    
+    def __init__(self, margen=0.3, intervalo_completo=30, area_maxima=0.6, buffers=None):
+        """
+        Args:
+            margen: Relleno alrededor de cada mano, como fracción de su tamaño
+            intervalo_completo: Cada cuántos frames se procesa el frame completo
+            area_maxima: Si la región supera esta fracción del frame se usa el frame completo
+            buffers: framebuffers.BufferSet donde copiar el recorte (None = uno propio)
+        """
+        self.margen = margen
+        self.intervalo_completo = intervalo_completo
+        self.area_maxima = area_maxima
+        self.buffers = buffers if buffers is not None else BufferSet()
+        
+        self.region = None          # (x0, y0, x1, y1) en píxeles, o None = frame completo
+        self.cajas = []             # Bounding boxes (píxeles) de las manos del último frame
+        self.frames_desde_completo = 0
+        self.manos_esperadas = 0
+    
+    def preparar(self, rgb):
+        """
+        Decide qué parte del frame procesar
+        
+        Args:
+            rgb: Frame completo (alto, ancho, 3)
+        
+        Returns:
+            tuple: (imagen a procesar, región usada o None si es el frame completo)
+        """
+        h, w = rgb.shape[:2]
+        
+        if not self.cajas or self.frames_desde_completo >= self.intervalo_completo:
+            self.region = None
+        elif self.region is None or not self._cajas_dentro(self.region, w, h):
+            self.region = self._calcular_region(w, h)
+        
+        if self.region is None:
+            self.frames_desde_completo = 0
+            return rgb, None
+        
+        self.frames_desde_completo += 1
+        x0, y0, x1, y1 = self.region
+        # MediaPipe necesita un array contiguo: el recorte se copia a un buffer
+        # reutilizado (solo se vuelve a crear si cambia el tamaño de la región)
+        recorte = rgb[y0:y1, x0:x1]
+        destino = self.buffers.obtener('roi', recorte.shape, recorte.dtype)
+        np.copyto(destino, recorte)
+        return destino, self.region
+    
+    def mapear(self, resultados, region, w, h):
+        """
+        Lleva los landmarks de coordenadas del recorte a coordenadas del frame
+        completo (modifica los landmarks en el lugar)
+        
+        Args:
+            resultados: Salida de Hands.process() sobre el recorte
+            region: Región devuelta por preparar() (None = nada que hacer)
+            w, h: Tamaño del frame completo
+        """
+        if region is None or not resultados.multi_hand_landmarks:
+            return
+        
+        x0, y0, x1, y1 = region
+        escala_x = (x1 - x0) / w
+        escala_y = (y1 - y0) / h
+        desplazamiento_x = x0 / w
+        desplazamiento_y = y0 / h
+        
+        for lm_mano in resultados.multi_hand_landmarks:
+            for lm in lm_mano.landmark:
+                lm.x = lm.x * escala_x + desplazamiento_x
+                lm.y = lm.y * escala_y + desplazamiento_y
+                # z usa la misma escala que x en MediaPipe
+                lm.z = lm.z * escala_x
+    
+    def actualizar(self, resultados, region, w, h):
+        """
+        Guarda los bounding boxes de las manos (ya en coordenadas del frame completo)
+        
+        Si con un recorte se detectan menos manos que antes, se asume que se
+        perdió el seguimiento y el próximo frame se procesa completo.
+        """
+        manos = resultados.multi_hand_landmarks or []
+        
+        if region is not None and len(manos) < self.manos_esperadas:
+            self.frames_desde_completo = self.intervalo_completo
+        
+        self.cajas = [calcular_bounding_box(lm_mano.landmark, w, h)[:4] for lm_mano in manos]
+        self.manos_esperadas = len(manos)
+    
+    def _calcular_region(self, w, h):
+        """Unión de las cajas con margen, en píxeles (None si no conviene recortar)"""
+        x0 = y0 = float('inf')
+        x1 = y1 = float('-inf')
+        for cx0, cy0, cx1, cy1 in self.cajas:
+            # Margen mínimo: la mano puede abrirse y crecer respecto al frame anterior
+            m = max((cx1 - cx0) * self.margen, (cy1 - cy0) * self.margen, 0.05 * min(w, h))
+            x0, y0 = min(x0, cx0 - m), min(y0, cy0 - m)
+            x1, y1 = max(x1, cx1 + m), max(y1, cy1 + m)
+        
+        x0, y0 = max(0, int(x0)), max(0, int(y0))
+        x1, y1 = min(w, int(x1)), min(h, int(y1))
+        
+        if x1 - x0 < 32 or y1 - y0 < 32:
+            return None
+        if (x1 - x0) * (y1 - y0) > self.area_maxima * w * h:
+            return None
+        return x0, y0, x1, y1
+    
+    def _cajas_dentro(self, region, w, h):
+        """True si todas las manos siguen dentro de la región con la mitad del margen"""
+        x0, y0, x1, y1 = region
+        for cx0, cy0, cx1, cy1 in self.cajas:
+            mx = (cx1 - cx0) * self.margen / 2
+            my = (cy1 - cy0) * self.margen / 2
+            # Los bordes del frame no cuentan: la región ya no puede crecer más allá
+            if ((cx0 - mx < x0 and x0 > 0) or (cy0 - my < y0 and y0 > 0) or
+                    (cx1 + mx > x1 and x1 < w) or (cy1 + my > y1 and y1 < h)):
+                return False
+        return True
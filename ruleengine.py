@@ -0,0 +1,191 @@
+"""
+ruleengine.py
+Compila las definiciones de gestos de config.py en una estructura de decisión
+"""
+
+import numpy as np
+
+
+# ========== CARACTERÍSTICAS ==========
+# Cada característica es una función sobre los arrays de caracteristicas_dedos
+# (con dimensiones iniciales arbitrarias) y un costo relativo para ordenar las
+# comparaciones; las columnas de dedos van en el orden índice, medio, anular, meñique.
+
+DEDOS = ('indice', 'medio', 'anular', 'meñique')
+DISTANCIAS = ('pulgar_indice', 'indice_medio', 'medio_anular', 'anular_meñique', 'pulgar_mcp')
+
+
+def _columna(clave, k):
+    return lambda c: c[clave][..., k]
+
+
+CARACTERISTICAS = {}
+for _k, _dedo in enumerate(DEDOS):
+    CARACTERISTICAS[f'doblado_{_dedo}'] = (_columna('doblados', _k), 1)
+    CARACTERISTICAS[f'angulo_{_dedo}'] = (_columna('angulos', _k), 1)
+    CARACTERISTICAS[f'altura_{_dedo}'] = (_columna('puntas_y', _k), 1)
+for _k, _distancia in enumerate(DISTANCIAS):
+    CARACTERISTICAS[_distancia] = (_columna('distancias', _k), 1)
+
+CARACTERISTICAS.update({
+    'todos_doblados': (lambda c: c['doblados'].all(axis=-1), 2),
+    'promedio_adyacentes': (lambda c: c['distancias'][..., :4].mean(axis=-1), 3),
+    'variacion_altura_puntas': (lambda c: c['puntas_y'].max(axis=-1) - c['puntas_y'].min(axis=-1), 3),
+    'diferencia_altura_indice_medio': (lambda c: np.abs(c['puntas_y'][..., 0] - c['puntas_y'][..., 1]), 2),
+    'meñique_sobre_medio': (lambda c: c['puntas_y'][..., 3] < c['puntas_y'][..., 1], 2),
+})
+
+OPERADORES = {
+    '<': np.less,
+    '>': np.greater,
+    '<=': np.less_equal,
+    '>=': np.greater_equal,
+    '==': np.equal,
+}
+
+
+class RuleEngine:
+    """
+    Evalúa gestos definidos como listas de condiciones (característica, operador, valor)
+    
+    Todas las condiciones de un gesto deben cumplirse; el orden de las
+    definiciones es la prioridad. Las condiciones iguales entre gestos se
+    comparten (cada una se evalúa una sola vez) y las booleanas con valor
+    False se tratan como la negación de la misma condición.
+    
+    - clasificar(): una mano, recorriendo un árbol de decisión compilado que
+      pregunta primero por la condición que más gestos descarta.
+    - evaluar_lote(): muchas manos; todas las condiciones como una matriz
+      booleana y los gestos resueltos con un solo producto de matrices, así
+      el costo crece con las condiciones distintas y no con las letras.
+    """
+    
+    def __init__(self, definiciones, umbrales):
+        """
+        Args:
+            definiciones: Dict {gesto: [(característica, operador, valor), ...]}
+                          en orden de prioridad
+            umbrales: Dict de referencias para los valores de texto, por ejemplo
+                      {'umbral': DISTANCE_THRESHOLDS, 'angulo': ANGLE_THRESHOLDS}
+                      permite escribir 'umbral.cerca' o 'tolerancia.O.variacion_altura_max'
+        """
+        self.gestos = tuple(definiciones)
+        self.predicados = []        # (característica, operador, valor) sin repetir
+        indices = {}
+        self.requisitos = []        # Por gesto: tuple de (predicado, valor esperado)
+        
+        for gesto, condiciones in definiciones.items():
+            requisitos = []
+            for caracteristica, operador, valor in condiciones:
+                if caracteristica not in CARACTERISTICAS:
+                    raise ValueError(f"Gesto '{gesto}': característica desconocida '{caracteristica}'")
+                if operador not in OPERADORES:
+                    raise ValueError(f"Gesto '{gesto}': operador desconocido '{operador}'")
+                valor = self._resolver(valor, umbrales)
+                
+                esperado = True
+                if operador == '==' and isinstance(valor, bool):
+                    esperado, valor = valor, True
+                clave = (caracteristica, operador, valor)
+                if clave not in indices:
+                    indices[clave] = len(self.predicados)
+                    self.predicados.append(clave)
+                requisitos.append((indices[clave], esperado))
+            self.requisitos.append(tuple(requisitos))
+        
+        self.costos = [CARACTERISTICAS[c][1] for c, _, _ in self.predicados]
+        
+        # Matriz de incidencia: columnas [predicado verdadero..., predicado falso...]
+        p = len(self.predicados)
+        self.incidencia = np.zeros((2 * p, len(self.gestos)), dtype=np.float32)
+        for g, requisitos in enumerate(self.requisitos):
+            for i, esperado in requisitos:
+                self.incidencia[i if esperado else p + i, g] = 1
+        self.tamaños = self.incidencia.sum(axis=0)
+        
+        self._nodos = {}
+        self.arbol = self._construir(tuple((g, frozenset(r)) for g, r in enumerate(self.requisitos)))
+        self._nodos = None
+    
+    @staticmethod
+    def _resolver(valor, umbrales):
+        """Convierte 'umbral.cerca' en el número configurado"""
+        if not isinstance(valor, str):
+            return valor
+        actual = umbrales
+        for parte in valor.split('.'):
+            actual = actual[parte]
+        return actual
+    
+    def _construir(self, candidatos):
+        """
+        Árbol de decisión como tuplas (predicado, rama_si, rama_no); las hojas
+        son el gesto o None. Los subárboles iguales se comparten.
+        """
+        if not candidatos:
+            return None
+        gesto, pendientes = candidatos[0]
+        if not pendientes:
+            return self.gestos[gesto]
+        
+        nodo = self._nodos.get(candidatos)
+        if nodo is not None:
+            return nodo
+        
+        # El gesto de mayor prioridad debe resolverse primero; de sus condiciones
+        # se elige la que aparece en más candidatos y, a igualdad, la más barata
+        def puntaje(predicado):
+            usos = sum(1 for _, resto in candidatos
+                       if (predicado, True) in resto or (predicado, False) in resto)
+            return (-usos, self.costos[predicado], predicado)
+        
+        predicado = min((i for i, _ in pendientes), key=puntaje)
+        
+        ramas = []
+        for valor in (True, False):
+            rama = tuple((g, resto - {(predicado, valor)}) for g, resto in candidatos
+                         if (predicado, not valor) not in resto)
+            ramas.append(self._construir(rama))
+        
+        nodo = (predicado, ramas[0], ramas[1])
+        self._nodos[candidatos] = nodo
+        return nodo
+    
+    def _evaluar_predicado(self, i, caracteristicas, valores):
+        """Evalúa un predicado, calculando su característica una sola vez"""
+        nombre, operador, umbral = self.predicados[i]
+        valor = valores.get(nombre)
+        if valor is None:
+            valor = valores[nombre] = CARACTERISTICAS[nombre][0](caracteristicas)
+        return OPERADORES[operador](valor, umbral)
+    
+    def clasificar(self, caracteristicas):
+        """
+        Clasifica una mano recorriendo el árbol
+        
+        Args:
+            caracteristicas: Dict con 'angulos', 'doblados', 'distancias' y
+                             'puntas_y' de una sola mano
+        
+        Returns:
+            str: Gesto o None
+        """
+        valores = {}
+        nodo = self.arbol
+        while isinstance(nodo, tuple):
+            predicado, si, no = nodo
+            nodo = si if self._evaluar_predicado(predicado, caracteristicas, valores) else no
+        return nodo
+    
+    def evaluar_lote(self, caracteristicas):
+        """
+        Evalúa todos los gestos sobre un lote
+        
+        Returns:
+            np.ndarray: Máscaras booleanas (..., G) en el orden de self.gestos
+        """
+        valores = {}
+        verdaderos = np.stack([self._evaluar_predicado(i, caracteristicas, valores)
+                               for i in range(len(self.predicados))], axis=-1)
+        columnas = np.concatenate([verdaderos, ~verdaderos], axis=-1).astype(np.float32)
+        return (columnas @ self.incidencia) == self.tamaños
@@ -0,0 +1,365 @@
+"""
+spelling.py
+Deletreo: convierte el flujo de gestos confirmados en letras y palabras, con completado por prefijo
+"""
+
+import argparse
+import collections
+import csv
+import gzip
+import time
+from config import SPELLING_CONFIG
+
+
+class _NodoLexico:
+    """Nodo del trie con sus mejores completados ya calculados"""
+    
+    __slots__ = ('hijos', 'frecuencia', 'mejores')
+    
+    def __init__(self):
+        self.hijos = {}
+        self.frecuencia = 0      # > 0 si el camino hasta aquí es una palabra
+        self.mejores = []        # [(-frecuencia, palabra)] ordenados, a lo sumo `sugerencias`
+
+
+class Lexico:
+    """
+    Trie de palabras para completar mientras se deletrea
+    
+    Cada nodo guarda los `sugerencias` completados más frecuentes de su
+    prefijo, calculados al insertar. Durante el deletreo se avanza un nodo
+    por letra y las sugerencias se leen directamente: O(1) por letra, sin
+    recorrer el subárbol.
+    """
+    
+    def __init__(self, palabras=(), sugerencias=3):
+        """
+        Args:
+            palabras: Iterable de palabras o de tuplas (palabra, frecuencia)
+            sugerencias: Completados guardados por prefijo
+        """
+        self.raiz = _NodoLexico()
+        self.sugerencias = sugerencias
+        self.palabras = 0
+        for palabra in palabras:
+            if isinstance(palabra, str):
+                self.agregar(palabra)
+            else:
+                self.agregar(*palabra)
+    
+    @classmethod
+    def cargar(cls, ruta, sugerencias=3):
+        """
+        Lee un léxico de texto: una palabra por línea, opcionalmente seguida
+        de su frecuencia ("HOLA 120"); se ignoran las líneas vacías y las que
+        empiezan con #
+        """
+        lexico = cls(sugerencias=sugerencias)
+        with open(ruta, encoding='utf-8') as archivo:
+            for linea in archivo:
+                partes = linea.split()
+                if not partes or partes[0].startswith('#'):
+                    continue
+                lexico.agregar(partes[0], float(partes[1]) if len(partes) > 1 else 1)
+        return lexico
+    
+    def agregar(self, palabra, frecuencia=1):
+        """Agrega una palabra (si ya estaba, suma la frecuencia)"""
+        palabra = palabra.upper()
+        camino = [self.raiz]
+        for letra in palabra:
+            camino.append(camino[-1].hijos.setdefault(letra, _NodoLexico()))
+        final = camino[-1]
+        if not final.frecuencia:
+            self.palabras += 1
+        final.frecuencia += frecuencia
+        
+        # Las frecuencias solo crecen: basta reubicar la palabra en cada prefijo
+        entrada = (-final.frecuencia, palabra)
+        for nodo in camino:
+            mejores = [e for e in nodo.mejores if e[1] != palabra]
+            mejores.append(entrada)
+            mejores.sort()
+            nodo.mejores = mejores[:self.sugerencias]
+    
+    def avanzar(self, nodo, letra):
+        """Nodo del prefijo extendido con `letra` (None si ninguna palabra sigue así)"""
+        if nodo is None:
+            return None
+        return nodo.hijos.get(letra)
+    
+    @staticmethod
+    def completados(nodo):
+        """Mejores palabras que empiezan con el prefijo del nodo"""
+        if nodo is None:
+            return []
+        return [palabra for _, palabra in nodo.mejores]
+    
+    def completar(self, prefijo):
+        """Mejores palabras que empiezan con `prefijo`"""
+        nodo = self.raiz
+        for letra in prefijo.upper():
+            nodo = self.avanzar(nodo, letra)
+        return self.completados(nodo)
+    
+    def contiene(self, palabra):
+        """True si la palabra está en el léxico"""
+        nodo = self.raiz
+        for letra in palabra.upper():
+            nodo = self.avanzar(nodo, letra)
+        return nodo is not None and nodo.frecuencia > 0
+
+
+class _EstadoDeletreo:
+    """Palabra en curso de una mano"""
+    
+    __slots__ = ('letra', 'inicio', 'soltada', 'repeticiones', 'letras', 'nodo', 'ultimo')
+    
+    def __init__(self, raiz):
+        self.letra = None        # Letra sostenida en este momento
+        self.inicio = 0.0        # Desde cuándo se sostiene
+        self.soltada = 0.0       # Cuándo se soltó la última letra
+        self.repeticiones = 0    # Repeticiones por retención de la letra sostenida
+        self.letras = []
+        self.nodo = raiz         # Nodo del léxico del prefijo (None = fuera del léxico)
+        self.ultimo = 0.0        # Último instante con letra
+
+
+class Deletreador:
+    """
+    Arma letras y palabras a partir de los gestos confirmados por mano
+    
+    Una letra se agrega cuando la mano pasa a confirmar un gesto distinto
+    del que sostenía. Para repetir la misma letra hay que soltarla al menos
+    `pausa_repeticion` segundos (una liberación más corta se toma como un
+    parpadeo de la detección) o, si `retencion_repeticion` está definida,
+    sostenerla ese tiempo. La palabra se cierra tras `pausa_palabra`
+    segundos sin letra (sin frames con letra, aunque la mano no vuelva a
+    aparecer) o cuando se llama a terminar().
+    
+    Las palabras abiertas se guardan en orden de última actividad, así
+    avanzar() solo mira las que vencieron: cada frame cuesta O(1) amortizado
+    por mano, tanto en vivo como al recorrer resultados grabados.
+    
+    Los eventos son dicts:
+        {'tipo': 'letra', 'mano', 'letra', 'prefijo', 'sugerencias', 'tiempo'}
+        {'tipo': 'palabra', 'mano', 'palabra', 'en_lexico', 'sugerencias', 'tiempo'}
+    """
+    
+    def __init__(self, lexico=None, pausa_palabra=1.5, pausa_repeticion=0.15, retencion_repeticion=None):
+        """
+        Args:
+            lexico: Lexico para completar (None = sin sugerencias)
+            pausa_palabra: Segundos sin letra que cierran la palabra
+            pausa_repeticion: Liberación mínima para repetir la misma letra
+            retencion_repeticion: Segundos sosteniendo una letra para repetirla (None = nunca)
+        """
+        self.lexico = lexico if lexico is not None else Lexico()
+        self.pausa_palabra = pausa_palabra
+        self.pausa_repeticion = pausa_repeticion
+        self.retencion_repeticion = retencion_repeticion
+        self.estados = {}
+        self.abiertas = collections.OrderedDict()   # mano -> estado, por última actividad
+        self.letras = 0
+        self.palabras = 0
+    
+    @classmethod
+    def desde_config(cls, config=SPELLING_CONFIG):
+        """Crea el deletreador (y carga el léxico) según SPELLING_CONFIG"""
+        lexico = Lexico.cargar(config['lexico'], config['sugerencias']) if config['lexico'] else None
+        return cls(lexico, config['pausa_palabra'], config['pausa_repeticion'],
+                   config['retencion_repeticion'])
+    
+    def registrar(self, mano, confirmada, tiempo):
+        """
+        Procesa el gesto confirmado de una mano en un frame
+        
+        Args:
+            mano: ID de la mano
+            confirmada: Letra confirmada en este frame o None
+            tiempo: Instante del frame en segundos
+        
+        Returns:
+            list: Eventos generados (casi siempre vacía)
+        """
+        estado = self.estados.get(mano)
+        if estado is None:
+            estado = self.estados[mano] = _EstadoDeletreo(self.lexico.raiz)
+        
+        if confirmada is None:
+            if estado.letra is not None:
+                estado.letra = None
+                estado.soltada = tiempo
+            return []
+        
+        eventos = []
+        if confirmada != estado.letra:
+            parpadeo = (estado.letra is None and estado.letras and estado.letras[-1] == confirmada
+                        and tiempo - estado.soltada < self.pausa_repeticion)
+            estado.letra = confirmada
+            estado.inicio = tiempo
+            estado.repeticiones = 0
+            if not parpadeo:
+                eventos.append(self._agregar_letra(mano, estado, confirmada, tiempo))
+        elif (self.retencion_repeticion and
+              tiempo - estado.inicio >= self.retencion_repeticion * (estado.repeticiones + 1)):
+            estado.repeticiones += 1
+            eventos.append(self._agregar_letra(mano, estado, confirmada, tiempo))
+        
+        estado.ultimo = tiempo
+        if estado.letras:
+            self.abiertas[mano] = estado
+            self.abiertas.move_to_end(mano)
+        return eventos
+    
+    def _agregar_letra(self, mano, estado, letra, tiempo):
+        estado.letras.append(letra)
+        estado.nodo = self.lexico.avanzar(estado.nodo, letra)
+        self.letras += 1
+        return {'tipo': 'letra', 'mano': mano, 'letra': letra, 'prefijo': ''.join(estado.letras),
+                'sugerencias': self.lexico.completados(estado.nodo), 'tiempo': tiempo}
+    
+    def avanzar(self, tiempo):
+        """
+        Cierra las palabras sin letras nuevas durante pausa_palabra
+        
+        Returns:
+            list: Eventos 'palabra'
+        """
+        eventos = []
+        while self.abiertas:
+            mano, estado = next(iter(self.abiertas.items()))
+            if tiempo - estado.ultimo < self.pausa_palabra:
+                break
+            eventos.append(self._cerrar_palabra(mano, estado, tiempo))
+        return eventos
+    
+    def _cerrar_palabra(self, mano, estado, tiempo):
+        del self.abiertas[mano]
+        palabra = ''.join(estado.letras)
+        nodo = estado.nodo
+        estado.letras = []
+        estado.nodo = self.lexico.raiz
+        estado.letra = None
+        self.palabras += 1
+        return {'tipo': 'palabra', 'mano': mano, 'palabra': palabra,
+                'en_lexico': nodo is not None and nodo.frecuencia > 0,
+                'sugerencias': self.lexico.completados(nodo), 'tiempo': tiempo}
+    
+    def terminar(self, mano, tiempo):
+        """
+        Olvida una mano que desapareció, cerrando su palabra
+        
+        Returns:
+            list: El evento 'palabra' si tenía una abierta
+        """
+        eventos = []
+        if mano in self.abiertas:
+            eventos.append(self._cerrar_palabra(mano, self.estados[mano], tiempo))
+        self.estados.pop(mano, None)
+        return eventos
+    
+    def terminar_todas(self, tiempo):
+        """Cierra las palabras de todas las manos (fin de una grabación)"""
+        eventos = []
+        for mano in list(self.estados):
+            eventos += self.terminar(mano, tiempo)
+        return eventos
+    
+    def en_curso(self):
+        """
+        Palabras abiertas
+        
+        Returns:
+            list: Tuplas (mano, prefijo, sugerencias)
+        """
+        return [(mano, ''.join(estado.letras), self.lexico.completados(estado.nodo))
+                for mano, estado in self.abiertas.items()]
+
+
+def leer_resultados(ruta):
+    """
+    Recorre un archivo de resultados (resultswriter) o una grabación de landmarks
+    
+    Yields:
+        tuple: (fuente, tiempo en segundos, mano, letra confirmada o None)
+    """
+    if ruta.endswith(('.csv', '.csv.gz')):
+        abrir = gzip.open if ruta.endswith('.gz') else open
+        with abrir(ruta, 'rt', newline='', encoding='utf-8') as archivo:
+            for fila in csv.DictReader(archivo):
+                yield (fila['fuente'], float(fila['tiempo_ms']) / 1000, int(fila['mano']),
+                       fila['confirmada'] or None)
+    else:
+        from landmarkrecorder import LandmarkReplay
+        for fila in LandmarkReplay(ruta).reproducir():
+            yield fila[0], fila[2] / 1000, fila[3], fila[-1] or None
+
+
+def deletrear(filas, deletreador):
+    """
+    Pasa filas (fuente, tiempo, mano, confirmada) por el deletreador
+    
+    Las filas deben estar en orden de tiempo dentro de cada fuente; al
+    cambiar de fuente se cierran las palabras de la anterior.
+    
+    Yields:
+        dict: Eventos con la clave 'fuente' agregada
+    """
+    fuente_actual = None
+    tiempo = 0.0
+    for fuente, tiempo_fila, mano, confirmada in filas:
+        if fuente != fuente_actual:
+            for evento in deletreador.terminar_todas(tiempo):
+                evento['fuente'] = fuente_actual
+                yield evento
+            fuente_actual = fuente
+        tiempo = tiempo_fila
+        for evento in deletreador.avanzar(tiempo) + deletreador.registrar(mano, confirmada, tiempo):
+            evento['fuente'] = fuente
+            yield evento
+    for evento in deletreador.terminar_todas(tiempo):
+        evento['fuente'] = fuente_actual
+        yield evento
+
+
+def main():
+    """Deletrea palabras a partir de resultados grabados o de grabaciones de landmarks"""
+    parser = argparse.ArgumentParser(
+        description='Arma palabras con los gestos confirmados de resultados o grabaciones')
+    parser.add_argument('archivos', nargs='+',
+                        help='Resultados (.csv, .csv.gz) o grabaciones de landmarks (.lmk)')
+    parser.add_argument('--lexico', default=SPELLING_CONFIG['lexico'],
+                        help='Archivo de palabras para completar')
+    parser.add_argument('-o', '--salida', help='Archivo JSONL de eventos (por defecto consola)')
+    parser.add_argument('--letras', action='store_true', help='Mostrar también cada letra')
+    args = parser.parse_args()
+    
+    deletreador = Deletreador.desde_config(dict(SPELLING_CONFIG, lexico=args.lexico))
+    escritor = None
+    if args.salida:
+        from eventwriter import EventWriter
+        escritor = EventWriter(args.salida)
+    
+    inicio = time.perf_counter()
+    filas = (fila for ruta in args.archivos for fila in leer_resultados(ruta))
+    for evento in deletrear(filas, deletreador):
+        if escritor is not None:
+            escritor.emitir(evento)
+        elif evento['tipo'] == 'palabra':
+            sugerencia = '' if evento['en_lexico'] or not evento['sugerencias'] else \
+                f" (¿{evento['sugerencias'][0]}?)"
+            print(f"{evento['fuente']} mano {evento['mano']} "
+                  f"{evento['tiempo']:.2f}s: {evento['palabra']}{sugerencia}")
+        elif args.letras:
+            print(f"{evento['fuente']} mano {evento['mano']} {evento['tiempo']:.2f}s: "
+                  f"+{evento['letra']} -> {evento['prefijo']}")
+    if escritor is not None:
+        escritor.cerrar()
+    
+    duracion = time.perf_counter() - inicio
+    print(f"✓ {deletreador.letras} letras, {deletreador.palabras} palabras en {duracion:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
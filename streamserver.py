@@ -0,0 +1,481 @@
+"""
+streamserver.py
+Servidor de varias cámaras o videos que comparten un pool fijo de hilos de inferencia
+"""
+
+import argparse
+import collections
+import json
+import threading
+import time
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    MEDIAPIPE_CONFIG, CAMERA_CONFIG, TRACKING_CONFIG, FILTER_CONFIG, SERVER_CONFIG, EVENTBUS_CONFIG,
+    SCHEDULER_CONFIG
+)
+from audioengine import crear_audio
+from eventbus import crear_bus, crear_evento
+from eventwriter import EventWriter
+from framebuffers import FramePool, BufferSet
+from gesturedetector import GestureDetector
+from geometryutils import landmarks_a_array
+from handtracker import HandTracker, obtener_lados, reflejar_resultados
+from inferencescheduler import InferenceScheduler
+from landmarkfilter import crear_filtro
+from metrics import HistogramaLatencia
+from pipeline import ColaDescarte, Paquete
+
+
+class Estacion:
+    """
+    Una fuente de video con todo su estado propio
+    
+    Cada estación tiene su instancia de Hands (el seguimiento de MediaPipe
+    depende de los frames anteriores), su tracker, su detector con los
+    buffers de confirmación y su archivo de eventos. Un trabajador del pool
+    la procesa de forma exclusiva, así el estado no necesita locks.
+    """
+    
+    def __init__(self, indice, fuente, tamaño_cola=1, ruta_eventos=None, velocidad_archivos=1.0):
+        """
+        Args:
+            indice: Número de la estación (para nombres y eventos)
+            fuente: Índice de cámara (int) o ruta de un video
+            tamaño_cola: Frames pendientes antes de descartar el más viejo
+            ruta_eventos: Archivo JSONL de eventos de esta estación (None = no escribir)
+            velocidad_archivos: Ritmo de lectura de videos respecto a su fps
+                                (0 = leer tan rápido como se pueda)
+        """
+        self.indice = indice
+        self.fuente = fuente
+        self.nombre = f"{indice}:cam{fuente}" if isinstance(fuente, int) else f"{indice}:{fuente}"
+        self.es_archivo = not isinstance(fuente, int)
+        self.velocidad_archivos = velocidad_archivos
+        self.ruta_eventos = ruta_eventos
+        
+        self.cola = ColaDescarte(tamaño_cola)
+        self.frames = FramePool()
+        self.buffers = BufferSet()
+        self.espejo_landmarks = CAMERA_CONFIG['espejo'] == 'landmarks'
+        self.cap = None
+        self.manos = None
+        self.eventos = None
+        self.ultima_detectada = {}
+        
+        self.detector = GestureDetector()
+        self.tracker = HandTracker(**TRACKING_CONFIG)
+        self.filtro = crear_filtro(FILTER_CONFIG)
+        self.planificador = None
+        if SCHEDULER_CONFIG['activo']:
+            self.planificador = InferenceScheduler(
+                intervalo_maximo=SCHEDULER_CONFIG['intervalo_maximo'],
+                velocidad_quieta=SCHEDULER_CONFIG['velocidad_quieta'],
+                velocidad_rapida=SCHEDULER_CONFIG['velocidad_rapida'],
+                suavizado=SCHEDULER_CONFIG['suavizado']
+            )
+        
+        # Estado del planificador (protegido por la condición del servidor)
+        self.en_cola = False
+        self.ocupada = False
+        self.captura_terminada = False
+        
+        # Estadísticas
+        self.capturados = 0
+        self.procesados = 0
+        self.gestos = 0
+        self.latencias = HistogramaLatencia(300)     # Captura -> fin del procesamiento
+        self.inferencias = HistogramaLatencia(300)
+    
+    def iniciar(self):
+        """Abre la fuente, crea Hands y el archivo de eventos (lento: se llama en paralelo)"""
+        import mediapipe as mp
+        self.cap = cv2.VideoCapture(self.fuente)
+        if not self.es_archivo:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_CONFIG['width'])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_CONFIG['height'])
+            self.cap.set(cv2.CAP_PROP_FPS, CAMERA_CONFIG['fps'])
+        if not self.cap.isOpened():
+            raise IOError(f"No se pudo abrir la fuente {self.nombre}")
+        self.manos = mp.solutions.hands.Hands(**MEDIAPIPE_CONFIG)
+        if self.ruta_eventos:
+            self.eventos = EventWriter(self.ruta_eventos)
+    
+    def capturar(self, servidor):
+        """Hilo de captura: lee frames y avisa al servidor (descarta si la estación se atrasa)"""
+        periodo = 0.0
+        if self.es_archivo and self.velocidad_archivos > 0:
+            fps = self.cap.get(cv2.CAP_PROP_FPS) or CAMERA_CONFIG['fps']
+            periodo = 1.0 / (fps * self.velocidad_archivos)
+        siguiente = time.perf_counter()
+        
+        while servidor.corriendo:
+            inicio = time.perf_counter()
+            ret, frame = self.frames.leer(self.cap)
+            if not ret:
+                break
+            self.capturados += 1
+            
+            paquete = Paquete(frame)
+            paquete.tiempos['inicio_captura'] = inicio
+            descartado = self.cola.poner(paquete)
+            if descartado is not None:
+                self.frames.liberar(descartado.frame)
+            servidor.avisar(self)
+            
+            # Los videos se leen a su ritmo, como si fueran una cámara
+            if periodo:
+                siguiente += periodo
+                espera = siguiente - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+        
+        self.captura_terminada = True
+        servidor.avisar(self)
+    
+    def procesar(self, paquete, audio=None, bus=None):
+        """
+        Infiere, clasifica y confirma un frame (en un hilo del pool)
+        
+        El espejo sigue CAMERA_CONFIG['espejo'] como en la app: se voltea el
+        frame o se reflejan los landmarks. El frame vuelve al pool aunque la
+        inferencia falle.
+        """
+        frame = paquete.frame
+        h, w = frame.shape[:2]
+        captura = paquete.tiempos['inicio_captura']
+        
+        try:
+            if self.planificador is not None and not self.planificador.debe_inferir():
+                # Frame salteado: landmarks extrapolados desde la última inferencia
+                resultados = self.planificador.predecir(captura)
+            else:
+                if not self.espejo_landmarks:
+                    cv2.flip(frame, 1, dst=frame)
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.buffers.obtener('rgb', frame.shape))
+                inicio = time.perf_counter()
+                resultados = self.manos.process(rgb)
+                self.inferencias.registrar(time.perf_counter() - inicio)
+                if self.espejo_landmarks:
+                    reflejar_resultados(resultados)
+                if self.planificador is not None:
+                    self.planificador.registrar(resultados, captura)
+        finally:
+            self.frames.liberar(frame)
+        
+        lista_manos = resultados.multi_hand_landmarks or []
+        puntos = np.array([landmarks_a_array(lm_mano.landmark)
+                           for lm_mano in lista_manos]).reshape(-1, 21, 3)
+        lados = obtener_lados(resultados)
+        ids = self.tracker.actualizar(puntos, lados)
+        
+        # Las manos olvidadas con un gesto confirmado publican su liberación
+        activas = {}
+        if bus is not None:
+            activas = {id_mano: gesto for id_mano, gesto in self.detector.ultima_confirmada.items()
+                       if gesto is not None}
+        for id_mano in self.detector.olvidar_ausentes(ids):
+            self.ultima_detectada.pop(id_mano, None)
+            if id_mano in activas:
+                bus.publicar(crear_evento('liberacion', id_mano, activas[id_mano], self.nombre, captura))
+        if self.filtro is not None:
+            puntos = self.filtro.filtrar(ids, puntos, captura)
+        
+        if lista_manos:
+            gestos, _ = self.detector.detectar_vocales_lote(puntos, ids, aspecto=w / h)
+            manos_evento = []
+            for k, id_mano in enumerate(ids):
+                anterior = self.detector.ultima_confirmada.get(id_mano)
+                confirmado = self.detector.confirmar_con_liberacion(id_mano, gestos[k])
+                if confirmado is not None and confirmado != anterior:
+                    self._disparar(id_mano, confirmado, audio)
+                if bus is not None:
+                    self._publicar_cambios(bus, id_mano, gestos[k], confirmado, anterior, captura)
+                manos_evento.append({'id': id_mano, 'lado': lados[k],
+                                     'caja': _caja(puntos[k], w, h),
+                                     'detectado': gestos[k], 'confirmado': confirmado})
+            if self.eventos is not None:
+                self.eventos.emitir({'tipo': 'frame', 'frame': self.procesados + 1,
+                                     'tiempo': round(time.time(), 3), 'manos': manos_evento})
+        
+        self.procesados += 1
+        self.latencias.registrar(time.perf_counter() - captura)
+    
+    def _disparar(self, id_mano, gesto, audio):
+        """Reproduce y publica un gesto recién confirmado"""
+        self.gestos += 1
+        if audio is not None:
+            audio.reproducir(gesto)
+        if self.eventos is not None:
+            self.eventos.emitir({'tipo': 'gesto', 'frame': self.procesados + 1,
+                                 'tiempo': round(time.time(), 3), 'mano': id_mano, 'gesto': gesto})
+    
+    def _publicar_cambios(self, bus, id_mano, detectado, confirmado, anterior, captura):
+        """Publica en el bus la detección, confirmación o liberación de una mano"""
+        if detectado != self.ultima_detectada.get(id_mano):
+            self.ultima_detectada[id_mano] = detectado
+            if detectado is not None:
+                bus.publicar(crear_evento('deteccion', id_mano, detectado, self.nombre, captura))
+        if confirmado is not None and confirmado != anterior:
+            bus.publicar(crear_evento('confirmacion', id_mano, confirmado, self.nombre, captura))
+        elif anterior is not None and self.detector.ultima_confirmada.get(id_mano) is None:
+            bus.publicar(crear_evento('liberacion', id_mano, anterior, self.nombre, captura))
+    
+    def cerrar(self):
+        """Libera la fuente, Hands y el archivo de eventos (se puede llamar más de una vez)"""
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        if self.manos is not None:
+            self.manos.close()
+            self.manos = None
+        if self.eventos is not None:
+            self.eventos.cerrar()
+            self.eventos = None
+
+
+class StreamServer:
+    """
+    Reparte los frames de N estaciones entre un número fijo de trabajadores
+    
+    Cada estación tiene su hilo de captura y una cola acotada (se descarta
+    el frame más viejo). Las estaciones con frames pendientes esperan en una
+    cola de listas; cada trabajador toma la primera, procesa su frame más
+    reciente y, si tiene otro pendiente, la vuelve a poner al final. Así las
+    estaciones se turnan (round robin) y ninguna puede acaparar el pool.
+    """
+    
+    def __init__(self, fuentes, trabajadores=None, tamaño_cola=None, eventos=None,
+                 velocidad_archivos=None, audio=None, bus=None):
+        """
+        Args:
+            fuentes: Índices de cámara (int) o rutas de video
+            trabajadores: Hilos de inferencia (None = SERVER_CONFIG)
+            tamaño_cola: Frames pendientes por estación (None = SERVER_CONFIG)
+            eventos: Plantilla de archivo de eventos con {indice} (None = SERVER_CONFIG)
+            velocidad_archivos: Ritmo de los videos (None = SERVER_CONFIG)
+            audio: Reproducir los gestos confirmados (None = SERVER_CONFIG)
+            bus: eventbus.EventBus para publicar los gestos (None = según EVENTBUS_CONFIG)
+        """
+        self.trabajadores = trabajadores or SERVER_CONFIG['trabajadores']
+        tamaño_cola = tamaño_cola or SERVER_CONFIG['tamaño_cola']
+        plantilla = SERVER_CONFIG['eventos'] if eventos is None else eventos
+        velocidad = SERVER_CONFIG['velocidad_archivos'] if velocidad_archivos is None else velocidad_archivos
+        
+        self.estaciones = [
+            Estacion(i, fuente, tamaño_cola,
+                     plantilla.format(indice=i) if plantilla else None, velocidad)
+            for i, fuente in enumerate(fuentes)
+        ]
+        self.audio = crear_audio(habilitado=SERVER_CONFIG['audio'] if audio is None else audio)
+        self.bus = crear_bus() if bus is None else bus
+        
+        self.listas = collections.deque()
+        self.condicion = threading.Condition()
+        self.corriendo = False
+        self.tiempo_ocupado = 0.0
+        self.inicio = None
+        self._hilos = []
+    
+    def iniciar(self):
+        """
+        Abre las estaciones en paralelo y arranca captura y trabajadores
+        
+        Si una fuente no se puede abrir se cierran las que ya se abrieron
+        (y el audio y el bus) antes de relanzar el error.
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=len(self.estaciones)) as pool:
+                list(pool.map(Estacion.iniciar, self.estaciones))
+        except Exception:
+            self.detener()
+            raise
+        
+        self.corriendo = True
+        self.inicio = time.perf_counter()
+        for estacion in self.estaciones:
+            self._hilos.append(threading.Thread(target=estacion.capturar, args=(self,),
+                                                name=f'captura_{estacion.indice}', daemon=True))
+        for i in range(self.trabajadores):
+            self._hilos.append(threading.Thread(target=self._trabajar, name=f'inferencia_{i}', daemon=True))
+        for hilo in self._hilos:
+            hilo.start()
+    
+    def avisar(self, estacion):
+        """Marca una estación como lista si tiene frames y nadie la está procesando"""
+        with self.condicion:
+            if not estacion.en_cola and not estacion.ocupada and len(estacion.cola):
+                estacion.en_cola = True
+                self.listas.append(estacion)
+            self.condicion.notify_all()
+    
+    def _trabajar(self):
+        """Hilo del pool: procesa estaciones por turnos hasta que el servidor se detenga"""
+        while True:
+            with self.condicion:
+                while self.corriendo and not self.listas:
+                    self.condicion.wait(0.1)
+                if not self.listas:
+                    return
+                estacion = self.listas.popleft()
+                estacion.en_cola = False
+                estacion.ocupada = True
+            
+            paquete = estacion.cola.obtener(timeout=0)
+            inicio = time.perf_counter()
+            try:
+                if paquete is not None:
+                    estacion.procesar(paquete, self.audio, self.bus)
+            except Exception as e:
+                print(f"✗ Error procesando {estacion.nombre}: {e}")
+            finally:
+                with self.condicion:
+                    self.tiempo_ocupado += time.perf_counter() - inicio
+                    estacion.ocupada = False
+                    # Si llegó otro frame mientras tanto, la estación va al final de la fila
+                    if len(estacion.cola) and not estacion.en_cola:
+                        estacion.en_cola = True
+                        self.listas.append(estacion)
+                    self.condicion.notify_all()
+    
+    def terminado(self):
+        """True cuando todas las capturas terminaron y no queda trabajo"""
+        with self.condicion:
+            return all(e.captura_terminada and not len(e.cola) and not e.ocupada and not e.en_cola
+                       for e in self.estaciones)
+    
+    def estadisticas(self, anteriores=None):
+        """
+        Estado de cada estación y del pool
+        
+        Args:
+            anteriores: Resultado de la llamada anterior, para calcular los fps
+                        del último intervalo (None = desde el inicio)
+        
+        Returns:
+            dict: {'tiempo', 'ocupacion', 'estaciones': {nombre: {...}}}
+        """
+        ahora = time.perf_counter()
+        inicio = anteriores['_instante'] if anteriores else self.inicio
+        duracion = max(ahora - inicio, 1e-9)
+        previas = anteriores['estaciones'] if anteriores else {}
+        
+        estaciones = {}
+        for e in self.estaciones:
+            previa = previas.get(e.nombre, {})
+            latencia = e.latencias.percentiles() or (0.0, 0.0, 0.0)
+            inferencia = e.inferencias.percentiles() or (0.0, 0.0, 0.0)
+            estaciones[e.nombre] = {
+                'fps_entrada': round((e.capturados - previa.get('capturados', 0)) / duracion, 1),
+                'fps': round((e.procesados - previa.get('procesados', 0)) / duracion, 1),
+                'cola': len(e.cola),
+                'descartados': e.cola.descartados,
+                'capturados': e.capturados,
+                'procesados': e.procesados,
+                'gestos': e.gestos,
+                'latencia_p50_ms': round(latencia[0], 1),
+                'latencia_p95_ms': round(latencia[1], 1),
+                'inferencia_p50_ms': round(inferencia[0], 1),
+                'fraccion_inferida': round(e.planificador.fraccion_inferida(), 2) if e.planificador else 1.0,
+            }
+        
+        with self.condicion:
+            ocupado = self.tiempo_ocupado
+        ocupado_previo = anteriores['_ocupado'] if anteriores else 0.0
+        return {
+            'tiempo': time.time(),
+            'ocupacion': round((ocupado - ocupado_previo) / (duracion * self.trabajadores), 3),
+            'listas': len(self.listas),
+            'estaciones': estaciones,
+            '_instante': ahora,
+            '_ocupado': ocupado,
+        }
+    
+    def detener(self):
+        """Detiene captura y trabajadores y cierra las estaciones"""
+        self.corriendo = False
+        with self.condicion:
+            self.condicion.notify_all()
+        for estacion in self.estaciones:
+            estacion.cola.cerrar()
+        for hilo in self._hilos:
+            hilo.join(timeout=2.0)
+        self._hilos = []
+        for estacion in self.estaciones:
+            estacion.cerrar()
+        self.audio.detener_todos()
+        self.audio.cerrar()
+        if self.bus is not None:
+            self.bus.cerrar()
+
+
+def _caja(puntos, w, h):
+    """Bounding box [x_min, y_min, x_max, y_max] en píxeles de una mano (21, 3)"""
+    minimo = (puntos[:, :2].min(axis=0) * (w, h)).astype(int).tolist()
+    maximo = (puntos[:, :2].max(axis=0) * (w, h)).astype(int).tolist()
+    return minimo + maximo
+
+
+def _reportar(resumen, archivo=None):
+    """Imprime las estadísticas o las agrega como una línea JSON"""
+    publico = {k: v for k, v in resumen.items() if not k.startswith('_')}
+    if archivo:
+        with open(archivo, 'a', encoding='utf-8') as salida:
+            salida.write(json.dumps(publico, ensure_ascii=False) + '\n')
+        return
+    print(f"Pool: ocupación {publico['ocupacion']:.0%}, estaciones en espera {publico['listas']}")
+    for nombre, e in publico['estaciones'].items():
+        print(f"  {nombre:<20} {e['fps']:5.1f} fps (entrada {e['fps_entrada']:.1f}), "
+              f"cola {e['cola']}, descartados {e['descartados']}, "
+              f"latencia p50 {e['latencia_p50_ms']:.1f}ms p95 {e['latencia_p95_ms']:.1f}ms")
+
+
+def main():
+    """Atiende varias cámaras o videos con un pool compartido de inferencia"""
+    parser = argparse.ArgumentParser(
+        description='Servidor de detección para varias cámaras o videos a la vez')
+    parser.add_argument('fuentes', nargs='+', help='Índices de cámara (0, 1, ...) o rutas de video')
+    parser.add_argument('-t', '--trabajadores', type=int, help='Hilos de inferencia compartidos')
+    parser.add_argument('--eventos', help='Plantilla de eventos por estación, ej. eventos_{indice}.jsonl')
+    parser.add_argument('--estadisticas', help='Archivo JSONL de estadísticas (por defecto consola)')
+    parser.add_argument('--intervalo', type=int, metavar='K',
+                        help='Ejecutar MediaPipe como máximo cada K frames con las manos quietas')
+    parser.add_argument('--bus', metavar='DIRECCION',
+                        help="Publicar los gestos en el bus de eventos ('host:puerto' o socket Unix)")
+    args = parser.parse_args()
+    if args.intervalo:
+        SCHEDULER_CONFIG['activo'] = args.intervalo > 1
+        SCHEDULER_CONFIG['intervalo_maximo'] = args.intervalo
+    if args.bus:
+        EVENTBUS_CONFIG['activo'] = True
+        EVENTBUS_CONFIG['direccion'] = args.bus
+    
+    fuentes = [int(f) if f.isdigit() else f for f in args.fuentes]
+    servidor = StreamServer(fuentes, trabajadores=args.trabajadores, eventos=args.eventos)
+    archivo = args.estadisticas or SERVER_CONFIG['archivo_estadisticas']
+    intervalo = SERVER_CONFIG['intervalo_estadisticas']
+    
+    resumen = None
+    try:
+        servidor.iniciar()
+        print(f"✓ {len(fuentes)} estaciones, {servidor.trabajadores} trabajadores de inferencia")
+        ultimo_reporte = time.perf_counter()
+        while not servidor.terminado():
+            time.sleep(0.1)
+            if intervalo and time.perf_counter() - ultimo_reporte >= intervalo:
+                resumen = servidor.estadisticas(resumen)
+                _reportar(resumen, archivo)
+                ultimo_reporte = time.perf_counter()
+    except KeyboardInterrupt:
+        print("\n✗ Interrumpido por el usuario")
+    finally:
+        servidor.detener()
+        # Resumen de toda la ejecución
+        if servidor.inicio is not None:
+            _reportar(servidor.estadisticas(), archivo)
+        print("✓ Servidor detenido")
+
+
+if __name__ == "__main__":
+    main()
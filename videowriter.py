@@ -0,0 +1,90 @@
+"""
+videowriter.py
+Video anotado escrito en segundo plano a partir de una fracción de los frames
+"""
+
+import queue
+import threading
+import cv2
+
+
+class AnnotatedVideoWriter:
+    """
+    Dibuja y codifica 1 de cada N frames en un hilo propio
+    
+    El hilo de la app solo copia el frame y encola sus anotaciones; el dibujo
+    y la codificación ocurren en segundo plano. Si el codificador se atrasa
+    los frames nuevos se descartan en lugar de acumular memoria o frenar la
+    detección.
+    """
+    
+    def __init__(self, ruta, dibujar, cada=5, fps=6.0, codec='mp4v', tamaño_cola=8, espejo=False):
+        """
+        Args:
+            ruta: Archivo de video de salida
+            dibujar: Función (frame, anotaciones) que dibuja sobre el frame
+            cada: Se escribe 1 de cada `cada` frames
+            fps: Frames por segundo del video resultante
+            codec: FourCC del codificador de OpenCV
+            tamaño_cola: Frames pendientes antes de empezar a descartar
+            espejo: Voltear los frames al copiarlos (si llegan sin voltear)
+        """
+        self.ruta = ruta
+        self.dibujar = dibujar
+        self.cada = max(1, int(cada))
+        self.fps = fps
+        self.codec = codec
+        self.espejo = espejo
+        self.cola = queue.Queue(maxsize=tamaño_cola)
+        self.escritor = None
+        self.escritos = 0
+        self.descartados = 0
+        self.hilo = threading.Thread(target=self._bucle, name='video_anotado', daemon=True)
+        self.hilo.start()
+    
+    def agregar(self, num_frame, frame, anotaciones):
+        """
+        Encola el frame si le toca según la decimación
+        
+        Args:
+            num_frame: Número de frame (decide si se escribe)
+            frame: Imagen BGR sin dibujar (se copia; el original puede reutilizarse)
+            anotaciones: Datos que recibirá la función dibujar
+        
+        Returns:
+            bool: True si el frame se encoló
+        """
+        if num_frame % self.cada:
+            return False
+        try:
+            copia = cv2.flip(frame, 1) if self.espejo else frame.copy()
+            self.cola.put_nowait((copia, anotaciones))
+            return True
+        except queue.Full:
+            self.descartados += 1
+            return False
+    
+    def _bucle(self):
+        """Hilo codificador: dibuja y escribe hasta recibir None"""
+        while True:
+            item = self.cola.get()
+            if item is None:
+                break
+            frame, anotaciones = item
+            self.dibujar(frame, anotaciones)
+            if self.escritor is None:
+                h, w = frame.shape[:2]
+                self.escritor = cv2.VideoWriter(self.ruta, cv2.VideoWriter_fourcc(*self.codec),
+                                                self.fps, (w, h))
+            self.escritor.write(frame)
+            self.escritos += 1
+    
+    def cerrar(self):
+        """Termina de codificar lo encolado y cierra el archivo"""
+        if self.hilo is None:
+            return
+        self.cola.put(None)
+        self.hilo.join()
+        self.hilo = None
+        if self.escritor is not None:
+            self.escritor.release()